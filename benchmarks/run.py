@@ -0,0 +1,316 @@
+"""Benchmarks of the model and frontend hot paths.
+
+Each benchmark records the wall time of repeated runs and the peak memory
+traced by tracemalloc during one more run, and the results are written as
+JSON so runs can be compared between commits:
+
+    PYTHONPATH=src python -m benchmarks.run --output before.json
+    git checkout my-branch
+    PYTHONPATH=src python -m benchmarks.run --output after.json --compare before.json
+"""
+
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import date, datetime
+from statistics import median
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARAMETERS = os.path.join(ROOT, "defaults", "webapp.cfg")
+LOCALES = os.path.join(ROOT, "src", "penn_chime", "locales")
+
+REPEAT = 20
+
+# Ratio of median wall times above which --compare reports a regression
+THRESHOLD = 1.2
+
+# Name to a setup function that returns the callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def get_parameters(**changes):
+    """Parameters of the web app defaults on a fixed date, with changes."""
+    from penn_chime.model.parameters import Parameters
+
+    p = Parameters.create({"PARAMETERS": PARAMETERS}, [])
+    return p.replace(**{
+        "current_date": date(2020, 4, 1),
+        "date_first_hospitalized": date(2020, 3, 7),
+        "mitigation_date": date(2020, 3, 23),
+        **changes,
+    })
+
+
+def get_sir(fit: str, mitigated: bool):
+    from penn_chime.model.sir import Sir
+
+    changes = {"doubling_time": None} if fit == "date_first_hospitalized" else {"date_first_hospitalized": None}
+    p = get_parameters(**changes)
+    if not mitigated:
+        # Parameters defaults a missing mitigation_date to today
+        p.mitigation_date = None
+    return lambda: Sir(p)
+
+
+for fit in ("doubling_time", "date_first_hospitalized"):
+    for mitigated in (True, False):
+        name = f"sir_{fit}_{'mitigated' if mitigated else 'unmitigated'}"
+        benchmark(name)(lambda fit=fit, mitigated=mitigated: get_sir(fit, mitigated))
+
+
+@benchmark("sim_sir")
+def setup_sim_sir():
+    from penn_chime.model.sir import Sir, sim_sir
+
+    model = Sir(get_parameters(date_first_hospitalized=None, n_days=180))
+    args = (model.raw["susceptible"][0], model.raw["infected"][0], model.raw["recovered"][0], model.gamma)
+    return lambda: sim_sir(*args, -model.i_day, model.policies)
+
+
+@benchmark("calculate_census")
+def setup_calculate_census():
+    from penn_chime.model.sir import Sir, calculate_census
+
+    model = Sir(get_parameters(date_first_hospitalized=None, n_days=180))
+    return lambda: calculate_census(model.raw, model.days)
+
+
+# Scenarios of the parameter construction benchmarks
+BATCH_SIZE = 10000
+
+
+@benchmark("parameters_replace")
+def setup_parameters_replace():
+    """Validated Parameters for each scenario of a sweep."""
+    p = get_parameters(date_first_hospitalized=None)
+    doubling_times = np.linspace(2.0, 10.0, BATCH_SIZE).tolist()
+    icu_days = (np.arange(BATCH_SIZE) % 10 + 1).tolist()
+    return lambda: [p.replace(doubling_time=dt, icu_days=days) for dt, days in zip(doubling_times, icu_days)]
+
+
+@benchmark("parameter_records")
+def setup_parameter_records():
+    """The same scenarios as parameters_replace, as one validated batch of records."""
+    from penn_chime.model.records import ParameterRecord
+
+    p = get_parameters(date_first_hospitalized=None)
+    columns = {
+        "doubling_time": np.linspace(2.0, 10.0, BATCH_SIZE),
+        "icu_days": np.arange(BATCH_SIZE) % 10 + 1,
+    }
+    return lambda: ParameterRecord.create_batch(p, columns)
+
+
+@benchmark("import_cli")
+def setup_import_cli():
+    """A fresh interpreter importing the command line, which must not import pandas."""
+    env = {**os.environ, "PYTHONPATH": os.path.join(ROOT, "src")}
+    return lambda: subprocess.run([sys.executable, "-c", "import penn_chime.cli"], env=env, check=True)
+
+
+@benchmark("handle_model_change")
+def setup_handle_model_change():
+    """The dash model callback, from parameters to figures, tables and downloads."""
+    from chime_dash.app.pages.index import Index
+    from chime_dash.app.services.callbacks import IndexCallbacks, model_cache, render_cache
+    from chime_dash.app.utils import parameters_serializer
+
+    p = get_parameters(date_first_hospitalized=None)
+    index = Index("en", p)
+    sidebar_data = {"parameters": parameters_serializer(p)}
+
+    def run():
+        model_cache.clear()
+        render_cache.clear()
+        return IndexCallbacks.handle_model_change(index, sidebar_data, [None] * 3, [None] * 3)
+    return run
+
+
+@benchmark("handle_model_change_cached")
+def setup_handle_model_change_cached():
+    """The dash model callback on a timestamp change, with the outputs of the parameters cached."""
+    from chime_dash.app.pages.index import Index
+    from chime_dash.app.services.callbacks import IndexCallbacks
+    from chime_dash.app.utils import parameters_serializer
+
+    p = get_parameters(date_first_hospitalized=None)
+    index = Index("en", p)
+    sidebar_data = {"parameters": parameters_serializer(p)}
+    relayout_data = {"xaxis.range[0]": "2020-04-01", "xaxis.range[1]": "2020-05-01"}
+    return lambda: IndexCallbacks.handle_model_change(index, sidebar_data, [None] * 3, [relayout_data] * 3)
+
+
+@benchmark("prepare_visualization_group")
+def setup_prepare_visualization_group():
+    from chime_dash.app.pages.index import Index
+    from chime_dash.app.utils import prepare_visualization_group
+    from penn_chime.model.sir import Sir
+
+    p = get_parameters(date_first_hospitalized=None)
+    model = Sir(p)
+    content = Index("en", p).components["visualizations"].content
+    return lambda: prepare_visualization_group(model.census_df, labels=p.labels, table_mod=7, content=content)
+
+
+def setup_chart(builder: str, df: str, keyword: str):
+    """Build an altair chart and serialize it as streamlit does."""
+    import altair as alt
+    from penn_chime.model.sir import Sir
+    from penn_chime.view import charts
+
+    setup_i18n()
+    p = get_parameters(date_first_hospitalized=None)
+    model = Sir(p)
+    build = getattr(charts, builder)
+    data = getattr(model, df)
+    return lambda: build(alt=alt, **{keyword: data}, max_y_axis=p.max_y_axis).to_dict()
+
+
+benchmark("build_admits_chart")(lambda: setup_chart("build_admits_chart", "admits_floor_df", "admits_floor_df"))
+benchmark("build_census_chart")(lambda: setup_chart("build_census_chart", "census_floor_df", "census_floor_df"))
+benchmark("build_sim_sir_w_date_chart")(
+    lambda: setup_chart("build_sim_sir_w_date_chart", "sim_sir_w_date_floor_df", "sim_sir_w_date_floor_df"))
+
+
+def setup_i18n():
+    import i18n
+
+    i18n.set("filename_format", "{locale}.{format}")
+    i18n.set("locale", "en")
+    i18n.set("fallback", "en")
+    if LOCALES not in i18n.load_path:
+        i18n.load_path.append(LOCALES)
+
+
+def measure(fn: Callable[[], object], repeat: int = REPEAT) -> Dict[str, float]:
+    """Wall times of repeat runs after one warm up run, and the peak traced memory of one more."""
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # Traced separately, since tracing slows every allocation
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "min_s": min(times),
+        "median_s": median(times),
+        "mean_s": sum(times) / len(times),
+        "peak_bytes": peak,
+    }
+
+
+def get_environment() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = REPEAT) -> Dict:
+    """Results of the named benchmarks, or of every benchmark."""
+    results = {}
+    for name in names or BENCHMARKS:
+        results[name] = measure(BENCHMARKS[name](), repeat)
+    return {"environment": get_environment(), "results": results}
+
+
+def compare(results: Dict, baseline: Dict, threshold: float = THRESHOLD, file=None) -> List[str]:
+    """Print median wall times and peak memory against a baseline; returns the regressed benchmarks."""
+    file = file or sys.stdout
+    regressed = []
+    print(f"{'benchmark':40} {'baseline':>10} {'current':>10} {'ratio':>7} {'peak':>9}", file=file)
+    for name, result in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:40} {'-':>10} {result['median_s']:10.5f}", file=file)
+            continue
+        ratio = result["median_s"] / previous["median_s"]
+        peak = result["peak_bytes"] / max(previous["peak_bytes"], 1)
+        flag = " *" if ratio > threshold else ""
+        print(
+            f"{name:40} {previous['median_s']:10.5f} {result['median_s']:10.5f} {ratio:7.2f} {peak:9.2f}{flag}",
+            file=file,
+        )
+        if ratio > threshold:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Timed runs of each benchmark")
+    parser.add_argument("--output", default=None, help="Write the results as JSON (default stdout)")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=THRESHOLD,
+        help="Exit with an error if a median time grows by more than this ratio",
+    )
+    a = parser.parse_args(argv)
+    unknown = set(a.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {sorted(unknown)}")
+
+    # The model logs each fit and rebuild at DEBUG; keep those out of the
+    # timings, and leave INFO progress to whatever logging is configured
+    logging.disable(logging.DEBUG)
+    try:
+        results = run_benchmarks(a.names, a.repeat)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    if a.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(a.output, "w") as fout:
+            json.dump(results, fout, indent=2)
+
+    if a.compare is not None:
+        with open(a.compare) as fin:
+            # Keep stdout to the JSON results when they are written there
+            regressed = compare(results, json.load(fin), a.threshold, sys.stdout if a.output else sys.stderr)
+        if regressed:
+            print(f"Regressed: {', '.join(regressed)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,10 @@ setup(
         "oauth2client",
         "python-i18n"
     ],
+    extras_require={
+        # Parquet and Arrow output of the command line, and sweeps
+        "columnar": ["pyarrow"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
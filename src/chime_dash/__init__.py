@@ -12,7 +12,10 @@ from penn_chime.model.parameters import Parameters
 
 from chime_dash.app.config import from_object
 from chime_dash.app.pages.root import Root
-from chime_dash.app.utils.callbacks import wrap_callbacks
+from chime_dash.app.services.callbacks import model_cache, render_cache
+from chime_dash.app.services.metrics import register_metrics
+from chime_dash.app.services.tracing import register_tracing
+from chime_dash.app.utils.callbacks import CALLBACK_CACHE, wrap_callbacks
 
 DashAppInstance = TypeVar('DashAppInstance')
 
@@ -48,5 +51,7 @@ def create_app(context: str = 'prod') -> DashAppInstance:
     App.title = Env.CHIME_TITLE
     App.layout = body.html
     wrap_callbacks(App)
+    register_metrics(App.server, model_cache, render_cache, CALLBACK_CACHE)
+    register_tracing(App.server)
 
     return Env, App
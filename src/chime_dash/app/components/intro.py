@@ -45,7 +45,7 @@ class Intro(Component):
                 S=pars.population,
                 market_share=pars.market_share
             ) + "\n\n" + infected_population_warning_str + "\n\n" + intro["description-doubling-time"].format(
-                doubling_time=pars.doubling_time,
+                doubling_time=model.doubling_time,
                 recovery_days=pars.infectious_days,
                 r_naught=model.r_naught,
                 daily_growth=model.daily_growth_rate * 100.0
@@ -9,6 +9,8 @@ for more general utility functions see app/utils
 modules             desc.
 ---                 ---
 plotting            graphs / charts
+metrics             prometheus metrics served at /metrics
+tracing             sampled callback spans served at /traces
 #! call back logic should be moved here
 #! logic for updating text should be moved here
 """
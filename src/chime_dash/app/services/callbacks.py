@@ -1,6 +1,10 @@
+import os
 from collections import OrderedDict, defaultdict
+from copy import deepcopy
 from datetime import datetime, date
-from typing import List
+from hashlib import sha256
+from json import dumps
+from typing import Any, List
 from urllib.parse import parse_qsl, urlencode
 
 from dash.exceptions import PreventUpdate
@@ -12,10 +16,25 @@ from chime_dash.app.utils import (
     prepare_visualization_group
 )
 from chime_dash.app.utils.callbacks import ChimeCallback, register_callbacks
-from penn_chime.model.sir import Sir
+from penn_chime.constants import CHANGE_DATE, VERSION
+from penn_chime.model.cache import ModelCache, ResultCache
 from penn_chime.model.parameters import Parameters, Disposition
 
 
+model_cache = ModelCache.from_env(os.environ)
+# Intro, figures, tables and downloads of the model change callback, shared
+# between workers in the "render" subdirectory of CHIME_CACHE_DIR
+render_cache = ResultCache.from_env(os.environ, "render")
+
+# Positions of the figures in the outputs of the model change callback
+FIGURES = (1, 4, 7)
+
+
+def render_key(language: str, parameters: str) -> str:
+    """Key of the rendered outputs of serialized parameters in a language, and of the release."""
+    return sha256(dumps([parameters, language, VERSION, CHANGE_DATE.isoformat()]).encode()).hexdigest()
+
+
 class ComponentCallbacks:
     def __init__(self, callbacks: List[ChimeCallback], component_instance):
         self._callbacks = callbacks
@@ -38,13 +57,51 @@ class IndexCallbacks(ComponentCallbacks):
 
     @staticmethod
     def handle_model_change(i, sidebar_data, lock_zoom_clicks, graphs_relayout_data):
+        """Outputs of the model change callback.
+
+        The outputs of each set of parameters are rendered once and kept
+        in render_cache, so timestamp changes and lock zoom clicks only
+        apply the zoom to copies of the cached figures.
+        """
+        if sidebar_data:
+            key = render_key(i.components["intro"].language, sidebar_data["parameters"])
+            result = render_cache.get(key)
+            if result is None:
+                result = IndexCallbacks.render_model(i, sidebar_data["parameters"])
+                render_cache.put(key, result)
+        else:
+            result = IndexCallbacks.render_model(i, None)
+        result = list(result)
+
+        for index, n_clicks, relayout_data in zip(FIGURES, lock_zoom_clicks, graphs_relayout_data):
+            if relayout_data:
+                if n_clicks == None or n_clicks % 2 == 0:
+                    # Zoom a copy, the cached figure is shared
+                    figure = result[index] = deepcopy(result[index])
+                    # Set plot_data figure coordinates 
+                    if "xaxis.range[0]" in relayout_data:
+                        figure["layout"]["xaxis"]["range"] = [
+                            relayout_data["xaxis.range[0]"],
+                            relayout_data["xaxis.range[1]"]
+                        ]
+                    if "yaxis.range[0]" in relayout_data:
+                        figure["layout"]["yaxis"]["range"] = [
+                            relayout_data["yaxis.range[0]"],
+                            relayout_data["yaxis.range[1]"]
+                        ]
+                            
+        return result
+
+    @staticmethod
+    def render_model(i, parameters: str) -> List[Any]:
+        """Intro, then the figure, table and download of each data frame, of serialized parameters."""
         model = {}
         pars = None
         result = []
         viz_kwargs = {}
-        if sidebar_data:
-            pars = parameters_deserializer(sidebar_data["parameters"])
-            model = Sir(pars)
+        if parameters:
+            pars = parameters_deserializer(parameters)
+            model = model_cache.get_or_create(pars)
             vis = i.components.get("visualizations", None) if i else None
             vis_content = vis.content if vis else None
 
@@ -57,26 +114,8 @@ class IndexCallbacks(ComponentCallbacks):
         for df_key in ["admits_df", "census_df", "sim_sir_w_date_df"]:
             df = None
             if model:
-                df = model.__dict__.get(df_key, None)
+                df = getattr(model, df_key, None)
             result.extend(prepare_visualization_group(df, **viz_kwargs))
-
-        figures = [result[1], result[4], result[7]]
-
-        for n_clicks, relayout_data, figure in zip(lock_zoom_clicks, graphs_relayout_data, figures):
-            if relayout_data:
-                if n_clicks == None or n_clicks % 2 == 0:
-                    # Set plot_data figure coordinates 
-                    if "xaxis.range[0]" in relayout_data:
-                        figure["layout"]["xaxis"]["range"] = [
-                            relayout_data["xaxis.range[0]"],
-                            relayout_data["xaxis.range[1]"]
-                        ]
-                    if "yaxis.range[0]" in relayout_data:
-                        figure["layout"]["yaxis"]["range"] = [
-                            relayout_data["yaxis.range[0]"],
-                            relayout_data["yaxis.range[1]"]
-                        ]
-                            
         return result
 
     def __init__(self, component_instance):
@@ -133,7 +172,9 @@ class IndexCallbacks(ComponentCallbacks):
                         "SIR_graph": "relayoutData"
                         },
                     stores=["sidebar-store"],
-                    callback_fn=handle_model_change_helper
+                    callback_fn=handle_model_change_helper,
+                    # Timestamps change on every call; render_cache keeps the outputs
+                    memoize=False,
                 ),
                 ChimeCallback( # If user presses the Lock Zoom Button, update outline / solid color
                     changed_elements={"new_admissions_lock_zoom": "n_clicks"},
@@ -356,6 +397,8 @@ class RootCallbacks(ComponentCallbacks):
                     dom_states=sidebar.input_state_map,
                     callback_fn=stores_changed_helper,
                     stores=["root-store", "sidebar-store"],
+                    # Timestamps change on every call
+                    memoize=False,
                 ),
             ]
         )
@@ -0,0 +1,201 @@
+"""services/metrics
+
+Prometheus metrics of the dash server, served in the text exposition
+format at /metrics:
+
+    chime_callback_seconds          latency of each ChimeCallback
+    chime_callback_payload_bytes    response bytes of each callback
+    chime_model_seconds             Sir fits and rebuilds
+    chime_requests_in_flight        requests being served
+    chime_model_cache_*             model cache entries, hits and misses
+    chime_render_cache_*            the same of the rendered figures and tables
+    chime_callback_cache_*          the same of memoized callback outputs
+
+Metrics are kept per process; with several gunicorn workers each scrape
+reads the worker that serves it.
+"""
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Dict, List, Sequence
+
+from flask import Response, g, has_request_context, request
+
+from penn_chime.model.sir import Stats, set_stats_sink
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 1 KiB to 16 MiB
+BYTES_BUCKETS = tuple(float(2 ** k) for k in range(10, 25, 2))
+
+# Dash posts every callback to this path
+DASH_UPDATE_PATH = "/_dash-update-component"
+
+# Sir phases that time a whole model build
+MODEL_PHASES = ("sir", "rebuild")
+
+
+def escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative buckets, sum and count of observations by label value."""
+
+    def __init__(self, name: str, documentation: str, label: str, buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.lock = Lock()
+        self.series: Dict[str, List[float]] = {}
+
+    def observe(self, label_value: str, value: float):
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                # Bucket counts, then the sum
+                series = self.series[label_value] = [0.0] * (len(self.buckets) + 1)
+            for k, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[k] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = {key: list(values) for key, values in self.series.items()}
+        for label_value, values in sorted(series.items()):
+            label = f'{self.label}="{escape(label_value)}"'
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{label},le="{format_value(bound)}"}} {int(count)}')
+            lines.append(f"{self.name}_sum{{{label}}} {format_value(values[-1])}")
+            lines.append(f"{self.name}_count{{{label}}} {int(values[-2])}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.lock = Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {format_value(self.value)}",
+        ]
+
+
+class Metrics:
+    """Metrics of one server process."""
+
+    def __init__(self):
+        self.callback_seconds = Histogram(
+            "chime_callback_seconds", "Latency of each dash callback.", "callback", SECONDS_BUCKETS)
+        self.payload_bytes = Histogram(
+            "chime_callback_payload_bytes", "Response bytes of each dash callback.", "callback", BYTES_BUCKETS)
+        self.model_seconds = Histogram(
+            "chime_model_seconds", "Duration of Sir model builds.", "phase", SECONDS_BUCKETS)
+        self.in_flight = Gauge("chime_requests_in_flight", "Requests being served.")
+        # Prefix of each cache's metrics to the cache
+        self.caches = {}
+
+    @contextmanager
+    def time_callback(self, name: str):
+        """Time a callback, and tag the request so its payload is counted under name."""
+        if has_request_context():
+            g.chime_callback = name
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.callback_seconds.observe(name, perf_counter() - start)
+
+    def observe_model(self, stats: Stats, phase: str):
+        """Stats sink of Sir runs."""
+        if phase in MODEL_PHASES:
+            self.model_seconds.observe(phase, stats.phases[phase]["seconds"])
+
+    def render_caches(self) -> List[str]:
+        lines = []
+        for prefix, cache in self.caches.items():
+            for key, value in cache.stats().items():
+                kind = "gauge" if key == "entries" else "counter"
+                name = f"{prefix}_{key}" + ("_total" if kind == "counter" else "")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return lines
+
+    def render(self) -> str:
+        lines = [
+            *self.callback_seconds.render(),
+            *self.payload_bytes.render(),
+            *self.model_seconds.render(),
+            *self.in_flight.render(),
+            *self.render_caches(),
+        ]
+        return "\n".join(lines) + "\n"
+
+    def before_request(self):
+        if request.path != "/metrics":
+            g.chime_in_flight = True
+            self.in_flight.inc()
+
+    def after_request(self, response):
+        name = g.get("chime_callback")
+        if name is not None and request.path == DASH_UPDATE_PATH:
+            size = response.calculate_content_length()
+            if size is not None:
+                self.payload_bytes.observe(name, size)
+        return response
+
+    def teardown_request(self, exception=None):
+        if g.pop("chime_in_flight", False):
+            self.in_flight.dec()
+
+    def register(self, server, model_cache=None, render_cache=None, callback_cache=None):
+        """Serve /metrics on a flask server and record its requests.
+
+        Replaces any Sir stats sink with one that records model builds.
+        """
+        caches = (
+            ("chime_model_cache", model_cache),
+            ("chime_render_cache", render_cache),
+            ("chime_callback_cache", callback_cache),
+        )
+        self.caches = {prefix: cache for prefix, cache in caches if cache is not None}
+        server.before_request(self.before_request)
+        server.after_request(self.after_request)
+        server.teardown_request(self.teardown_request)
+        server.add_url_rule(
+            "/metrics", "metrics", lambda: Response(self.render(), content_type=CONTENT_TYPE))
+        set_stats_sink(self.observe_model)
+
+
+METRICS = Metrics()
+
+
+def register_metrics(server, model_cache=None, render_cache=None, callback_cache=None):
+    METRICS.register(server, model_cache, render_cache, callback_cache)
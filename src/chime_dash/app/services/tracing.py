@@ -0,0 +1,139 @@
+"""services/tracing
+
+Spans of dash callback invocations, kept in a ring buffer and served as
+JSON at /traces. A span records the callback, its input ids, its
+duration, whether it raised PreventUpdate and the JSON size of its output.
+
+Only a sample of invocations is traced; the others pay one random draw.
+CHIME_TRACE_SAMPLE_RATE sets the fraction traced (default 0.1) and
+CHIME_TRACE_BUFFER the number of spans kept (default 256).
+"""
+import json
+import os
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from logging import getLogger
+from random import random
+from threading import Lock
+from time import perf_counter, time
+from typing import Any, Dict, List, Optional, Sequence
+
+from dash.exceptions import PreventUpdate
+from flask import jsonify, request
+
+
+logger = getLogger(__name__)
+
+
+SAMPLE_RATE = 0.1
+BUFFER_SIZE = 256
+
+
+Span = namedtuple("Span", (
+    "callback",
+    "inputs",
+    "start",
+    "duration",
+    "prevented",
+    "output_bytes",
+    "error",
+))
+
+
+class SpanRecorder:
+    """Output of a traced invocation, set inside the span."""
+
+    def __init__(self):
+        self.output_bytes = None
+
+    def set_output(self, output: Any):
+        from plotly.utils import PlotlyJSONEncoder
+
+        try:
+            self.output_bytes = len(json.dumps(output, cls=PlotlyJSONEncoder))
+        except (TypeError, ValueError):
+            self.output_bytes = None
+
+
+class NullSpanRecorder:
+    def set_output(self, output: Any):
+        pass
+
+
+NULL_RECORDER = NullSpanRecorder()
+
+
+class Tracer:
+    """Sampled spans of callback invocations in a ring buffer."""
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str]) -> "Tracer":
+        """Configure from CHIME_TRACE_SAMPLE_RATE and CHIME_TRACE_BUFFER."""
+        return cls(
+            sample_rate=float(env.get("CHIME_TRACE_SAMPLE_RATE", SAMPLE_RATE)),
+            buffer_size=int(env.get("CHIME_TRACE_BUFFER", BUFFER_SIZE)),
+        )
+
+    def __init__(self, sample_rate: float = SAMPLE_RATE, buffer_size: int = BUFFER_SIZE):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        self.sample_rate = sample_rate
+        self.buffer = deque(maxlen=buffer_size)
+        self.lock = Lock()
+
+    @contextmanager
+    def span(self, callback: str, inputs: Sequence[str]):
+        """Trace one invocation if it is sampled; yields a recorder for its output."""
+        if self.sample_rate == 0.0 or random() >= self.sample_rate:
+            yield NULL_RECORDER
+            return
+
+        recorder = SpanRecorder()
+        start_time = time()
+        start = perf_counter()
+        prevented = False
+        error = None
+        try:
+            yield recorder
+        except PreventUpdate:
+            prevented = True
+            raise
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            span = Span(
+                callback,
+                list(inputs),
+                start_time,
+                perf_counter() - start,
+                prevented,
+                recorder.output_bytes,
+                error,
+            )
+            with self.lock:
+                self.buffer.append(span)
+            logger.debug('Span %s', json.dumps(span._asdict()))
+
+    def spans(self, callback: Optional[str] = None) -> List[Span]:
+        """Buffered spans, oldest first, optionally of one callback."""
+        with self.lock:
+            spans = list(self.buffer)
+        if callback is not None:
+            spans = [span for span in spans if span.callback == callback]
+        return spans
+
+    def register(self, server):
+        """Serve the buffered spans at /traces, filtered by ?callback=."""
+        server.add_url_rule(
+            "/traces",
+            "traces",
+            lambda: jsonify([span._asdict() for span in self.spans(request.args.get("callback"))]),
+        )
+
+
+TRACER = Tracer.from_env(os.environ)
+
+
+def register_tracing(server):
+    TRACER.register(server)
@@ -1,8 +1,33 @@
+import os
 from dash import Dash
 from dash.dependencies import Input, Output, State
 from collections.abc import Iterable, Mapping
-from typing import Callable, List
-from functools import lru_cache
+from datetime import date
+from hashlib import sha256
+from json import dumps
+from typing import Callable, List, Optional
+from logging import getLogger
+
+from chime_dash.app.services.metrics import METRICS
+from chime_dash.app.services.tracing import TRACER
+from penn_chime.model.cache import ResultCache
+
+
+logger = getLogger(__name__)
+
+
+# Outputs of memoized callbacks by callback, arguments and day, shared by every callback
+CALLBACK_CACHE = ResultCache(
+    max_entries=int(os.environ.get("CHIME_CALLBACK_CACHE_SIZE", 128)),
+    max_bytes=int(os.environ.get("CHIME_CALLBACK_CACHE_BYTES", 16 * 2 ** 20)),
+)
+
+
+def canonical_default(value):
+    """Dates as json; other values that json cannot encode are not memoized."""
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot memoize {type(value).__name__} arguments.")
 
 
 class ChimeCallback:
@@ -13,7 +38,8 @@ class ChimeCallback:
                  dom_states: Mapping = None,
                  stores: Iterable = None,
                  states: Mapping = None,
-                 memoize: bool = True
+                 memoize: bool = True,
+                 name: str = None
                  ):
         self.inputs = [
             Input(component_id=component_id, component_property=component_property)
@@ -24,6 +50,15 @@ class ChimeCallback:
         self.states = []
         self.callback_fn = callback_fn
         self.memoize = memoize
+        # Label of the callback's metrics and spans; callback functions are shared between buttons
+        self.name = name or "{}.{}".format(
+            callback_fn.__name__,
+            next(iter(dom_updates or dom_states or changed_elements), ""),
+        )
+        self.input_ids = [
+            "{}.{}".format(component_id, component_property)
+            for component_id, component_property in changed_elements.items()
+        ]
         if dom_updates:
             self.outputs.extend(
                 Output(component_id=component_id, component_property=component_property)
@@ -46,18 +81,54 @@ class ChimeCallback:
                     for component_id, component_property in states.items()
                 )
 
+    def memo_key(self, args, kwargs) -> Optional[str]:
+        """Hash of the callback, its arguments and today, or None if they cannot be memoized.
+
+        Arguments are canonical json, so dicts such as stores and
+        relayoutData are equal whatever the order of their keys. Missing
+        dates of Parameters default to today, so outputs are kept for a
+        day at most.
+        """
+        try:
+            arguments = dumps([args, kwargs], sort_keys=True, default=canonical_default)
+        except (TypeError, ValueError):
+            return None
+        identity = [self.name, [str(output) for output in self.outputs]]
+        return sha256(dumps([identity, arguments, date.today().isoformat()]).encode()).hexdigest()
+
+    def call(self, *args, **kwargs):
+        """Run callback_fn, or return its output for the same arguments if memoized.
+
+        Outputs are shared between calls and must not be changed. An
+        exception, such as PreventUpdate, is never memoized.
+        """
+        key = self.memo_key(args, kwargs) if self.memoize else None
+        if key is None:
+            return self.callback_fn(*args, **kwargs)
+        output = CALLBACK_CACHE.get(key)
+        if output is None:
+            output = self.callback_fn(*args, **kwargs)
+            CALLBACK_CACHE.put(key, output)
+        return output
+
+    def invoke(self, *args, **kwargs):
+        """Run callback_fn, timed for metrics and traced if sampled."""
+        with METRICS.time_callback(self.name), TRACER.span(self.name, self.input_ids) as span:
+            output = self.call(*args, **kwargs)
+            span.set_output(output)
+            return output
+
     def wrap(self, app: Dash):
-        print(f'Registering callback: \nOutputs: \n{self.outputs}, \nInputs:\n{self.inputs}, \nStore: \n{self.stores} \nUsing: {self.callback_fn}\n\n')
-        if self.memoize:
-            @lru_cache(maxsize=32)
-            @app.callback(self.outputs, self.inputs, self.states)
-            def callback_wrapper(*args, **kwargs):
-                print(str(self.callback_fn))
-                return self.callback_fn(*args, **kwargs)
-        else:
-            @app.callback(self.outputs, self.inputs, self.states)
-            def callback_wrapper(*args, **kwargs):
-                return self.callback_fn(*args, **kwargs)
+        logger.debug(
+            'Registering callback %s: outputs %s, inputs %s, states %s',
+            self.name,
+            self.outputs,
+            self.inputs,
+            self.states,
+        )
+        @app.callback(self.outputs, self.inputs, self.states)
+        def callback_wrapper(*args, **kwargs):
+            return self.invoke(*args, **kwargs)
 
 
 __registered_callbacks: List[ChimeCallback] = []
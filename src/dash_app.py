@@ -4,8 +4,17 @@ Config: Environment specific settings are defined in chime_dash/app/config
 change the context argument in create_app to select between 'dev', 'prod',
 and testing environments
 """
+from logging import INFO, basicConfig
+from sys import stdout
+
 from chime_dash import create_app
 
+basicConfig(
+    level=INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    stream=stdout,
+)
+
 ENV, DASH = create_app(context="prod")
 server = DASH.server
 
@@ -1,26 +1,271 @@
-"""Command line interface."""
+"""Command line interface.
+
+Subcommands import their modules when they run. The default run writes
+its tables from numpy columns, so CSV and JSON runs import neither pandas
+nor the view layer.
+"""
 
 import os
 import sys
+from argparse import ArgumentParser, ArgumentTypeError
+from logging import INFO, basicConfig
 
 from .model.parameters import Parameters
-from .model.sir import Sir
+from .model.sir import DTYPES, Sir
+from .output import COLUMNAR_FORMATS, EXTENSIONS, from_frame, get_projections, get_tables, join_tables, write_table
 
 
 def run(argv):
     """Eun cli."""
-    p = Parameters.create(os.environ, argv[1:])
-    m = Sir(p)
+    if argv[1:2] == ["monte-carlo"]:
+        return run_monte_carlo(argv[2:])
+    if argv[1:2] == ["sweep"]:
+        return run_sweep(argv[2:])
+    if argv[1:2] == ["roster"]:
+        return run_roster(argv[2:])
+    if argv[1:2] == ["calibrate"]:
+        return run_calibrate(argv[2:])
+
+    if {"-h", "--help"} & set(argv[1:]):
+        help_parser().print_help()
+        return
+    a, argv = output_parser().parse_known_args(argv[1:])
+    p = Parameters.create(os.environ, argv)
+    write_model(Sir(p), p.current_date, a)
+
+
+def help_parser():
+    """The parameters and the output options, which are parsed apart, in one help."""
+    return ArgumentParser(
+        description=Parameters.parser().description,
+        epilog="Subcommands: monte-carlo, sweep, roster and calibrate; see penn_chime <subcommand> --help.",
+        parents=[Parameters.parser(), output_parser()],
+        add_help=False,
+    )
+
+
+def output_parser():
+    """Options of the files written from a model; the other arguments are its parameters."""
+    parser = ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--format",
+        dest="file_format",
+        choices=tuple(EXTENSIONS),
+        default="csv",
+        help="Format of the output files (feather is arrow); "
+        "parquet and arrow require pip install penn_chime[columnar]",
+    )
+    parser.add_argument("--output-dir", default=".", help="Directory of the output files")
+    parser.add_argument(
+        "--single-file",
+        action="store_true",
+        help="Write every column to one projections file, one row per day "
+        "(roster writes a second one of the system totals)",
+    )
+    return parser
+
+
+def write_tables(tables, prefix, a):
+    """Write each table to {prefix}_{name} as the output options a ask."""
+    os.makedirs(a.output_dir, exist_ok=True)
+    for name, table in tables.items():
+        path = os.path.join(a.output_dir, f"{prefix}_{name}{EXTENSIONS[a.file_format]}")
+        write_table(table, path, a.file_format)
+
+
+def write_model(m: Sir, current_date, a):
+    """Write the tables of m as the output options a ask."""
+    tables = {"projections": get_projections(m)} if a.single_file else get_tables(m)
+    write_tables(tables, current_date, a)
+
+
+def positive_int(string):
+    """Argument type of counts that must be at least 1."""
+    value = int(string)
+    if value < 1:
+        raise ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def monte_carlo_parser():
+    parser = ArgumentParser(
+        prog="penn_chime monte-carlo",
+        description="Percentile bands of admits and census over sampled parameters.",
+        epilog="Other arguments are the model parameters, as for penn_chime.",
+        parents=[output_parser()],
+    )
+    parser.add_argument(
+        "--sample",
+        action="append",
+        default=[],
+        metavar="FIELD=KIND:ARGS",
+        help="Distribution of a parameter, e.g. doubling-time=normal:4,0.5 "
+        "(fixed, uniform, normal, lognormal or triangular)",
+    )
+    parser.add_argument("--draws", type=positive_int, default=1000, help="Number of draws")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument(
+        "--percentiles",
+        type=lambda string: [float(q) for q in string.split(",")],
+        default=None,
+        help="Comma separated percentiles (default 5,25,50,75,95)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default all cores)")
+    parser.add_argument("--precision", choices=DTYPES, default="float64", help="Precision of the projected draws")
+    return parser
+
+
+def run_monte_carlo(argv):
+    """Write percentile bands of admits and census."""
+    from .model.monte_carlo import PERCENTILES, MonteCarlo, parse_samples
+
+    a, argv = monte_carlo_parser().parse_known_args(argv)
+    p = Parameters.create(os.environ, argv)
+    mc = MonteCarlo(
+        p,
+        parse_samples(a.sample),
+        n_draws=a.draws,
+        seed=a.seed,
+        percentiles=a.percentiles or PERCENTILES,
+        max_workers=a.workers,
+        dtype=a.precision,
+    )
+
+    admits, census = from_frame(mc.admits_df), from_frame(mc.census_df)
+    if a.single_file:
+        tables = {"projections": join_tables([admits, census], ("day", "date"))}
+    else:
+        tables = {"projected_admits_bands": admits, "projected_census_bands": census}
+    write_tables(tables, p.current_date, a)
+
+
+def sweep_parser():
+    parser = ArgumentParser(
+        prog="penn_chime sweep",
+        description="Project every scenario of a parameter sweep into one columnar file.",
+        epilog="Other arguments are the base model parameters, as for penn_chime.",
+    )
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE,...",
+        help="Values of a parameter, e.g. doubling-time=3,4,5; scenarios are every combination",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=None,
+        help="CSV file with one scenario per row and one parameter per column",
+    )
+    parser.add_argument("--output", required=True, help="Output file (.parquet, .arrow or .feather)")
+    parser.add_argument(
+        "--format",
+        dest="file_format",
+        choices=COLUMNAR_FORMATS,
+        default=None,
+        help="Format of the output file (default from its extension, else parquet; feather is arrow)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default all cores)")
+    parser.add_argument("--precision", choices=DTYPES, default="float64", help="Precision of the projected columns")
+    return parser
+
+
+def run_sweep(argv):
+    """Write a parameter sweep; exit with an error if any scenario failed."""
+    from .sweep import get_scenarios, parse_grid, read_scenarios, run_sweep as sweep
+
+    a, argv = sweep_parser().parse_known_args(argv)
+    p = Parameters.create(os.environ, argv)
+    rows = read_scenarios(a.scenarios) if a.scenarios is not None else None
+    scenarios = get_scenarios(parse_grid(a.grid), rows)
+
+    errors = sweep(p, scenarios, a.output, a.file_format, a.workers, a.precision)
+    for scenario, error in sorted(errors.items()):
+        print(f"Scenario {scenario} {scenarios[scenario]} failed: {error}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
+def roster_parser():
+    parser = ArgumentParser(
+        prog="penn_chime roster",
+        description="Project every facility of a roster, with system totals.",
+        epilog="Other arguments are the parameters shared by every facility, as for penn_chime.",
+        parents=[output_parser()],
+    )
+    parser.add_argument("roster", help="CSV file with a facility column, or a file of [facility] config blocks")
+    parser.add_argument("--prefix", default="roster", help="Prefix of the output files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default all cores)")
+    return parser
+
+
+def run_roster(argv):
+    """Write per-facility and system census and admits; exit with an error if any facility failed."""
+    from .roster import Roster, create_parameters, get_shared_args, read_roster
+
+    a, argv = roster_parser().parse_known_args(argv)
+    parameters, errors = create_parameters(get_shared_args(os.environ, argv), read_roster(a.roster))
+    roster = Roster(parameters, a.workers, errors)
+
+    if roster.facilities:
+        admits, census = from_frame(roster.admits_df), from_frame(roster.census_df)
+        system_admits, system_census = from_frame(roster.system_admits_df), from_frame(roster.system_census_df)
+        if a.single_file:
+            tables = {
+                "projections": join_tables([admits, census], ("facility", "day", "date")),
+                "system_projections": join_tables([system_admits, system_census], ("date",)),
+            }
+        else:
+            tables = {
+                "projected_admits": admits,
+                "projected_census": census,
+                "system_projected_admits": system_admits,
+                "system_projected_census": system_census,
+            }
+        write_tables(tables, a.prefix, a)
+
+    for facility, error in roster.errors.items():
+        print(f"Facility {facility} failed: {error}", file=sys.stderr)
+    if roster.errors:
+        sys.exit(1)
+
+
+def calibrate_parser():
+    parser = ArgumentParser(
+        prog="penn_chime calibrate",
+        description="Fit doubling time and first hospitalized day to an observed census series.",
+        epilog="Other arguments are the model parameters, as for penn_chime.",
+        parents=[output_parser()],
+    )
+    parser.add_argument("census", help="CSV file with a date column and a census column")
+    parser.add_argument(
+        "--fit-relative-contact-rate",
+        action="store_true",
+        help="Also fit the relative contact rate",
+    )
+    return parser
+
+
+def run_calibrate(argv):
+    """Print the calibrated parameters and write the projections of the calibrated model."""
+    from .model.calibration import Calibration
+
+    a, argv = calibrate_parser().parse_known_args(argv)
+    p = Parameters.create(os.environ, argv)
+    cal = Calibration(p, a.census, fit_relative_contact_rate=a.fit_relative_contact_rate)
+    print(f"doubling_time: {cal.doubling_time:.4f}")
+    print(f"relative_contact_rate: {cal.relative_contact_rate:.4f}")
+    print(f"date_first_hospitalized: {cal.date_first_hospitalized}")
+    print(f"rmse: {cal.rmse:.4f}")
 
-    for df, name in (
-        (m.sim_sir_w_date_df, "sim_sir_w_date"),
-        (m.admits_df, "projected_admits"),
-        (m.census_df, "projected_census"),
-        (m.ppe_df, 'ppe_data')
-    ):
-        df.to_csv(f"{p.current_date}_{name}.csv")
+    write_model(cal.model, p.current_date, a)
 
 
 def main():
     """Main."""
+    basicConfig(
+        level=INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
     run(sys.argv)
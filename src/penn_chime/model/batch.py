@@ -0,0 +1,292 @@
+"""Fit many parameter sets at once.
+
+BatchFit solves the fits Sir makes for one parameter set, i_day from
+doubling_time or doubling_time from date_first_hospitalized, for N
+parameter sets together. Every candidate of every parameter set is a row
+of one batched simulation, and the rejection rules are masks rather than
+early returns. Parameter sets are processed in chunks so that no array
+holds more than max_elements values.
+"""
+
+from __future__ import annotations
+
+from logging import getLogger
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from ..constants import PREFIT_ADDITIONAL_DAYS
+from .parameters import Parameters
+from .sir import (
+    calculate_admits,
+    calculate_census,
+    calculate_dispositions,
+    get_beta,
+    get_growth_rate,
+    get_loss,
+    sim_sir_batch,
+)
+
+
+logger = getLogger(__name__)
+
+
+MAX_ELEMENTS = 2 ** 21
+
+# Candidate doubling times of the coarse grid, and how often it is refined
+DOUBLING_TIMES = np.linspace(1, 15, 15)
+REFINEMENTS = 4
+
+
+class BatchFit:
+    """i_day, doubling_time, beta and beta_t of each of N parameter sets.
+
+    Results match Sir with the "grid" fit strategy. Where Sir gives up,
+    reasonable_model_parameters is False for that parameter set: its
+    doubling time would exceed 15 days, or no i_day keeps the peak at or
+    after the present day (Sir sets i_day to -1 in that case). A refined
+    doubling time at the top of its grid, where Sir raises an IndexError,
+    is also flagged.
+    """
+
+    def __init__(self, parameters: Sequence[Parameters], max_elements: int = MAX_ELEMENTS):
+        self.parameters = ps = list(parameters)
+        self.max_elements = max_elements
+
+        # Seed each parameter set as Sir.seed does
+        self.infected = np.array([1.0 / p.market_share / p.hospitalized.rate for p in ps])
+        self.susceptible = np.array([p.population - infected for p, infected in zip(ps, self.infected)])
+        self.recovered = np.array([float(p.recovered) for p in ps])
+        self.gamma = np.array([1.0 / p.infectious_days for p in ps])
+        self.population = self.susceptible + self.infected + self.recovered
+
+        self.current_hospitalized = np.array([float(p.current_hospitalized) for p in ps])
+        self.hospitalized_rate = np.array([p.hospitalized.rate for p in ps])
+        self.hospitalized_days = np.array([p.hospitalized.days for p in ps])
+        self.market_share = np.array([p.market_share for p in ps])
+        self.relative_contact_rate = np.array([p.relative_contact_rate for p in ps])
+
+        self.reasonable_model_parameters = np.ones(len(ps), "bool")
+        self.i_day = np.zeros(len(ps), "int")
+        self.doubling_time = np.array([
+            np.nan if p.doubling_time is None else float(p.doubling_time)
+            for p in ps
+        ])
+
+        by_doubling_time = []
+        by_first_hospitalized = []
+        for k, p in enumerate(ps):
+            if p.date_first_hospitalized is None and p.doubling_time is not None:
+                by_doubling_time.append(k)
+            elif p.date_first_hospitalized is not None and p.doubling_time is None:
+                by_first_hospitalized.append(k)
+            else:
+                raise AssertionError(
+                    f'Parameter set {k}: doubling_time or date_first_hospitalized must be provided.')
+
+        for ks in self.chunks(by_first_hospitalized, lambda p: len(DOUBLING_TIMES) * (get_total_days(p) + 1)):
+            self.fit_doubling_time(ks)
+
+        self.intrinsic_growth_rate = np.array([get_growth_rate(dt) for dt in self.doubling_time])
+        self.beta = get_beta(self.intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
+        self.beta_t = get_beta(self.intrinsic_growth_rate, self.gamma, self.susceptible, self.relative_contact_rate)
+
+        mitigated = [k for k in by_doubling_time if ps[k].mitigation_date is not None]
+        unmitigated = [k for k in by_doubling_time if ps[k].mitigation_date is None]
+        for ks in self.chunks(mitigated, lambda p: 3 * (p.n_days + PREFIT_ADDITIONAL_DAYS) ** 2):
+            self.fit_i_day(ks)
+        for ks in self.chunks(unmitigated, lambda p: p.n_days + PREFIT_ADDITIONAL_DAYS + 1):
+            self.fit_i_day_unmitigated(ks)
+
+        logger.info(
+            'Fit %s parameter sets; %s reasonable',
+            len(ps),
+            int(self.reasonable_model_parameters.sum()),
+        )
+
+    def __len__(self) -> int:
+        return len(self.parameters)
+
+    def chunks(self, indices: Sequence[int], elements) -> Iterator[np.ndarray]:
+        """Split indices into chunks of about max_elements values per array."""
+        chunk, total = [], 0
+        for k in indices:
+            size = elements(self.parameters[k])
+            if chunk and total + size > self.max_elements:
+                yield np.array(chunk)
+                chunk, total = [], 0
+            chunk.append(k)
+            total += size
+        if chunk:
+            yield np.array(chunk)
+
+    def get_census(self, rows: np.ndarray, raw) -> np.ndarray:
+        """Hospitalized census of batch rows simulated for parameter sets rows."""
+        rates = {"hospitalized": self.hospitalized_rate[rows]}
+        calculate_dispositions(raw, rates, self.market_share[rows])
+        calculate_admits(raw, rates)
+        calculate_census(raw, {"hospitalized": self.hospitalized_days[rows]})
+        return raw["census_hospitalized"]
+
+    def fit_doubling_time(self, ks: np.ndarray):
+        """Fit doubling_time to current_hospitalized on date_first_hospitalized + i_day."""
+        self.i_day[ks] = [(self.parameters[k].current_date - self.parameters[k].date_first_hospitalized).days for k in ks]
+
+        dts = np.tile(DOUBLING_TIMES, (len(ks), 1))
+        min_loss = self.get_doubling_time_losses(ks, dts).argmin(axis=1)
+
+        for _ in range(REFINEMENTS):
+            # Reject minimums at the top of the grid: on the coarse grid the
+            # doubling time is greater than 15 days, and on a refined grid
+            # Sir fails with an IndexError
+            edge = min_loss == len(DOUBLING_TIMES) - 1
+            self.reasonable_model_parameters[ks[edge]] = False
+            ks, dts, min_loss = ks[~edge], dts[~edge], min_loss[~edge]
+            if not len(ks):
+                return
+            candidates = np.arange(len(ks))
+            dts = np.linspace(
+                dts[candidates, min_loss - 1],
+                dts[candidates, min_loss + 1],
+                len(DOUBLING_TIMES),
+                axis=1,
+            )
+            min_loss = self.get_doubling_time_losses(ks, dts).argmin(axis=1)
+        self.doubling_time[ks] = dts[np.arange(len(ks)), min_loss]
+
+    def get_doubling_time_losses(self, ks: np.ndarray, dts: np.ndarray) -> np.ndarray:
+        """Loss of each candidate doubling time, shaped like dts."""
+        rows = np.repeat(ks, dts.shape[1])
+        intrinsic_growth_rate = np.array([get_growth_rate(dt) for dt in dts.ravel()])
+        beta = get_beta(intrinsic_growth_rate, self.gamma[rows], self.susceptible[rows], 0.0)
+        beta_t = get_beta(
+            intrinsic_growth_rate, self.gamma[rows], self.susceptible[rows], self.relative_contact_rate[rows])
+
+        # Candidates run to the longest horizon of the chunk; later days
+        # do not change the census on i_day
+        pre_mitigation_days = np.array([get_pre_mitigation_days(self.parameters[k], self.i_day[k]) for k in rows])
+        total_days = max(get_total_days(self.parameters[k], self.i_day[k]) for k in ks)
+        pre_mitigation_days = np.minimum(pre_mitigation_days, total_days)
+
+        raw = sim_sir_batch(
+            self.susceptible[rows],
+            self.infected[rows],
+            self.recovered[rows],
+            self.gamma[rows],
+            0,
+            [
+                (beta,   pre_mitigation_days),
+                (beta_t, total_days - pre_mitigation_days),
+            ],
+        )
+        census = self.get_census(rows, raw)
+        predicted = census[np.arange(len(rows)), self.i_day[rows]]
+        return get_loss(self.current_hospitalized[rows], predicted).reshape(dts.shape)
+
+    def fit_i_day(self, ks: np.ndarray):
+        """Fit i_day to current_hospitalized when mitigation_date is set.
+
+        One row per parameter set and candidate i_day, as in
+        Sir.get_argmin_i_day: each parameter set's pre-mitigation
+        trajectory is simulated once, and each distinct switch day's
+        post-mitigation segment once.
+        """
+        ps = [self.parameters[k] for k in ks]
+        prefit_days = np.array([p.n_days + PREFIT_ADDITIONAL_DAYS for p in ps])
+        mitigation_day = np.array([-(p.current_date - p.mitigation_date).days for p in ps])
+
+        scenario = np.repeat(np.arange(len(ks)), prefit_days)
+        i_days = np.arange(len(scenario)) - np.repeat(np.cumsum(prefit_days) - prefit_days, prefit_days)
+        total_days = i_days + prefit_days[scenario]
+        pre_mitigation_days = np.clip(i_days + mitigation_day[scenario], 0, total_days)
+        post_mitigation_days = total_days - pre_mitigation_days
+
+        shared_days = int(pre_mitigation_days.max())
+        shared = sim_sir_batch(
+            self.susceptible[ks],
+            self.infected[ks],
+            self.recovered[ks],
+            self.gamma[ks],
+            0,
+            [(self.beta[ks], shared_days)],
+        )
+
+        switches, switch_index = np.unique(
+            scenario * (shared_days + 1) + pre_mitigation_days, return_inverse=True)
+        switch_scenario, switch_days = np.divmod(switches, shared_days + 1)
+        post = sim_sir_batch(
+            shared["susceptible"][switch_scenario, switch_days],
+            shared["infected"][switch_scenario, switch_days],
+            shared["recovered"][switch_scenario, switch_days],
+            self.gamma[ks][switch_scenario],
+            0,
+            [(self.beta_t[ks][switch_scenario], int(post_mitigation_days.max()))],
+            n=self.population[ks][switch_scenario],
+        )
+
+        # Stitch each parameter set's shared prefix onto each candidate's post-mitigation segment
+        days = np.arange(total_days.max() + 1)
+        post_days = np.clip(days - pre_mitigation_days[:, None], 0, post["day"].shape[-1] - 1)
+        ever_infected = np.where(
+            days <= pre_mitigation_days[:, None],
+            shared["ever_infected"][scenario[:, None], np.minimum(days, shared_days)],
+            post["ever_infected"][switch_index[:, None], post_days],
+        )
+        census = self.get_census(ks[scenario], {"day": days, "ever_infected": ever_infected})
+
+        # Don't fit against results that put the peak before the present day
+        census = np.where(days <= total_days[:, None], census, -np.inf)
+        reasonable = census.argmax(axis=1) >= i_days
+
+        losses = np.full((len(ks), prefit_days.max()), np.inf)
+        losses[scenario, i_days] = np.where(
+            reasonable,
+            get_loss(census[np.arange(len(scenario)), i_days], self.current_hospitalized[ks][scenario]),
+            np.inf,
+        )
+        has_reasonable = np.zeros(len(ks), "bool")
+        has_reasonable[scenario[reasonable]] = True
+
+        self.i_day[ks] = np.where(has_reasonable, losses.argmin(axis=1), -1)
+        self.reasonable_model_parameters[ks[~has_reasonable]] = False
+
+    def fit_i_day_unmitigated(self, ks: np.ndarray):
+        """Fit i_day to current_hospitalized before the peak when mitigation_date is not set."""
+        prefit_days = np.array([self.parameters[k].n_days + PREFIT_ADDITIONAL_DAYS for k in ks])
+        raw = sim_sir_batch(
+            self.susceptible[ks],
+            self.infected[ks],
+            self.recovered[ks],
+            self.gamma[ks],
+            0,
+            [(self.beta[ks], int(prefit_days.max()))],
+        )
+        census = self.get_census(ks, raw)
+        days = np.arange(census.shape[-1])
+        census = np.where(days <= prefit_days[:, None], census, -np.inf)
+
+        # By design, this forbids choosing a day after the peak, as get_argmin_ds does
+        peak_day = census.argmax(axis=1)
+        losses = np.where(
+            days < peak_day[:, None],
+            (census - self.current_hospitalized[ks][:, None]) ** 2.0,
+            np.inf,
+        )
+        self.i_day[ks] = np.where(peak_day > 0, losses.argmin(axis=1), -1)
+        self.reasonable_model_parameters[ks[peak_day == 0]] = False
+
+
+def get_pre_mitigation_days(p: Parameters, i_day: int) -> int:
+    """Days before mitigation from the first hospitalized day, as in Sir.get_policy_days."""
+    if p.mitigation_date is not None:
+        mitigation_day = -(p.current_date - p.mitigation_date).days
+    else:
+        mitigation_day = 0
+    return i_day + max(mitigation_day, -i_day)
+
+
+def get_total_days(p: Parameters, i_day: Optional[int] = None) -> int:
+    """Days from the first hospitalized day to the end of the projection."""
+    if i_day is None:
+        i_day = (p.current_date - p.date_first_hospitalized).days
+    return i_day + p.n_days
@@ -0,0 +1,252 @@
+"""Cache of fitted models and other results.
+
+Models are keyed by a fingerprint of the Parameters fields that affect
+results, plus VERSION and CHANGE_DATE so that a release which changes
+results never serves stale entries.
+
+Entries live in an in-process LRU and, optionally, in a directory that
+several worker processes can share. Both are bounded in entries, the
+directory also in bytes, and entries may expire after a number of seconds.
+ResultCache holds any picklable value; the dash app keeps its rendered
+figures and tables in one.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from collections import OrderedDict
+from hashlib import sha256
+from json import dumps
+from logging import getLogger
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+from typing import Any, Dict, Optional
+
+from ..constants import CHANGE_DATE, VERSION
+from .parameters import Parameters
+from .sir import Sir
+
+
+logger = getLogger(__name__)
+
+
+def fingerprint(p: Parameters) -> str:
+    """Stable hash of the model-relevant fields of p and of the release."""
+    fields = p.model_fields()
+    fields["change_date"] = CHANGE_DATE.isoformat()
+    fields["version"] = VERSION
+    return sha256(dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+class DiskStore:
+    """Pickled values in a directory shared by several processes.
+
+    Writes are atomic renames, so readers never see partial files. Entries
+    are evicted oldest-read first once either limit is exceeded, and are
+    removed when read more than max_age seconds after they were written.
+    """
+
+    suffix = ".pickle"
+
+    def __init__(
+        self,
+        directory: str,
+        max_entries: int = 256,
+        max_bytes: int = 256 * 2 ** 20,
+        max_age: Optional[float] = None,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evictions = 0
+        self.expirations = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as fin:
+                # Written with the time it was written
+                created, value = pickle.load(fin)
+            if self.max_age is not None and time() - created > self.max_age:
+                os.remove(path)
+                self.expirations += 1
+                return None
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (EOFError, OSError, TypeError, ValueError, pickle.UnpicklingError) as e:
+            logger.warning('Ignoring unreadable cache entry %s: %s', path, e)
+            return None
+        return value
+
+    def set(self, key: str, value: Any):
+        with NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as fout:
+            try:
+                pickle.dump((time(), value), fout, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                fout.close()
+                os.remove(fout.name)
+                raise
+        os.replace(fout.name, self.path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        count = len(entries)
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            count -= 1
+            size -= entry_size
+
+
+class ResultCache:
+    """In-process LRU of values backed by an optional DiskStore."""
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str], name: Optional[str] = None) -> ResultCache:
+        """Configure from CHIME_CACHE_SIZE, CHIME_CACHE_DIR, CHIME_CACHE_BYTES and CHIME_CACHE_TTL.
+
+        A named cache keeps its entries in a subdirectory of CHIME_CACHE_DIR.
+        """
+        directory = env.get("CHIME_CACHE_DIR")
+        max_age = float(env["CHIME_CACHE_TTL"]) if env.get("CHIME_CACHE_TTL") else None
+        store = None
+        if directory:
+            store = DiskStore(
+                os.path.join(directory, name) if name else directory,
+                max_bytes=int(env.get("CHIME_CACHE_BYTES", 256 * 2 ** 20)),
+                max_age=max_age,
+            )
+        return cls(
+            max_entries=int(env.get("CHIME_CACHE_SIZE", 32)),
+            store=store,
+            max_age=max_age,
+        )
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        store: Optional[DiskStore] = None,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """max_bytes bounds the pickled size of the entries kept in memory; values are only pickled if set."""
+        self.max_entries = max_entries
+        self.store = store
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        # Key to the time it was put, the value and its pickled size
+        self.entries: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.lock = Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                created, value, size = entry
+                if self.max_age is None or time() - created <= self.max_age:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.bytes -= size
+                self.expirations += 1
+
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self.put(key, value, persist=False)
+                return value
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any, persist: bool = True):
+        size = 0
+        if self.max_bytes is not None:
+            try:
+                size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                logger.debug('Not caching unpicklable value of %s: %s', key, e)
+                return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            # A value larger than the whole cache is not kept
+            if self.max_bytes is None or size <= self.max_bytes:
+                self.entries[key] = (time(), value, size)
+                self.bytes += size
+            while len(self.entries) > self.max_entries or (
+                    self.max_bytes is not None and self.bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        if persist and self.store is not None:
+            self.store.set(key, value)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_evictions": self.store.evictions if self.store is not None else 0,
+            "expirations": self.expirations + (self.store.expirations if self.store is not None else 0),
+        }
+
+
+class ModelCache(ResultCache):
+    """Sir models by the fingerprint of their parameters."""
+
+    def get_or_create(self, p: Parameters) -> Sir:
+        """Return the model for p, fitting it only on a miss.
+
+        A miss is rebuilt from the most recently used model, so changes
+        that do not affect the fit skip it.
+        """
+        key = fingerprint(p)
+        model = self.get(key)
+        if model is None:
+            with self.lock:
+                previous = next(reversed(self.entries.values()), None)
+            model = Sir(p) if previous is None else Sir.rebuild(previous[1], p)
+            self.put(key, model)
+        return model
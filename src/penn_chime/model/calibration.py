@@ -0,0 +1,202 @@
+"""Calibration to an observed census series.
+
+Sir fits one number, current_hospitalized, on one day. Calibration fits
+doubling_time, i_day and optionally relative_contact_rate to a series of
+daily hospitalized census by minimizing the mean squared error over the
+whole series.
+
+Each round simulates every (doubling_time, relative_contact_rate) pair of
+a grid as one batch. Every candidate i_day shares the simulation of its
+mitigation day, so the loss of every (doubling_time,
+relative_contact_rate, i_day) candidate is read off the batch at once.
+Later rounds refine the grid around the best candidate.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from logging import getLogger
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .parameters import Parameters
+from .sir import (
+    Sir,
+    calculate_admits,
+    calculate_census,
+    calculate_dispositions,
+    get_beta,
+    get_growth_rate,
+    memoized_property,
+    sim_sir_batch,
+)
+
+
+logger = getLogger(__name__)
+
+
+# Candidates of the first round; each later round refines the grid around the best
+DOUBLING_TIMES = np.linspace(1, 15, 15)
+RELATIVE_CONTACT_RATES = np.linspace(0.0, 0.9, 10)
+REFINEMENTS = 3
+REFINED_POINTS = 9
+
+# Latest first hospitalized day considered, in days before current_date
+MAX_I_DAY = 120
+
+# Accepted names of the census column of an observed series
+CENSUS_COLUMNS = ("census", "census_hospitalized", "hospitalized")
+
+
+def read_census(source: Union[str, pd.DataFrame]) -> pd.DataFrame:
+    """Observed census by date from a csv file or data frame.
+
+    Expects a date column and a census, census_hospitalized or
+    hospitalized column. Days without a census are dropped.
+    """
+    df = pd.read_csv(source) if isinstance(source, str) else source
+    column = next((column for column in CENSUS_COLUMNS if column in df.columns), None)
+    if "date" not in df.columns or column is None:
+        raise ValueError(f"The census series needs a date column and one of {CENSUS_COLUMNS}.")
+    observed = pd.DataFrame({
+        "date": pd.to_datetime(df["date"]),
+        "census": df[column].astype("float"),
+    })
+    observed = observed.dropna().sort_values("date").reset_index(drop=True)
+    if observed.empty:
+        raise ValueError("The census series is empty.")
+    return observed
+
+
+class Calibration:
+    """Fit doubling_time, i_day and optionally relative_contact_rate to a census series."""
+
+    def __init__(
+        self,
+        p: Parameters,
+        observed: Union[str, pd.DataFrame],
+        fit_relative_contact_rate: bool = False,
+        max_i_day: int = MAX_I_DAY,
+    ):
+        self.p = p
+        self.observed = read_census(observed)
+        self.offsets = (self.observed["date"] - pd.Timestamp(p.current_date)).dt.days.values
+        self.census = self.observed["census"].values
+        self.i_days = np.arange(max(0, -self.offsets.min()), max_i_day + 1)
+        if not len(self.i_days):
+            raise ValueError(f"The census series starts more than {max_i_day} days before current_date.")
+
+        # Seed as Sir.seed does
+        self.infected = 1.0 / p.market_share / p.hospitalized.rate
+        self.susceptible = p.population - self.infected
+        self.recovered = float(p.recovered)
+        self.gamma = 1.0 / p.infectious_days
+
+        if p.mitigation_date is not None:
+            self.mitigation_day = -(p.current_date - p.mitigation_date).days
+        else:
+            self.mitigation_day = None
+
+        dts = DOUBLING_TIMES
+        rcrs = RELATIVE_CONTACT_RATES if fit_relative_contact_rate else np.array([p.relative_contact_rate])
+        self.fit_evaluations = 0
+        for refinement in range(REFINEMENTS + 1):
+            losses = self.get_losses(dts, rcrs)
+            a, b, i = np.unravel_index(losses.argmin(), losses.shape)
+            self.doubling_time = float(dts[a])
+            self.relative_contact_rate = float(rcrs[b])
+            self.i_day = int(self.i_days[i])
+            self.loss = float(losses[a, b, i])
+
+            dts = refine(dts, a, REFINED_POINTS)
+            if fit_relative_contact_rate:
+                rcrs = refine(rcrs, b, REFINED_POINTS)
+
+        logger.info(
+            'Calibrated doubling_time: %s; relative_contact_rate: %s; i_day: %s; rmse: %s; evaluations: %s',
+            self.doubling_time,
+            self.relative_contact_rate,
+            self.i_day,
+            self.rmse,
+            self.fit_evaluations,
+        )
+
+    @property
+    def rmse(self) -> float:
+        return float(np.sqrt(self.loss))
+
+    @property
+    def date_first_hospitalized(self):
+        return self.p.current_date - timedelta(days=self.i_day)
+
+    @memoized_property
+    def parameters(self) -> Parameters:
+        """p with the calibrated doubling_time and relative_contact_rate."""
+        return self.p.replace(
+            date_first_hospitalized=None,
+            doubling_time=self.doubling_time,
+            relative_contact_rate=self.relative_contact_rate,
+        )
+
+    @memoized_property
+    def model(self) -> Sir:
+        """Projection of the calibrated parameters from the calibrated i_day."""
+        return Sir.from_i_day(self.parameters, self.i_day)
+
+    def get_losses(self, dts: np.ndarray, rcrs: np.ndarray) -> np.ndarray:
+        """Mean squared error of every candidate, shaped (doubling_time, relative_contact_rate, i_day)."""
+        self.fit_evaluations += len(dts) * len(rcrs) * len(self.i_days)
+        intrinsic_growth_rate = np.array([get_growth_rate(dt) for dt in dts])
+        beta = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
+        beta_t = get_beta(intrinsic_growth_rate[:, None], self.gamma, self.susceptible, rcrs[None, :])
+
+        # Candidate i_day reads days i_day + offsets, switching to beta_t on its mitigation day
+        total_days = int(self.i_days[-1] + max(self.offsets.max(), 0))
+        if self.mitigation_day is None:
+            switch = np.full(len(self.i_days), total_days)
+        else:
+            switch = np.clip(self.i_days + self.mitigation_day, 0, total_days)
+        switch_days, switch_index = np.unique(switch, return_inverse=True)
+
+        shared_days = int(switch_days.max())
+        shared = sim_sir_batch(
+            self.susceptible, self.infected, self.recovered, self.gamma, 0, [(beta, shared_days)])
+
+        # One post-mitigation segment per (doubling_time, relative_contact_rate, switch day)
+        a, b, m = (index.ravel() for index in np.meshgrid(
+            np.arange(len(dts)), np.arange(len(rcrs)), np.arange(len(switch_days)), indexing="ij"))
+        post = sim_sir_batch(
+            shared["susceptible"][a, switch_days[m]],
+            shared["infected"][a, switch_days[m]],
+            shared["recovered"][a, switch_days[m]],
+            self.gamma,
+            0,
+            [(beta_t[a, b], total_days - int(switch_days.min()))],
+            n=self.susceptible + self.infected + self.recovered,
+        )
+
+        days = np.arange(total_days + 1)
+        post_days = np.clip(days - switch_days[m][:, None], 0, post["day"].shape[-1] - 1)
+        ever_infected = np.where(
+            days <= switch_days[m][:, None],
+            shared["ever_infected"][a[:, None], np.minimum(days, shared_days)],
+            post["ever_infected"][np.arange(len(m))[:, None], post_days],
+        )
+        raw = {"day": days, "ever_infected": ever_infected}
+        rates = {"hospitalized": self.p.hospitalized.rate}
+        calculate_dispositions(raw, rates, self.p.market_share)
+        calculate_admits(raw, rates)
+        calculate_census(raw, {"hospitalized": self.p.hospitalized.days})
+        census = raw["census_hospitalized"].reshape(len(dts), len(rcrs), len(switch_days), -1)
+
+        predicted = census[:, :, switch_index[:, None], self.i_days[:, None] + self.offsets[None, :]]
+        return ((predicted - self.census) ** 2.0).mean(axis=-1)
+
+
+def refine(grid: np.ndarray, index: int, points: int) -> np.ndarray:
+    """A finer grid between the neighbours of grid[index]."""
+    lower = grid[max(index - 1, 0)]
+    upper = grid[min(index + 1, len(grid) - 1)]
+    return np.linspace(lower, upper, points)
@@ -0,0 +1,266 @@
+"""Monte Carlo uncertainty bands.
+
+Draws doubling_time, relative_contact_rate and the disposition rates and
+lengths of stay from user-specified distributions, projects every draw as
+one vectorized batch and reduces the batch to per-day percentile bands of
+admits and census.
+
+Every draw starts from the seed and i_day of the base Sir model, so the
+bands show the spread of outcomes after the same estimated first
+hospitalized day.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..constants import EPSILON
+from .parameters import Parameters, get_field
+from .sir import (
+    Sir,
+    calculate_admits,
+    calculate_census,
+    calculate_dispositions,
+    get_beta,
+    get_growth_rate,
+    memoized_property,
+    sim_sir_batch,
+)
+
+
+logger = getLogger(__name__)
+
+
+# Parameters that may be sampled, and the range draws are clipped to
+SAMPLED_FIELDS = {
+    "doubling_time": (EPSILON, None),
+    "relative_contact_rate": (0.0, 1.0),
+    "hospitalized_rate": (EPSILON, 1.0),
+    "hospitalized_days": (1, None),
+    "icu_rate": (0.0, 1.0),
+    "icu_days": (1, None),
+    "ventilated_rate": (0.0, 1.0),
+    "ventilated_days": (1, None),
+}
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Draws per batch; larger runs are split across a process pool
+CHUNK_SIZE = 10000
+
+
+class Distribution(namedtuple("Distribution", ("kind", "args"))):
+    """A named distribution and its arguments, e.g. normal(4.0, 0.5).
+
+    fixed(value), uniform(low, high), normal(mean, sd),
+    lognormal(mean, sigma) of the underlying normal, and
+    triangular(low, mode, high).
+    """
+
+    ARITY = {
+        "fixed": 1,
+        "uniform": 2,
+        "normal": 2,
+        "lognormal": 2,
+        "triangular": 3,
+    }
+
+    @classmethod
+    def create(cls, kind: str, *args: float) -> Distribution:
+        if kind not in cls.ARITY:
+            raise ValueError(f"Distribution must be one of {tuple(cls.ARITY)}.")
+        if len(args) != cls.ARITY[kind]:
+            raise ValueError(f"{kind} takes {cls.ARITY[kind]} arguments.")
+        return cls(kind, tuple(float(arg) for arg in args))
+
+    @classmethod
+    def parse(cls, string: str) -> Distribution:
+        """Parse kind:arg,... such as normal:4,0.5."""
+        kind, _, args = string.partition(":")
+        return cls.create(kind, *(arg for arg in args.split(",") if arg))
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.kind == "fixed":
+            return np.full(size, self.args[0])
+        return getattr(rng, self.kind)(*self.args, size=size)
+
+
+def parse_samples(strings: Sequence[str]) -> Dict[str, Distribution]:
+    """Parse field=kind:arg,... strings, as given on the command line."""
+    distributions = {}
+    for string in strings:
+        key, _, distribution = string.partition("=")
+        key = key.replace("-", "_")
+        if key not in SAMPLED_FIELDS:
+            raise ValueError(f"Cannot sample {key}; expected one of {tuple(SAMPLED_FIELDS)}.")
+        distributions[key] = Distribution.parse(distribution)
+    return distributions
+
+
+# State shared by every draw: the seed, i_day and policy days of the base model
+Anchor = namedtuple("Anchor", (
+    "susceptible",
+    "infected",
+    "recovered",
+    "gamma",
+    "i_day",
+    "pre_mitigation_days",
+    "post_mitigation_days",
+    "market_share",
+    "dtype",
+))
+
+
+class MonteCarlo:
+    """Percentile bands of admits and census over sampled parameters.
+
+    Fields without a distribution keep the value of p; in particular a
+    doubling_time fitted to date_first_hospitalized is held fixed unless
+    it is sampled. With dtype float32 every draw is projected in float32;
+    the base model is still fit in float64.
+    """
+
+    def __init__(
+        self,
+        p: Parameters,
+        distributions: Dict[str, Distribution],
+        n_draws: int = 1000,
+        seed: Optional[int] = None,
+        percentiles: Sequence[float] = PERCENTILES,
+        max_workers: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        model: Optional[Sir] = None,
+        dtype: str = "float64",
+    ):
+        if n_draws < 1:
+            raise ValueError(f"n_draws must be at least 1, not {n_draws}.")
+        unknown = set(distributions) - set(SAMPLED_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot sample {sorted(unknown)}.")
+
+        self.model = model = Sir(p, dtype=dtype) if model is None else model
+        if not model.reasonable_model_parameters:
+            raise ValueError("The base model parameters are not reasonable.")
+
+        self.n_draws = n_draws
+        self.percentiles = tuple(percentiles)
+        self.keys = tuple(model.rates)
+        self.current_date = p.current_date
+        self.draws = self.sample(p, distributions, np.random.default_rng(seed))
+
+        pre_mitigation_days, post_mitigation_days = model.get_policy_days(p)
+        anchor = Anchor(
+            model.raw["susceptible"][0],
+            model.raw["infected"][0],
+            model.raw["recovered"][0],
+            model.gamma,
+            model.i_day,
+            pre_mitigation_days,
+            post_mitigation_days,
+            p.market_share,
+            dtype,
+        )
+        chunks = [
+            {key: values[start:start + chunk_size] for key, values in self.draws.items()}
+            for start in range(0, n_draws, chunk_size)
+        ]
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = min(max_workers, len(chunks))
+        logger.info('Projecting %s draws in %s chunks on %s workers', n_draws, len(chunks), max_workers)
+
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(project_draws, [anchor] * len(chunks), chunks))
+        else:
+            results = [project_draws(anchor, chunk) for chunk in chunks]
+
+        self.day = model.raw["day"]
+        self.bands = {
+            key: get_bands(np.concatenate([result[key] for result in results]), self.percentiles)
+            for key in results[0]
+        }
+
+    def sample(
+        self, p: Parameters, distributions: Dict[str, Distribution], rng: np.random.Generator,
+    ) -> Dict[str, np.ndarray]:
+        """Draw every sampled field, in a fixed order so runs are reproducible by seed."""
+        draws = {}
+        for key, (lower, upper) in SAMPLED_FIELDS.items():
+            distribution = distributions.get(key)
+            if distribution is None:
+                # A doubling_time fitted to date_first_hospitalized is only on the model
+                value = self.model.doubling_time if key == "doubling_time" else get_field(p, key)
+                values = np.full(self.n_draws, float(value))
+            else:
+                values = np.clip(distribution.sample(rng, self.n_draws), lower, upper)
+            if key.endswith("_days"):
+                values = np.rint(values).astype("int")
+            draws[key] = values
+        return draws
+
+    def to_frame(self, prefix: str) -> pd.DataFrame:
+        df = pd.DataFrame({
+            "day": self.day,
+            "date": self.day.astype("timedelta64[D]") + np.datetime64(self.current_date),
+        })
+        for key in self.keys:
+            for percentile, band in zip(self.percentiles, self.bands[prefix + key]):
+                df[f"{prefix}{key}_p{percentile:g}"] = band
+        return df
+
+    @memoized_property
+    def admits_df(self) -> pd.DataFrame:
+        return self.to_frame("admits_")
+
+    @memoized_property
+    def census_df(self) -> pd.DataFrame:
+        return self.to_frame("census_")
+
+
+def project_draws(anchor: Anchor, draws: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Admits and census of each draw, shaped (draw, day)."""
+    intrinsic_growth_rate = np.array([get_growth_rate(dt) for dt in draws["doubling_time"]])
+    beta = get_beta(intrinsic_growth_rate, anchor.gamma, anchor.susceptible, 0.0)
+    beta_t = get_beta(intrinsic_growth_rate, anchor.gamma, anchor.susceptible, draws["relative_contact_rate"])
+
+    raw = sim_sir_batch(
+        anchor.susceptible,
+        anchor.infected,
+        anchor.recovered,
+        anchor.gamma,
+        -anchor.i_day,
+        [
+            (beta,   anchor.pre_mitigation_days),
+            (beta_t, anchor.post_mitigation_days),
+        ],
+        dtype=anchor.dtype,
+    )
+    keys = ("hospitalized", "icu", "ventilated")
+    rates = {key: draws[key + "_rate"] for key in keys}
+    calculate_dispositions(raw, rates, anchor.market_share)
+    calculate_admits(raw, rates)
+    calculate_census(raw, {key: draws[key + "_days"] for key in keys})
+    return {
+        prefix + key: raw[prefix + key]
+        for prefix in ("admits_", "census_")
+        for key in keys
+    }
+
+
+def get_bands(values: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """Percentiles across draws, shaped (percentile, day).
+
+    The first day of admits is undefined, so its bands are too.
+    """
+    bands = np.full((len(percentiles), values.shape[-1]), np.nan)
+    defined = ~np.isnan(values).any(axis=0)
+    bands[:, defined] = np.percentile(values[:, defined], percentiles, axis=0)
+    return bands
@@ -5,14 +5,14 @@ constants.py `change_date``.
 """
 
 from __future__ import annotations
-import i18n
 
 from argparse import ArgumentParser
 from collections import namedtuple
 from datetime import date, datetime
-from logging import INFO, basicConfig, getLogger
-from sys import stdout
-from typing import Dict, List
+from hashlib import sha256
+from json import dumps
+from logging import getLogger
+from typing import Any, Dict, List
 
 from ..constants import (
     CHANGE_DATE,
@@ -31,11 +31,6 @@ from .validators import (
 )
 
 
-basicConfig(
-    level=INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    stream=stdout,
-)
 logger = getLogger(__name__)
 
 
@@ -141,6 +136,63 @@ VALIDATORS = {
 }
 
 
+# Fields that affect the model results
+MODEL_FIELDS = (
+    "current_date",
+    "current_hospitalized",
+    "date_first_hospitalized",
+    "doubling_time",
+    "hospitalized",
+    "icu",
+    "infectious_days",
+    "market_share",
+    "mitigation_date",
+    "n_days",
+    "population",
+    "recovered",
+    "relative_contact_rate",
+    "ventilated",
+)
+
+
+def canonical(value: Any) -> Any:
+    """Reduce a parameter value to a canonical json value."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, tuple):
+        return [canonical(v) for v in value]
+    return repr(float(value))
+
+
+def get_field(p: Parameters, key: str):
+    """Value of a field on p, named as an argument of replace, e.g. hospitalized_days is p.hospitalized.days."""
+    disposition, _, attribute = key.rpartition("_")
+    if disposition in p.dispositions:
+        return getattr(p.dispositions[disposition], attribute)
+    return getattr(p, key)
+
+
+def get_labels() -> Dict[str, str]:
+    """Translated column labels in the current locale."""
+    import i18n
+
+    return {
+        "admits_hospitalized": i18n.t("admits_hospitalized"),
+        "admits_icu": i18n.t("admits_icu"),
+        "admits_ventilated": i18n.t("admits_ventilated"),
+        "census_hospitalized": i18n.t("census_hospitalized"),
+        "census_icu": i18n.t("census_icu"),
+        "census_ventilated": i18n.t("census_ventilated"),
+        "day": i18n.t("day"),
+        "date": i18n.t("date"),
+        "susceptible": i18n.t("susceptible"),
+        "infected": i18n.t("infected"),
+        "recovered": i18n.t("recovered")
+    }
+
+
 HELP = {
     "current_hospitalized": "Currently hospitalized COVID-19 patients (>= 0)",
     "current_date": "Date on which the projection should be based (default is today)",
@@ -445,22 +497,96 @@ class Parameters:
         Date(key='current_date', value=self.current_date)
         Date(key='mitigation_date', value=self.mitigation_date)
 
-        self.labels = {
-            "admits_hospitalized": i18n.t("admits_hospitalized"),
-            "admits_icu": i18n.t("admits_icu"),
-            "admits_ventilated": i18n.t("admits_ventilated"),
-            "census_hospitalized": i18n.t("census_hospitalized"),
-            "census_icu": i18n.t("census_icu"),
-            "census_ventilated": i18n.t("census_ventilated"),
-            "day": i18n.t("day"),
-            "date": i18n.t("date"),
-            "susceptible" :i18n.t("susceptible"),
-            "infected": i18n.t("infected"),
-            "recovered": i18n.t("recovered")
-        }
-
         self.dispositions = {
             "hospitalized": self.hospitalized,
             "icu": self.icu,
             "ventilated": self.ventilated,
         }
+
+    @property
+    def labels(self) -> Dict[str, str]:
+        """Translated column labels in the current locale."""
+        return get_labels()
+
+    def model_fields(self) -> Dict[str, Any]:
+        """Canonical json values of the fields that affect the model results."""
+        return {key: canonical(getattr(self, key)) for key in MODEL_FIELDS}
+
+    def fingerprint(self) -> str:
+        """Stable hash of the fields that affect the model results.
+
+        Equal for parameters that give the same model, whether numbers are
+        ints, floats or numpy scalars, in every process and session.
+        """
+        return sha256(dumps(self.model_fields(), sort_keys=True).encode()).hexdigest()
+
+    def freeze(self) -> FrozenParameters:
+        """Immutable, hashable copy."""
+        return FrozenParameters(**{key: getattr(self, key) for key in VALIDATORS})
+
+    def replace(self, **changes) -> Parameters:
+        """Copy with some fields replaced and validated.
+
+        The rate or days of a disposition may be replaced on their own,
+        e.g. icu_days=10.
+        """
+        kwargs = {key: getattr(self, key) for key in VALIDATORS}
+        for key, value in changes.items():
+            disposition, _, attribute = key.rpartition("_")
+            if disposition in self.dispositions and attribute in Disposition._fields:
+                kwargs[disposition] = Disposition.create(**{
+                    **kwargs[disposition]._asdict(),
+                    attribute: value,
+                })
+            elif key in VALIDATORS:
+                kwargs[key] = value
+            else:
+                raise ValueError(f"Unexpected parameter {key}")
+        return self.__class__(**kwargs)
+
+
+class FrozenParameters(Parameters):
+    """Parameters that cannot be changed once built.
+
+    Safe to share between threads and processes and to use as a cache key:
+    hashed by fingerprint, and equal when every field is equal. replace
+    returns a new frozen copy.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Setting the fingerprint freezes the object
+        object.__setattr__(self, "_fingerprint", super().fingerprint())
+
+    def __setattr__(self, key: str, value: Any):
+        if "_fingerprint" in self.__dict__:
+            raise AttributeError(f"Cannot set {key} of frozen parameters; use replace.")
+        super().__setattr__(key, value)
+
+    def __delattr__(self, key: str):
+        raise AttributeError(f"Cannot delete {key} of frozen parameters.")
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, FrozenParameters):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in VALIDATORS)
+
+    def __hash__(self) -> int:
+        return hash(self._fingerprint)
+
+    def fingerprint(self) -> str:
+        return self._fingerprint
+
+    def freeze(self) -> FrozenParameters:
+        return self
+
+
+def cast_arg(name: str, string: str):
+    """Cast and validate a command line value of the parameter name."""
+    for arg, cast, min_value, max_value, required in ARGS:
+        if arg.replace('-', '_') != name:
+            continue
+        if cast == bool:
+            return string.lower() in ('1', 'true', 'yes')
+        return validator(to_cli(arg), cast, min_value, max_value, required)(string)
+    raise ValueError(f"Unexpected parameter {name}")
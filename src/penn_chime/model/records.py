@@ -0,0 +1,158 @@
+"""Lightweight parameter records for batch mode.
+
+Parameters validates every field of every object as it is built, so a
+sweep of 100k scenarios runs the validators millions of times although
+the scenarios share one validated base and differ in a few fields.
+
+ParameterRecord is a __slots__ record with the fields and the read API
+the models use. ParameterRecord.create_batch builds one record per row
+of columns of changed fields, and validates each column once, as an
+array. ParameterRecord.create_valid instead leaves the invalid rows out
+and returns their errors, so a sweep drops them before any model runs.
+Labels are translated only when read.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .parameters import VALIDATORS, Disposition, Parameters
+from .validators import ArrayValidation, GteOne, Rate, validate_columns
+
+
+# Fields of a record, as those of Parameters
+FIELDS = tuple(VALIDATORS)
+
+# Rows named in the message of an invalid batch
+MAX_ROWS_SHOWN = 5
+
+
+class ParameterRecord:
+    """Parameters of one row of a batch, built without validation.
+
+    Use ParameterRecord.create_batch, which validates the batch, or
+    from_parameters. Sir, BatchFit and ModelCache accept records in place
+    of Parameters.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, **kwargs):
+        for key in FIELDS:
+            setattr(self, key, kwargs.get(key))
+
+    @property
+    def dispositions(self) -> Dict[str, Disposition]:
+        return {
+            "hospitalized": self.hospitalized,
+            "icu": self.icu,
+            "ventilated": self.ventilated,
+        }
+
+    # Only read attributes, so they serve records as well
+    labels = Parameters.labels
+    model_fields = Parameters.model_fields
+    fingerprint = Parameters.fingerprint
+
+    @classmethod
+    def from_parameters(cls, p: Parameters) -> ParameterRecord:
+        return cls(**{key: getattr(p, key) for key in FIELDS})
+
+    def to_parameters(self) -> Parameters:
+        """Validated Parameters of the record."""
+        return Parameters(**{key: getattr(self, key) for key in FIELDS})
+
+    @classmethod
+    def create_batch(cls, base: Parameters, columns: Dict[str, Sequence[Any]]) -> List[ParameterRecord]:
+        """One record per row of columns; other fields are those of base.
+
+        Columns are named as the arguments of Parameters.replace, so the
+        rate or days of a disposition may change on their own, e.g.
+        icu_days. Each column is validated once; a ValueError names the
+        invalid rows.
+        """
+        validation = validate_batch(base, columns)
+        if not validation.valid.all():
+            raise ValueError(describe_errors(validation.errors))
+        return cls.from_columns(base, columns)
+
+    @classmethod
+    def create_valid(
+        cls, base: Parameters, columns: Dict[str, Sequence[Any]],
+    ) -> Tuple[Dict[int, ParameterRecord], Dict[int, str]]:
+        """Records of the valid rows and the errors of the invalid ones, by row."""
+        validation = validate_batch(base, columns)
+        rows = np.flatnonzero(validation.valid)
+        records = cls.from_columns(base, {key: take(column, rows) for key, column in columns.items()})
+        return dict(zip(rows.tolist(), records)), validation.errors
+
+    @classmethod
+    def from_columns(cls, base: Parameters, columns: Dict[str, Sequence[Any]]) -> List[ParameterRecord]:
+        """One record per row of columns, without validation."""
+        n = len(next(iter(columns.values()))) if columns else 0
+        values = {key: [getattr(base, key)] * n for key in FIELDS}
+        dispositions: Dict[str, Dict[str, List[Any]]] = {}
+        for key, column in columns.items():
+            disposition, _, attribute = key.rpartition("_")
+            if disposition in base.dispositions and attribute in Disposition._fields:
+                dispositions.setdefault(disposition, {})[attribute] = to_list(column)
+            else:
+                values[key] = to_list(column)
+
+        for disposition, changed in dispositions.items():
+            default = values[disposition]
+            days = changed.get("days", [value.days for value in default])
+            rate = changed.get("rate", [value.rate for value in default])
+            values[disposition] = [Disposition(*row) for row in zip(days, rate)]
+
+        today = date.today()
+        for key in ("current_date", "mitigation_date"):
+            if key in columns:
+                # Defaulted as Parameters does
+                values[key] = [today if value is None else value for value in values[key]]
+
+        # Set column by column through the slot descriptors, skipping __init__
+        records = [object.__new__(cls) for _ in range(n)]
+        for key in FIELDS:
+            set_value = getattr(cls, key).__set__
+            for record, value in zip(records, values[key]):
+                set_value(record, value)
+        return records
+
+
+def validate_batch(base: Parameters, columns: Dict[str, Sequence[Any]]) -> ArrayValidation:
+    """Check columns of changed fields at once: the mask of valid rows, and the errors of the others.
+
+    The days and rate of a disposition are checked as Disposition.create
+    checks its arguments.
+    """
+    validators = {}
+    for key in columns:
+        disposition, _, attribute = key.rpartition("_")
+        if disposition in base.dispositions and attribute in Disposition._fields:
+            validators[key] = GteOne if attribute == "days" else Rate
+        elif key in VALIDATORS:
+            validators[key] = VALIDATORS[key]
+        else:
+            raise ValueError(f"Unexpected parameter {key}")
+    return validate_columns(validators, columns)
+
+
+def describe_errors(errors: Dict[int, str]) -> str:
+    """Message of the first invalid rows."""
+    shown = " ".join(f"Row {row}: {error}" for row, error in list(errors.items())[:MAX_ROWS_SHOWN])
+    more = f" And {len(errors) - MAX_ROWS_SHOWN} more rows." if len(errors) > MAX_ROWS_SHOWN else ""
+    return f"Invalid parameters in {len(errors)} rows. {shown}{more}"
+
+
+def to_list(column: Sequence[Any]) -> List[Any]:
+    return column.tolist() if isinstance(column, np.ndarray) else list(column)
+
+
+def take(column: Sequence[Any], rows: np.ndarray) -> Sequence[Any]:
+    if isinstance(column, np.ndarray):
+        return column[rows]
+    return [column[row] for row in rows.tolist()]
@@ -6,30 +6,376 @@ constants.py `change_date`,
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from logging import INFO, basicConfig, getLogger
-from sys import stdout
-from typing import Dict, Tuple, Sequence, Optional
+from contextlib import contextmanager, nullcontext
+from copy import copy
+from datetime import timedelta
+from functools import wraps
+from logging import getLogger
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple, Sequence, Optional
 
 import numpy as np
-import pandas as pd
 
 from ..constants import PREFIT_ADDITIONAL_DAYS
-from .parameters import Parameters
+from .parameters import MODEL_FIELDS, Parameters
+
+
+if TYPE_CHECKING:
+    # Data frames are built on first read; runs that only read raw never import pandas
+    import pandas as pd
 
 
-basicConfig(
-    level=INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    stream=stdout,
-)
 logger = getLogger(__name__)
 
 
+# Parameters read by the fit. Fits by doubling_time also read n_days.
+FIT_INPUTS = (
+    "current_date",
+    "current_hospitalized",
+    "date_first_hospitalized",
+    "doubling_time",
+    "hospitalized",
+    "infectious_days",
+    "market_share",
+    "mitigation_date",
+    "population",
+    "recovered",
+    "relative_contact_rate",
+)
+
+# Strategies for fitting doubling_time to date_first_hospitalized:
+#   grid: refine a 15 point grid four times, each level simulated as one batch
+#   golden: golden-section search inside the bracket found by the coarse grid
+FIT_STRATEGIES = ("grid", "golden")
+
+# Precisions of projected arrays. float32 halves the memory and bandwidth
+# of large batches; fits always run in float64 so both precisions project
+# the same i_day and doubling_time. On the tests/by_* cases every float32
+# column stays within FLOAT32_RTOL of its float64 peak
+# (see tests/penn_chime/model/test_sir.py).
+DTYPES = ("float64", "float32")
+FLOAT32_RTOL = 1.0e-5
+
+
+class memoized_property:
+    """Property computed on first access and then stored on the instance."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.name = fn.__name__
+        self.__doc__ = fn.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.fn(instance)
+        return value
+
+
+class Stats:
+    """Durations, calls and array sizes of the phases of one Sir run.
+
+    phases maps each phase, such as fit_i_day, projection or
+    frame_census_df, to its total seconds, its calls and the elements of
+    the arrays it built. The calls of projection count run_projection.
+    Each finished phase is passed to the stats sink.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    def get(self, name: str) -> Dict[str, Any]:
+        record = self.phases.get(name)
+        if record is None:
+            record = self.phases[name] = {"seconds": 0.0, "calls": 0, "elements": 0}
+        return record
+
+    @contextmanager
+    def phase(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            record = self.get(name)
+            record["seconds"] += perf_counter() - start
+            record["calls"] += 1
+            sink = stats_sink
+            if sink is not None:
+                sink(self, name)
+
+    def add_elements(self, name: str, elements: int):
+        self.get(name)["elements"] += int(elements)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(record) for name, record in self.phases.items()}
+
+
+class NullStats:
+    """Stats that record nothing, used while no stats sink is set."""
+
+    phases: Dict[str, Dict[str, Any]] = {}
+
+    def phase(self, name: str):
+        return NULL_PHASE
+
+    def add_elements(self, name: str, elements: int):
+        pass
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {}
+
+
+NULL_PHASE = nullcontext()
+NULL_STATS = NullStats()
+
+# Receives (stats, phase) as each phase of a run finishes; None disables stats
+stats_sink: Optional[Callable[[Stats, str], None]] = None
+
+
+def set_stats_sink(sink: Optional[Callable[[Stats, str], None]]):
+    """Record the stats of every later Sir run and pass each finished phase to sink.
+
+    Pass None to stop recording; runs then keep the no-op NULL_STATS.
+    """
+    global stats_sink
+    stats_sink = sink
+
+
+def create_stats():
+    return NULL_STATS if stats_sink is None else Stats()
+
+
+def log_stats(stats: Stats, phase: str):
+    """Stats sink that logs each finished phase."""
+    record = stats.phases[phase]
+    logger.info(
+        'Phase %s: %.6fs over %s calls, %s elements',
+        phase,
+        record["seconds"],
+        record["calls"],
+        record["elements"],
+    )
+
+
+def timed(name: str):
+    """Record calls of the decorated method as phase name of self.stats."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            with self.stats.phase(name):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class frame_property(memoized_property):
+    """Memoized data frame whose build is recorded as phase frame_<name>."""
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        with instance.stats.phase("frame_" + self.name):
+            return super().__get__(instance, owner)
+
+
+class RawColumns(dict):
+    """Daily projection arrays stored as the rows of one block.
+
+    Block columns read as views into their row; assigning to a block
+    column copies into that row. Each disposition key aliases its admits
+    column. Other keys such as "day" and "date" are stored as usual.
+    """
+
+    @classmethod
+    def create(cls, dispositions: Sequence[str], n_days: int, dtype: str = "float64") -> RawColumns:
+        columns = (
+            "susceptible",
+            "infected",
+            "recovered",
+            "ever_infected",
+            *("ever_" + key for key in dispositions),
+            *("admits_" + key for key in dispositions),
+            *("census_" + key for key in dispositions),
+            *("cumulative_admits_" + key for key in dispositions),
+        )
+        aliases = {key: "admits_" + key for key in dispositions}
+        return cls(columns, np.empty((len(columns), n_days), dtype), aliases)
+
+    def __init__(self, columns: Sequence[str], block: np.ndarray, aliases: Dict[str, str]):
+        self.columns = tuple(columns)
+        self.block = block
+        self.aliases = aliases
+        self.index = {column: k for k, column in enumerate(self.columns)}
+        super().__init__(
+            (key, block[self.index[column]])
+            for key, column in (*zip(self.columns, self.columns), *aliases.items())
+        )
+
+    def __setitem__(self, key, value):
+        if key in self.aliases:
+            return
+        k = self.index.get(key)
+        if k is None:
+            super().__setitem__(key, value)
+        elif value is not self[key]:
+            self.block[k] = value
+
+    def __reduce__(self):
+        others = {key: value for key, value in self.items() if key not in self.index and key not in self.aliases}
+        return (self.__class__, (self.columns, self.block, self.aliases), None, None, iter(others.items()))
+
+    def copy(self) -> RawColumns:
+        """Copy the block; other values are shared."""
+        raw = self.__class__(self.columns, self.block.copy(), self.aliases)
+        for key, value in self.items():
+            if key not in self.index and key not in self.aliases:
+                raw[key] = value
+        return raw
+
+    def head(self, n_days: int) -> RawColumns:
+        """Copy of the first n_days of every column."""
+        raw = self.__class__(self.columns, self.block[:, :n_days].copy(), self.aliases)
+        for key, value in self.items():
+            if key not in self.index and key not in self.aliases:
+                raw[key] = value[:n_days]
+        return raw
+
+    def view(self, columns: Sequence[str]) -> np.ndarray:
+        """Rows of consecutive columns, without copying."""
+        first = self.index[columns[0]]
+        if [self.index[column] for column in columns] != list(range(first, first + len(columns))):
+            raise ValueError(f"Columns are not consecutive: {columns}")
+        return self.block[first:first + len(columns)]
+
+    def to_frame(self, columns: Sequence[str]) -> pd.DataFrame:
+        """Data frame of day, date and columns backed by the block."""
+        import pandas as pd
+
+        df = pd.DataFrame(self.view(columns).T, columns=list(columns), copy=False)
+        df.insert(0, "day", self["day"])
+        df.insert(1, "date", self["date"])
+        return df
+
+
 class Sir:
+    """Fit the model to the parameters and project it forward.
+
+    Construction runs the pipeline seed → fit → trajectory → dispositions
+    → admits → census; data frames are built when first read. Sir.rebuild
+    reruns only the stages whose inputs changed. dtype sets the precision
+    in which the projection is computed and stored; the fit always runs in
+    float64.
 
-    def __init__(self, p: Parameters):
+    p is only read. Fitted values, such as the doubling_time fitted to
+    date_first_hospitalized, are attributes of the model.
 
+    While a stats sink is set, stats records the duration, calls and
+    array sizes of each phase of the run; see set_stats_sink.
+    """
+
+    # Models unpickled from before stats existed record nothing
+    stats = NULL_STATS
+
+    def __init__(self, p: Parameters, fit_strategy: str = "grid", dtype: str = "float64"):
+        if fit_strategy not in FIT_STRATEGIES:
+            raise ValueError(f"fit_strategy must be one of {FIT_STRATEGIES}.")
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}.")
+        self.fit_strategy = fit_strategy
+        self.dtype = dtype
+        self.inputs = get_model_inputs(p)
+        self.stats = create_stats()
+
+        with self.stats.phase("sir"):
+            self.seed(p)
+            self.fit(p)
+            if not self.reasonable_model_parameters:
+                return
+            self.policies = self.get_policies(p)
+            self.raw = self.run_projection(p, self.policies)
+            self.summarize(p)
+
+    @classmethod
+    def from_i_day(cls, p: Parameters, i_day: int, dtype: str = "float64") -> Sir:
+        """Project p.doubling_time from a given i_day, skipping the fit.
+
+        For fits made elsewhere, such as a calibration to a census series.
+        """
+        model = cls.__new__(cls)
+        model.fit_strategy = "grid"
+        model.dtype = dtype
+        model.inputs = get_model_inputs(p)
+        model.stats = create_stats()
+        model.seed(p)
+
+        model.reasonable_model_parameters = True
+        model.fit_evaluations = 0
+        model.i_day = i_day
+        model.doubling_time = p.doubling_time
+        model.intrinsic_growth_rate = get_growth_rate(p.doubling_time)
+        model.beta = get_beta(model.intrinsic_growth_rate, model.gamma, model.susceptible, 0.0)
+        model.beta_t = get_beta(model.intrinsic_growth_rate, model.gamma, model.susceptible, p.relative_contact_rate)
+
+        model.policies = model.get_policies(p)
+        model.raw = model.run_projection(p, model.policies)
+        model.summarize(p)
+        return model
+
+    @classmethod
+    def rebuild(cls, previous: Sir, p: Parameters) -> Sir:
+        """Build the model for p from previous, rerunning only changed stages.
+
+        Each stage reruns when one of its inputs or an upstream stage
+        changed. Changes that leave the fit inputs alone, such as the ICU
+        or ventilator rates and lengths of stay, reuse the trajectory and
+        recompute only the affected dispositions, admits and census. A
+        longer n_days extends the previous trajectory by the added days; a
+        shorter one keeps its first days.
+        """
+        inputs = get_model_inputs(p)
+        changed = {key for key, value in inputs.items() if previous.inputs[key] != value}
+        if (
+            not previous.reasonable_model_parameters
+            or changed & set(previous.get_fit_inputs(p)) - {"n_days"}
+        ):
+            return cls(p, fit_strategy=previous.fit_strategy, dtype=previous.dtype)
+
+        model = copy(previous)
+        model.stats = create_stats()
+        with model.stats.phase("rebuild"):
+            model.clear_frames()
+            model.inputs = inputs
+            model.fit_evaluations = 0
+            model.seed(p)
+            if "n_days" in changed and "n_days" in previous.get_fit_inputs(p):
+                # Fits by doubling_time search a horizon of n_days
+                model.fit(p)
+                if (model.i_day, model.beta, model.beta_t) != (previous.i_day, previous.beta, previous.beta_t):
+                    model.policies = model.get_policies(p)
+                    model.raw = model.run_projection(p, model.policies)
+                    model.summarize(p)
+                    return model
+            model.policies = model.get_policies(p)
+            if p.n_days > previous.inputs["n_days"]:
+                model.raw = model.extend_projection(p, previous.raw)
+            elif p.n_days < previous.inputs["n_days"]:
+                model.raw = previous.raw.head(1 + sum(days for _, days in model.policies))
+            else:
+                model.raw = previous.raw.copy()
+
+            keys = [key for key in model.rates if key in changed]
+            rates = {key: model.rates[key] for key in keys}
+            calculate_dispositions(model.raw, rates, p.market_share)
+            calculate_admits(model.raw, rates)
+            calculate_census(model.raw, {key: model.days[key] for key in keys})
+            logger.debug('Rebuilt dispositions for %s', keys)
+
+            model.summarize(p)
+            return model
+
+    @timed("seed")
+    def seed(self, p: Parameters):
+        """Set rates, lengths of stay, gamma and the initial S, I, R."""
         self.rates = {
             key: d.rate
             for key, d in p.dispositions.items()
@@ -52,63 +398,44 @@ class Sir:
 
         susceptible = p.population - infected
 
-        gamma = 1.0 / p.infectious_days
-        self.gamma = gamma
+        self.gamma = 1.0 / p.infectious_days
 
         self.susceptible = susceptible
         self.infected = infected
         self.recovered = p.recovered
 
+    def get_fit_inputs(self, p: Parameters) -> Sequence[str]:
+        """Parameters that determine i_day, beta and beta_t."""
+        if p.date_first_hospitalized is None:
+            return FIT_INPUTS + ("n_days",)
+        return FIT_INPUTS
+
+    def fit(self, p: Parameters):
+        """Set i_day, beta and beta_t from either doubling_time or date_first_hospitalized."""
         self.reasonable_model_parameters = True
+        self.fit_evaluations = 0
 
         if p.date_first_hospitalized is None and p.doubling_time is not None:
             # Back-projecting to when the first hospitalized case would have been admitted
-            logger.info('Using doubling_time: %s', p.doubling_time)
+            doubling_time = p.doubling_time
+            logger.debug('Using doubling_time: %s', doubling_time)
 
-            intrinsic_growth_rate = get_growth_rate(p.doubling_time)
-            self.beta = get_beta(intrinsic_growth_rate,  gamma, self.susceptible, 0.0)
-            self.beta_t = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
+            self.intrinsic_growth_rate = get_growth_rate(doubling_time)
+            self.beta = get_beta(self.intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
+            self.beta_t = get_beta(self.intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
 
             if p.mitigation_date is None:
-                self.i_day = 0 # seed to the full length
-                raw = self.run_projection(p, [
-                    (self.beta, p.n_days + PREFIT_ADDITIONAL_DAYS)])
-                self.i_day = i_day = int(get_argmin_ds(raw["census_hospitalized"], p.current_hospitalized))
-
-                self.raw = self.run_projection(p, self.get_policies(p))
-
-                logger.info('Set i_day = %s', i_day)
-            else:
-                best_i_day = -1
-                best_i_day_loss = float('inf')
-                for self.i_day in range(p.n_days + PREFIT_ADDITIONAL_DAYS):
-                    mitigation_day = -(p.current_date - p.mitigation_date).days
-                    if mitigation_day < -self.i_day:
-                        mitigation_day = -self.i_day
-
-                    total_days = self.i_day + p.n_days + PREFIT_ADDITIONAL_DAYS
-                    pre_mitigation_days = self.i_day + mitigation_day
-                    post_mitigation_days = total_days - pre_mitigation_days
-
+                with self.stats.phase("fit_i_day"):
+                    self.i_day = 0 # seed to the full length
                     raw = self.run_projection(p, [
-                            (self.beta,   pre_mitigation_days),
-                            (self.beta_t, post_mitigation_days),
-                        ]
-                    )
-
-                    # Don't fit against results that put the peak before the present day
-                    if raw["census_hospitalized"].argmax() < self.i_day:
-                        continue
-
-                    loss = get_loss(raw["census_hospitalized"][self.i_day], p.current_hospitalized)
-                    if loss < best_i_day_loss:
-                        best_i_day_loss = loss
-                        best_i_day = self.i_day
+                        (self.beta, p.n_days + PREFIT_ADDITIONAL_DAYS)], dtype="float64")
+                    self.i_day = i_day = int(get_argmin_ds(raw["census_hospitalized"], p.current_hospitalized))
 
-                self.i_day = best_i_day
-                self.raw = self.run_projection(p, self.get_policies(p))
+                logger.debug('Set i_day = %s', i_day)
+            else:
+                self.i_day = self.get_argmin_i_day(p)
 
-            logger.info(
+            logger.debug(
                 'Estimated date_first_hospitalized: %s; current_date: %s; i_day: %s',
                 p.current_date - timedelta(days=self.i_day),
                 p.current_date,
@@ -118,7 +445,7 @@ class Sir:
             # Fitting spread parameter to observed hospital census (dates of 1 patient and today)
             self.i_day = (p.current_date - p.date_first_hospitalized).days
             self.current_hospitalized = p.current_hospitalized
-            logger.info(
+            logger.debug(
                 'Using date_first_hospitalized: %s; current_date: %s; i_day: %s, current_hospitalized: %s',
                 p.date_first_hospitalized,
                 p.current_date,
@@ -138,17 +465,27 @@ class Sir:
 
 
             # Refine the coarse estimate
-            for iteration in range(4):
-                dts = np.linspace(dts[min_loss-1], dts[min_loss+1], 15)
-                min_loss = self.get_argmin_doubling_time(p, dts)
-
-            p.doubling_time = dts[min_loss]
+            if self.fit_strategy == "grid":
+                for iteration in range(4):
+                    dts = np.linspace(dts[min_loss-1], dts[min_loss+1], 15)
+                    min_loss = self.get_argmin_doubling_time(p, dts)
+                doubling_time = dts[min_loss]
+            else:
+                doubling_time = minimize_golden_section(
+                    lambda dt: self.get_doubling_time_losses(p, np.array([dt]))[0],
+                    dts[max(min_loss - 1, 0)],
+                    dts[min_loss + 1],
+                )
 
-            logger.info('Estimated doubling_time: %s', p.doubling_time)
-            intrinsic_growth_rate = get_growth_rate(p.doubling_time)
-            self.beta = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
-            self.beta_t = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
-            self.raw = self.run_projection(p, self.get_policies(p))
+            logger.debug(
+                'Estimated doubling_time: %s; fit_strategy: %s; evaluations: %s',
+                doubling_time,
+                self.fit_strategy,
+                self.fit_evaluations,
+            )
+            self.intrinsic_growth_rate = get_growth_rate(doubling_time)
+            self.beta = get_beta(self.intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
+            self.beta_t = get_beta(self.intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
 
             self.population = p.population
         else:
@@ -159,48 +496,27 @@ class Sir:
             )
             raise AssertionError('doubling_time or date_first_hospitalized must be provided.')
 
+        # The fitted value is kept here; p is never changed
+        self.doubling_time = doubling_time
+
+    @property
+    def date_first_hospitalized(self):
+        """The given or fitted day of the first hospitalized patient."""
+        return self.current_date - timedelta(days=self.i_day)
+
+    @timed("summarize")
+    def summarize(self, p: Parameters):
+        """Set dates and the summary statistics of the projection."""
         self.raw["date"] = self.raw["day"].astype("timedelta64[D]") + np.datetime64(p.current_date)
 
-        self.raw_df = pd.DataFrame(data=self.raw)
-        self.dispositions_df = pd.DataFrame(data={
-            'day': self.raw['day'],
-            'date': self.raw['date'],
-            'ever_hospitalized': self.raw['ever_hospitalized'],
-            'ever_icu': self.raw['ever_icu'],
-            'ever_ventilated': self.raw['ever_ventilated'],
-        })
-        self.admits_df = pd.DataFrame(data={
-            'day': self.raw['day'],
-            'date': self.raw['date'],
-            'admits_hospitalized': self.raw['admits_hospitalized'],
-            'admits_icu': self.raw['admits_icu'],
-            'admits_ventilated': self.raw['admits_ventilated'],
-        })
-        self.census_df = pd.DataFrame(data={
-            'day': self.raw['day'],
-            'date': self.raw['date'],
-            'census_hospitalized': self.raw['census_hospitalized'],
-            'census_icu': self.raw['census_icu'],
-            'census_ventilated': self.raw['census_ventilated'],
-        })
-        self.ppe_df = pd.DataFrame(data={
-            'day': self.raw['day'],
-            'date': self.raw['date'],
-            'census_hospitalized': self.raw['census_hospitalized'],
-            'census_icu': self.raw['census_icu'],
-            'census_ventilated': self.raw['census_ventilated'],
-            'admits_hospitalized': self.raw['admits_hospitalized'],
-        })
-        self.ppe_df = self.ppe_df[self.ppe_df['day']>=0]
-
-        logger.info('len(np.arange(-i_day, n_days+1)): %s', len(np.arange(-self.i_day, p.n_days+1)))
-        logger.info('len(raw_df): %s', len(self.raw_df))
-
-        self.infected = self.raw_df['infected'].values[self.i_day]
-        self.susceptible = self.raw_df['susceptible'].values[self.i_day]
-        self.recovered = self.raw_df['recovered'].values[self.i_day]
-
-        self.intrinsic_growth_rate = intrinsic_growth_rate
+        self.current_date = p.current_date
+
+        susceptible = self.susceptible
+        gamma = self.gamma
+
+        self.infected = self.raw['infected'][self.i_day]
+        self.susceptible = self.raw['susceptible'][self.i_day]
+        self.recovered = self.raw['recovered'][self.i_day]
 
         # r_t is r_0 after distancing
         self.r_t = self.beta_t / gamma * susceptible
@@ -210,37 +526,169 @@ class Sir:
             self.beta_t * susceptible - gamma + 1)
         self.doubling_time_t = doubling_time_t
 
-        self.sim_sir_w_date_df = build_sim_sir_w_date_df(self.raw_df, p.current_date, self.keys)
+        self.daily_growth_rate = get_growth_rate(self.doubling_time)
+        self.daily_growth_rate_t = get_growth_rate(self.doubling_time_t)
 
-        self.sim_sir_w_date_floor_df = build_floor_df(self.sim_sir_w_date_df, self.keys, "")
-        self.admits_floor_df = build_floor_df(self.admits_df, p.dispositions.keys(), "admits_")
-        self.census_floor_df = build_floor_df(self.census_df, p.dispositions.keys(), "census_")
+    def clear_frames(self):
+        """Drop data frames built from a previous self.raw."""
+        for name, attribute in vars(type(self)).items():
+            if isinstance(attribute, memoized_property):
+                self.__dict__.pop(name, None)
+
+    # Output data frames are built on first access from self.raw
+
+    @frame_property
+    def raw_df(self) -> pd.DataFrame:
+        raw_df = self.raw.to_frame([
+            column
+            for column in self.raw.columns
+            if not column.startswith("cumulative_")
+        ])
+        for alias, column in self.raw.aliases.items():
+            raw_df[alias] = raw_df[column]
+        return raw_df
+
+    @frame_property
+    def dispositions_df(self) -> pd.DataFrame:
+        return self.raw.to_frame(['ever_' + key for key in self.rates])
+
+    @frame_property
+    def admits_df(self) -> pd.DataFrame:
+        return self.raw.to_frame(['admits_' + key for key in self.rates])
+
+    @frame_property
+    def census_df(self) -> pd.DataFrame:
+        return self.raw.to_frame(['census_' + key for key in self.rates])
+
+    @frame_property
+    def ppe_df(self) -> pd.DataFrame:
+        ppe_df = self.raw.to_frame(['census_' + key for key in self.rates])
+        ppe_df['admits_hospitalized'] = self.raw['admits_hospitalized']
+        return ppe_df[ppe_df['day']>=0]
+
+    @frame_property
+    def sim_sir_w_date_df(self) -> pd.DataFrame:
+        return self.raw.to_frame(self.keys)
+
+    @frame_property
+    def sim_sir_w_date_floor_df(self) -> pd.DataFrame:
+        df = self.sim_sir_w_date_df
+        with self.stats.phase("build_floor_df"):
+            return build_floor_df(df, self.keys, "")
+
+    @frame_property
+    def admits_floor_df(self) -> pd.DataFrame:
+        df = self.admits_df
+        with self.stats.phase("build_floor_df"):
+            return build_floor_df(df, self.rates.keys(), "admits_")
+
+    @frame_property
+    def census_floor_df(self) -> pd.DataFrame:
+        df = self.census_df
+        with self.stats.phase("build_floor_df"):
+            return build_floor_df(df, self.rates.keys(), "census_")
+
+    @timed("fit_i_day")
+    def get_argmin_i_day(self, p: Parameters) -> int:
+        """Fit i_day to current_hospitalized when mitigation_date is set.
+
+        Every candidate i_day starts from the same state with the same beta,
+        so the pre-mitigation trajectory is simulated once and shared. Only
+        the post-mitigation segments are simulated, one per distinct switch
+        day, in a single batch. Candidates that put the peak before the
+        present day are excluded; returns -1 if none remain.
+        """
+        i_days = np.arange(p.n_days + PREFIT_ADDITIONAL_DAYS)
+        mitigation_day = -(p.current_date - p.mitigation_date).days
+        total_days = i_days + p.n_days + PREFIT_ADDITIONAL_DAYS
+        pre_mitigation_days = np.clip(i_days + mitigation_day, 0, total_days)
+        post_mitigation_days = total_days - pre_mitigation_days
 
-        self.daily_growth_rate = get_growth_rate(p.doubling_time)
-        self.daily_growth_rate_t = get_growth_rate(self.doubling_time_t)
+        shared = sim_sir(
+            self.susceptible,
+            self.infected,
+            p.recovered,
+            self.gamma,
+            0,
+            [(self.beta, int(pre_mitigation_days.max()))],
+        )
+        n = float(self.susceptible) + float(self.infected) + float(p.recovered)
+
+        switch_days, switch_index = np.unique(pre_mitigation_days, return_inverse=True)
+        post = sim_sir_batch(
+            shared["susceptible"][switch_days],
+            shared["infected"][switch_days],
+            shared["recovered"][switch_days],
+            self.gamma,
+            0,
+            [(self.beta_t, int(post_mitigation_days.max()))],
+            n=n,
+        )
+
+        # Stitch the shared prefix onto each candidate's post-mitigation segment
+        days = np.arange(total_days.max() + 1)
+        post_days = np.clip(days - pre_mitigation_days[:, None], 0, post["day"].shape[-1] - 1)
+        ever_infected = np.where(
+            days <= pre_mitigation_days[:, None],
+            shared["ever_infected"][np.minimum(days, switch_days[-1])],
+            post["ever_infected"][switch_index[:, None], post_days],
+        )
+
+        raw = {"day": days - i_days[:, None], "ever_infected": ever_infected}
+        rates = {"hospitalized": self.rates["hospitalized"]}
+        calculate_dispositions(raw, rates, p.market_share)
+        calculate_admits(raw, rates)
+        calculate_census(raw, {"hospitalized": self.days["hospitalized"]})
+        census = raw["census_hospitalized"]
+        self.stats.add_elements("fit_i_day", ever_infected.size)
+
+        # Don't fit against results that put the peak before the present day
+        census = np.where(days <= total_days[:, None], census, -np.inf)
+        reasonable = census.argmax(axis=1) >= i_days
+        if not reasonable.any():
+            return -1
+
+        losses = get_loss(census[i_days, i_days], p.current_hospitalized)
+        losses[~reasonable] = np.inf
+        return int(losses.argmin())
 
     def get_argmin_doubling_time(self, p: Parameters, dts):
-        losses = np.full(dts.shape[0], np.inf)
-        for i, i_dt in enumerate(dts):
-            intrinsic_growth_rate = get_growth_rate(i_dt)
-            self.beta = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
-            self.beta_t = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
+        return int(self.get_doubling_time_losses(p, dts).argmin())
 
-            raw = self.run_projection(p, self.get_policies(p))
+    @timed("fit_doubling_time")
+    def get_doubling_time_losses(self, p: Parameters, dts) -> np.ndarray:
+        """Loss against current_hospitalized for each candidate doubling time.
 
-            # Skip values the would put the fit past peak
-            peak_admits_day = raw["admits_hospitalized"].argmax()
-            if peak_admits_day < 0:
-                continue
+        All candidates are simulated together in one batch.
+        """
+        self.fit_evaluations += len(dts)
+        intrinsic_growth_rate = np.array([get_growth_rate(dt) for dt in dts])
+        beta = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, 0.0)
+        beta_t = get_beta(intrinsic_growth_rate, self.gamma, self.susceptible, p.relative_contact_rate)
+        pre_mitigation_days, post_mitigation_days = self.get_policy_days(p)
 
-            predicted = raw["census_hospitalized"][self.i_day]
-            loss = get_loss(self.current_hospitalized, predicted)
-            losses[i] = loss
+        raw = sim_sir_batch(
+            self.susceptible,
+            self.infected,
+            p.recovered,
+            self.gamma,
+            -self.i_day,
+            [
+                (beta,   pre_mitigation_days),
+                (beta_t, post_mitigation_days),
+            ],
+        )
+        rates = {"hospitalized": self.rates["hospitalized"]}
+        calculate_dispositions(raw, rates, p.market_share)
+        calculate_admits(raw, rates)
+        calculate_census(raw, {"hospitalized": self.days["hospitalized"]})
 
-        min_loss = pd.Series(losses).argmin()
-        return min_loss
+        self.stats.add_elements("fit_doubling_time", raw["ever_infected"].size)
 
-    def get_policies(self, p: Parameters) -> Sequence[Tuple[float, int]]:
+        predicted = raw["census_hospitalized"][:, self.i_day]
+        return get_loss(self.current_hospitalized, predicted)
+
+    def get_policy_days(self, p: Parameters) -> Tuple[int, int]:
         if p.mitigation_date is not None:
             mitigation_day = -(p.current_date - p.mitigation_date).days
         else:
@@ -253,28 +701,102 @@ class Sir:
 
         pre_mitigation_days = self.i_day + mitigation_day
         post_mitigation_days = total_days - pre_mitigation_days
+        return pre_mitigation_days, post_mitigation_days
 
+    def get_policies(self, p: Parameters) -> Sequence[Tuple[float, int]]:
+        pre_mitigation_days, post_mitigation_days = self.get_policy_days(p)
         return [
             (self.beta,   pre_mitigation_days),
             (self.beta_t, post_mitigation_days),
         ]
 
-    def run_projection(self, p: Parameters, policy: Sequence[Tuple[float, int]]):
-        raw = sim_sir(
+    @timed("projection")
+    def run_projection(
+        self, p: Parameters, policy: Sequence[Tuple[float, int]], dtype: Optional[str] = None,
+    ):
+        n_days = 1 + sum(days for _, days in policy)
+        raw = RawColumns.create(self.rates.keys(), n_days, dtype or self.dtype)
+        sim_sir(
             self.susceptible,
             self.infected,
             p.recovered,
             self.gamma,
             -self.i_day,
-            policy
+            policy,
+            out=raw,
         )
 
         calculate_dispositions(raw, self.rates, p.market_share)
         calculate_admits(raw, self.rates)
         calculate_census(raw, self.days)
 
+        self.stats.add_elements("projection", raw.block.size)
         return raw
 
+    @timed("extend_projection")
+    def extend_projection(self, p: Parameters, raw: RawColumns) -> RawColumns:
+        """Extend raw to self.policies, simulating only the added days.
+
+        The trajectory continues from the final S, I, R of raw, and the
+        dispositions, admits and census are appended from the cumulative
+        arrays of raw, so the result matches a full run_projection. Call
+        after seed(), on a raw projected under a prefix of self.policies.
+        """
+        start = raw["day"].shape[-1]
+        extended = RawColumns.create(
+            self.rates.keys(), 1 + sum(days for _, days in self.policies), self.dtype)
+        extended.block[:, :start] = raw.block
+
+        tail = sim_sir(
+            raw["susceptible"][-1],
+            raw["infected"][-1],
+            raw["recovered"][-1],
+            self.gamma,
+            raw["day"][-1],
+            skip_policies(self.policies, start - 1),
+            n=float(self.susceptible) + float(self.infected) + float(p.recovered),
+            dtype=self.dtype,
+        )
+        extended["day"] = np.concatenate((raw["day"], tail["day"][1:]))
+        for key in ("susceptible", "infected", "recovered", "ever_infected"):
+            extended[key][start:] = tail[key][1:]
+
+        calculate_dispositions(extended, self.rates, p.market_share, start=start)
+        calculate_admits(extended, self.rates, start=start)
+        calculate_census(extended, self.days, start=start)
+        self.stats.add_elements("extend_projection", extended.block[:, start:].size)
+        logger.debug('Extended projection by %s days', extended["day"].shape[-1] - start)
+        return extended
+
+
+def get_model_inputs(p: Parameters) -> Dict[str, Any]:
+    """Values of the parameters that affect the model results."""
+    return {key: getattr(p, key) for key in MODEL_FIELDS}
+
+
+def minimize_golden_section(
+    fn: Callable[[float], float],
+    lower: float,
+    upper: float,
+    tolerance: float = 1.0e-4,
+) -> float:
+    """Golden-section search for the minimum of fn bracketed by [lower, upper]."""
+    inverse_phi = (np.sqrt(5.0) - 1.0) / 2.0
+    a, b = lower, upper
+    c = b - inverse_phi * (b - a)
+    d = a + inverse_phi * (b - a)
+    fc, fd = fn(c), fn(d)
+    while b - a > tolerance:
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - inverse_phi * (b - a)
+            fc = fn(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + inverse_phi * (b - a)
+            fd = fn(d)
+    return (a + b) / 2.0
+
 
 def get_loss(current_hospitalized, predicted) -> float:
     """Squared error: predicted vs. actual current hospitalized."""
@@ -321,24 +843,40 @@ def sir(
 
 
 def sim_sir(
-    s: float, i: float, r: float, gamma: float, i_day: int, policies: Sequence[Tuple[float, int]]
+    s: float, i: float, r: float, gamma: float, i_day: int, policies: Sequence[Tuple[float, int]],
+    out: Optional[RawColumns] = None,
+    n: Optional[float] = None,
+    dtype: str = "float64",
 ):
     """Simulate SIR model forward in time, returning a dictionary of daily arrays
     Parameter order has changed to allow multiple (beta, n_days)
     to reflect multiple changing social distancing policies.
+
+    When out is given, the daily arrays are written into its columns and
+    out is returned. n defaults to s + i + r; pass the original population
+    to continue a previous simulation from its final state. Steps run in
+    dtype, or in the dtype of out: on Python floats for float64 and on
+    numpy scalars otherwise, so float32 runs match sim_sir_batch.
     """
-    s, i, r = (float(v) for v in (s, i, r))
-    n = s + i + r
-    d = i_day
+    if out is not None:
+        dtype = out.block.dtype
+    step = float if np.dtype(dtype) == np.float64 else np.dtype(dtype).type
+    s, i, r, gamma = (step(v) for v in (s, i, r, gamma))
+    n = s + i + r if n is None else step(n)
+    policies = [(step(beta), n_days) for beta, n_days in policies]
+    d = int(i_day)
 
     total_days = 1
     for beta, days in policies:
         total_days += days
 
     d_a = np.empty(total_days, "int")
-    s_a = np.empty(total_days, "float")
-    i_a = np.empty(total_days, "float")
-    r_a = np.empty(total_days, "float")
+    if out is None:
+        s_a = np.empty(total_days, dtype)
+        i_a = np.empty(total_days, dtype)
+        r_a = np.empty(total_days, dtype)
+    else:
+        s_a, i_a, r_a = out["susceptible"], out["infected"], out["recovered"]
 
     index = 0
     for beta, n_days in policies:
@@ -356,6 +894,10 @@ def sim_sir(
     s_a[index] = s
     i_a[index] = i
     r_a[index] = r
+    if out is not None:
+        out["day"] = d_a
+        np.add(i_a, r_a, out=out["ever_infected"])
+        return out
     return {
         "day": d_a,
         "susceptible": s_a,
@@ -365,24 +907,89 @@ def sim_sir(
     }
 
 
-def build_sim_sir_w_date_df(
-    raw_df: pd.DataFrame,
-    current_date: datetime,
-    keys: Sequence[str],
-) -> pd.DataFrame:
-    day = raw_df.day
-    return pd.DataFrame({
-        "day": day,
-        "date": day.astype('timedelta64[D]') + np.datetime64(current_date),
-        **{
-            key: raw_df[key]
-            for key in keys
-        }
-    })
+def sim_sir_batch(
+    s, i, r, gamma, i_day, policies: Sequence[Tuple[Any, Any]], n=None, dtype: str = "float64",
+) -> Dict[str, np.ndarray]:
+    """Simulate many SIR scenarios forward in time in one pass.
+
+    s, i, r, gamma, i_day and each policy's beta and n_days may be scalars
+    or arrays with one entry per scenario. Scenarios may switch policies on
+    different days, but every scenario must span the same number of days.
+    n defaults to s + i + r. Every step runs in dtype, so float32 batches
+    stay float32 through calculate_dispositions, calculate_admits and
+    calculate_census.
+
+    Returns the same keys as sim_sir, each shaped (scenario, day), so the
+    result can be passed to calculate_dispositions, calculate_admits and
+    calculate_census.
+    """
+    policies = list(policies) or [(0.0, 0)]
+    betas = [beta for beta, _ in policies]
+    days = [np.asarray(n_days, dtype="int") for _, n_days in policies]
+    shape = np.broadcast(s, i, r, gamma, i_day, *betas, *days).shape
+    if len(shape) > 1:
+        raise ValueError("sim_sir_batch expects scalars or 1-d arrays.")
+    n_scenarios = shape[0] if shape else 1
+
+    def per_scenario(value, dtype=dtype):
+        return np.broadcast_to(np.asarray(value, dtype=dtype), (n_scenarios,))
+
+    s, i, r, gamma = (per_scenario(v) for v in (s, i, r, gamma))
+    n = s + i + r if n is None else per_scenario(n)
+    d = per_scenario(i_day, "int")
+
+    # Day on which each policy ends, per scenario
+    ends = np.cumsum([per_scenario(n_days, "int") for n_days in days], axis=0)
+    total_days = ends[-1]
+    if (total_days != total_days[0]).any():
+        raise ValueError("Every scenario must span the same number of days.")
+    steps = int(total_days[0])
+
+    # Beta in effect on each step, per scenario
+    beta_a = np.stack([per_scenario(beta) for beta in betas])
+    policy_index = (ends[:, None, :] <= np.arange(steps)[None, :, None]).sum(axis=0)
+
+    s_a = np.empty((n_scenarios, steps + 1), dtype)
+    i_a = np.empty((n_scenarios, steps + 1), dtype)
+    r_a = np.empty((n_scenarios, steps + 1), dtype)
+    s_a[:, 0] = s
+    i_a[:, 0] = i
+    r_a[:, 0] = r
+
+    scenarios = np.arange(n_scenarios)
+    for day in range(steps):
+        beta = beta_a[policy_index[day], scenarios]
+        s, i, r = sir(s, i, r, beta, gamma, n)
+        s_a[:, day + 1] = s
+        i_a[:, day + 1] = i
+        r_a[:, day + 1] = r
+
+    return {
+        "day": d[:, None] + np.arange(steps + 1),
+        "susceptible": s_a,
+        "infected": i_a,
+        "recovered": r_a,
+        "ever_infected": i_a + r_a
+    }
+
+
+def skip_policies(
+    policies: Sequence[Tuple[float, int]], steps: int,
+) -> Sequence[Tuple[float, int]]:
+    """The (beta, n_days) policies remaining after the first steps days."""
+    remaining = []
+    for beta, n_days in policies:
+        skipped = min(steps, n_days)
+        steps -= skipped
+        if n_days > skipped:
+            remaining.append((beta, n_days - skipped))
+    return remaining
 
 
 def build_floor_df(df, keys, prefix):
     """Build floor sim sir w date."""
+    import pandas as pd
+
     return pd.DataFrame({
         "day": df.day,
         "date": df.date,
@@ -397,20 +1004,35 @@ def calculate_dispositions(
     raw: Dict,
     rates: Dict[str, float],
     market_share: float,
+    start: int = 0,
 ):
-    """Build dispositions dataframe of patients adjusted by rate and market_share."""
+    """Build dispositions dataframe of patients adjusted by rate and market_share.
+
+    Days before start are left as they are.
+    """
+    ever_infected = raw["ever_infected"]
+    market_share = per_scenario_column(market_share, ever_infected)
     for key, rate in rates.items():
-        raw["ever_" + key] = raw["ever_infected"] * rate * market_share
-        raw[key] = raw["ever_infected"] * rate * market_share
+        rate = per_scenario_column(rate, ever_infected)
+        ever = get_column(raw, "ever_" + key, ever_infected, start)
+        np.multiply(ever_infected[..., start:], rate, out=ever[..., start:])
+        np.multiply(ever[..., start:], market_share, out=ever[..., start:])
+        raw["ever_" + key] = ever
+        raw[key] = ever
+
 
+def calculate_admits(raw: Dict, rates, start: int = 0):
+    """Build admits dataframe from dispositions.
 
-def calculate_admits(raw: Dict, rates):
-    """Build admits dataframe from dispositions."""
+    Days before start are left as they are.
+    """
+    first = max(start, 1)
     for key in rates.keys():
         ever = raw["ever_" + key]
-        admit = np.empty_like(ever)
-        admit[0] = np.nan
-        admit[1:] = ever[1:] - ever[:-1]
+        admit = get_column(raw, "admits_" + key, ever, start)
+        if start == 0:
+            admit[..., 0] = np.nan
+        np.subtract(ever[..., first:], ever[..., first-1:-1], out=admit[..., first:])
         raw["admits_"+key] = admit
         raw[key] = admit
 
@@ -418,13 +1040,64 @@ def calculate_admits(raw: Dict, rates):
 def calculate_census(
     raw: Dict,
     lengths_of_stay: Dict[str, int],
+    start: int = 0,
 ):
-    """Average Length of Stay for each disposition of COVID-19 case (total guesses)"""
-    n_days = raw["day"].shape[0]
-    for key, los in lengths_of_stay.items():
-        cumsum = np.empty(n_days + los)
-        cumsum[:los+1] = 0.0
-        cumsum[los+1:] = raw["admits_" + key][1:].cumsum()
+    """Average Length of Stay for each disposition of COVID-19 case (total guesses)
 
-        census = cumsum[los:] - cumsum[:-los]
+    Census is the difference of cumulative admits los days apart. Days
+    before start are left as they are, and cumulative admits continue from
+    the day before start. A length of stay may also be an array with one
+    entry per scenario of a batch.
+    """
+    n_days = raw["day"].shape[-1]
+    first = max(start, 1)
+    for key, los in lengths_of_stay.items():
+        admits = raw["admits_" + key]
+        cumulative = get_column(raw, "cumulative_admits_" + key, admits, start)
+        if start == 0:
+            cumulative[..., 0] = 0.0
+        cumulative[..., first:] = np.cumsum(
+            np.concatenate((cumulative[..., first-1:first], admits[..., first:]), axis=-1),
+            axis=-1,
+        )[..., 1:]
+        raw["cumulative_admits_" + key] = cumulative
+
+        census = get_column(raw, "census_" + key, admits, start)
+        if np.ndim(los) == 1 and len(los) and (los == los[0]).all():
+            los = int(los[0])
+        if np.ndim(los) == 1:
+            days = np.arange(start, n_days) - np.asarray(los)[:, None]
+            discharged = np.take_along_axis(cumulative, np.maximum(days, 0), axis=-1)
+            np.subtract(
+                cumulative[..., start:],
+                np.where(days >= 0, discharged, 0.0),
+                out=census[..., start:],
+            )
+            raw["census_" + key] = census
+            continue
+
+        discharged = min(max(start, los), n_days)
+        census[..., start:discharged] = cumulative[..., start:discharged]
+        np.subtract(
+            cumulative[..., discharged:],
+            cumulative[..., discharged-los:n_days-los],
+            out=census[..., discharged:],
+        )
         raw["census_" + key] = census
+
+
+def get_column(raw: Dict, key: str, like: np.ndarray, start: int = 0) -> np.ndarray:
+    """The preallocated column for key in RawColumns, otherwise a new array.
+
+    When start is past the first day, the existing column is updated.
+    """
+    if (isinstance(raw, RawColumns) and key in raw.index) or start > 0:
+        return raw[key]
+    return np.empty_like(like)
+
+
+def per_scenario_column(value, like: np.ndarray):
+    """Align a per-scenario array with the (scenario, day) arrays of a batch, in their dtype."""
+    if np.ndim(value) == 1 and like.ndim == 2:
+        return np.asarray(value, like.dtype)[:, None]
+    return value
@@ -1,7 +1,9 @@
 """the callable validator design pattern"""
 
 from ...constants import EPSILON
+from .base import ArrayValidation
 from .validators import (
+    validate_columns,
     OptionalValue as ValOptionalValue,
     Bounded as ValBounded,
     OptionalBounded as ValOptionalBounded,
@@ -1,6 +1,14 @@
 """design pattern via https://youtu.be/S_ipdVNSFlo?t=2153, modified such that validators are _callable_"""
 
 from abc import ABC, abstractmethod
+from collections import namedtuple
+
+import numpy as np
+
+
+# Mask of the valid rows of a column, and the error of each invalid row
+ArrayValidation = namedtuple("ArrayValidation", ("valid", "errors"))
+
 
 class Validator(ABC):
     def __set_name__(self, owner, name):
@@ -13,3 +21,19 @@ class Validator(ABC):
     @abstractmethod
     def validate(self, key, value):
         pass
+
+    def validate_array(self, key, values) -> ArrayValidation:
+        """Check every value of a column at once instead of raising on the first.
+
+        This default calls validate on each value; validators of numbers
+        and dates override it with array operations.
+        """
+        valid = np.ones(len(values), dtype=bool)
+        errors = {}
+        for row, value in enumerate(values):
+            try:
+                self.validate(key, value)
+            except (TypeError, ValueError) as e:
+                valid[row] = False
+                errors[row] = str(e)
+        return ArrayValidation(valid, errors)
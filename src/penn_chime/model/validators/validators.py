@@ -1,13 +1,80 @@
 """design pattern via https://youtu.be/S_ipdVNSFlo?t=2153"""
 
-from typing import Optional
+from typing import Dict, Optional, Sequence
 from datetime import date
+from numbers import Real
 
-from .base import Validator
+import numpy as np
+
+from .base import ArrayValidation, Validator
 
 EPSILON = 1.e-7
 
 
+def as_floats(values):
+    """Floats of a column, with nan for None; and a mask of the values that are numbers.
+
+    Like the scalar validators, only accepts numbers: strings such as "5"
+    are not numbers, even though float() would parse them.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        return values.astype(float), np.ones(len(values), dtype=bool)
+    array = np.full(len(values), np.nan)
+    numeric = np.ones(len(values), dtype=bool)
+    if isinstance(values, np.ndarray) and values.dtype.kind != "O":
+        numeric[:] = False
+        return array, numeric
+    for row, value in enumerate(values):
+        if value is None:
+            continue
+        if isinstance(value, Real):
+            array[row] = float(value)
+        else:
+            numeric[row] = False
+    return array, numeric
+
+
+def validate_numbers(key, values, lower, upper, optional, message) -> ArrayValidation:
+    """Check a column of numbers in [lower, upper], with the messages of the scalar validators."""
+    array, numeric = as_floats(values)
+    missing = numeric & np.isnan(array)
+    with np.errstate(invalid="ignore"):
+        out_of_bounds = np.zeros(len(array), dtype=bool)
+        if lower is not None:
+            out_of_bounds |= array < lower
+        if upper is not None:
+            out_of_bounds |= array > upper
+    invalid = ~numeric | out_of_bounds | (missing if not optional else False)
+
+    errors = {}
+    for row in np.flatnonzero(invalid).tolist():
+        if not numeric[row]:
+            errors[row] = f"{key}: {values[row]!r} must be a number."
+        elif missing[row]:
+            errors[row] = f"{key} is required."
+        else:
+            errors[row] = f"{key}: {values[row]} needs to be {message}."
+    return ArrayValidation(~invalid, errors)
+
+
+def validate_columns(validators: Dict[str, Validator], columns: Dict[str, Sequence]) -> ArrayValidation:
+    """Check columns of equal length with the validator of each; a row is valid when all its values are."""
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(lengths)}.")
+    n = lengths.pop() if lengths else 0
+
+    valid = np.ones(n, dtype=bool)
+    messages: Dict[int, list] = {}
+    for key, column in columns.items():
+        validation = validators[key].validate_array(key, column)
+        valid &= validation.valid
+        for row, error in validation.errors.items():
+            messages.setdefault(row, []).append(error)
+    errors = {row: " ".join(messages[row]) for row in sorted(messages)}
+    return ArrayValidation(valid, errors)
+
+
 class OptionalValue(Validator):
     """Any value at all"""
     def __init__(self) -> None:
@@ -16,9 +83,14 @@ class OptionalValue(Validator):
     def validate(self, key, value):
         pass
 
+    def validate_array(self, key, values) -> ArrayValidation:
+        return ArrayValidation(np.ones(len(values), dtype=bool), {})
+
 
 class Bounded(Validator):
     """A bounded number."""
+    optional = False
+
     def __init__(
             self,
             lower_bound: Optional[float] = None,
@@ -40,9 +112,17 @@ class Bounded(Validator):
            or (self.lower_bound is not None and value < self.lower_bound):
             raise ValueError(f"{key}: {value} needs to be {self.message[(self.lower_bound, self.upper_bound)]}.")
 
+    def validate_array(self, key, values) -> ArrayValidation:
+        return validate_numbers(
+            key, values, self.lower_bound, self.upper_bound, self.optional,
+            self.message[(self.lower_bound, self.upper_bound)],
+        )
+
 
 class OptionalBounded(Bounded):
     """a bounded number or a None."""
+    optional = True
+
     def __init__(
             self,
             lower_bound: Optional[float] = None,
@@ -67,9 +147,14 @@ class Rate(Validator):
             raise ValueError(
                 f"{key}: {value} needs to be a rate (i.e. in [0,1]).")
 
+    def validate_array(self, key, values) -> ArrayValidation:
+        return validate_numbers(key, values, 0.0, 1.0, False, "a rate (i.e. in [0,1])")
+
 
 class Date(Validator):
     """A date."""
+    optional = False
+
     def __init__(self) -> None:
         pass
 
@@ -79,8 +164,27 @@ class Date(Validator):
         if not isinstance(value, (date,)):
             raise ValueError(f"{key}: {value} must be a date.")
 
+    def validate_array(self, key, values) -> ArrayValidation:
+        if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+            missing = np.isnat(values)
+            is_date = ~missing
+        else:
+            missing = np.array([value is None for value in values], dtype=bool)
+            is_date = np.array([isinstance(value, date) for value in values], dtype=bool)
+        invalid = ~is_date & ~(missing & self.optional)
+
+        errors = {}
+        for row in np.flatnonzero(invalid).tolist():
+            if missing[row]:
+                errors[row] = f"{key} is required."
+            else:
+                errors[row] = f"{key}: {values[row]} must be a date."
+        return ArrayValidation(~invalid, errors)
+
 
 class OptionalDate(Date):
+    optional = True
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -92,10 +196,26 @@ class OptionalDate(Date):
 
 class ValDisposition(Validator):
     def __init__(self) -> None:
-        pass
+        self.days = Bounded(lower_bound=EPSILON)
+        self.rate = Rate()
 
     def validate(self, key, value):
         if value is None:
             raise ValueError(f"{key} is required.")
-        Bounded(lower_bound=EPSILON)(key=key + '_days', value=value.days)
-        Rate()(key=key + '_rate', value=value.rate)
+        self.days(key=key + '_days', value=value.days)
+        self.rate(key=key + '_rate', value=value.rate)
+
+    def validate_array(self, key, values) -> ArrayValidation:
+        missing = [value is None for value in values]
+        days = self.days.validate_array(key + '_days', [None if m else v.days for m, v in zip(missing, values)])
+        rate = self.rate.validate_array(key + '_rate', [None if m else v.rate for m, v in zip(missing, values)])
+
+        errors = {}
+        for row, error in sorted({**rate.errors, **days.errors}.items()):
+            if missing[row]:
+                errors[row] = f"{key} is required."
+            elif row in days.errors and row in rate.errors:
+                errors[row] = f"{days.errors[row]} {rate.errors[row]}"
+            else:
+                errors[row] = error
+        return ArrayValidation(days.valid & rate.valid, errors)
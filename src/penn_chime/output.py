@@ -0,0 +1,173 @@
+"""Output tables of a model as numpy columns.
+
+The data frames of Sir are built with pandas. The command line writes the
+same tables from the columns of Sir.raw instead, so a run that only
+writes its projections never imports pandas.
+
+Tables are written as CSV, newline delimited JSON, Parquet or Arrow IPC
+(Feather) files. Parquet and Arrow keep the column types and require
+pyarrow, installed with the columnar extra.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections import namedtuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .model.sir import RawColumns, Sir
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Row labels and named columns, as the index and columns of a data frame
+Table = namedtuple("Table", ("index", "columns"))
+
+# File extension of each output format
+EXTENSIONS = {
+    "csv": ".csv",
+    "ndjson": ".ndjson",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "feather": ".feather",
+}
+
+# Formats that keep the column types, which require pyarrow
+COLUMNAR_FORMATS = ("parquet", "arrow", "feather")
+
+
+def get_table(raw: RawColumns, columns: Sequence[str], mask: Optional[np.ndarray] = None) -> Table:
+    """Day, date and columns of raw, as RawColumns.to_frame, with the rows of mask."""
+    if mask is None:
+        mask = np.ones(len(raw["day"]), dtype=bool)
+    return Table(
+        np.flatnonzero(mask),
+        {column: raw[column][mask] for column in ("day", "date", *columns)},
+    )
+
+
+def get_tables(m: Sir) -> Dict[str, Table]:
+    """The tables written by the command line, by name.
+
+    Each matches the data frame of m that the name was written from.
+    """
+    admits = ["admits_" + key for key in m.rates]
+    census = ["census_" + key for key in m.rates]
+    return {
+        "sim_sir_w_date": get_table(m.raw, m.keys),
+        "projected_admits": get_table(m.raw, admits),
+        "projected_census": get_table(m.raw, census),
+        "ppe_data": get_table(m.raw, census + ["admits_hospitalized"], m.raw["day"] >= 0),
+    }
+
+
+def get_projections(m: Sir) -> Table:
+    """Every column of the tables of m in one table, one row per day."""
+    columns = [*m.keys, *("admits_" + key for key in m.rates), *("census_" + key for key in m.rates)]
+    return get_table(m.raw, columns)
+
+
+def from_frame(df: pd.DataFrame) -> Table:
+    """Table of a data frame, for the subcommands whose models build data frames."""
+    return Table(df.index.values, {column: df[column].values for column in df.columns})
+
+
+def join_tables(tables: Sequence[Table], keys: Sequence[str]) -> Table:
+    """Columns of tables with the same rows in one table; keys are kept once."""
+    first = tables[0]
+    columns = dict(first.columns)
+    for table in tables[1:]:
+        for key in keys:
+            if not np.array_equal(table.columns[key], first.columns[key]):
+                raise ValueError(f"Tables differ in {key}.")
+        columns.update((column, values) for column, values in table.columns.items() if column not in keys)
+    return Table(first.index, columns)
+
+
+def format_column(values: np.ndarray) -> List[str]:
+    """Cells of a column as DataFrame.to_csv writes them."""
+    if values.dtype.kind == "M":
+        return list(np.datetime_as_string(values, unit="D"))
+    if values.dtype.kind == "f":
+        # Shortest repr of each value in its own precision; missing values are empty
+        return ["" if np.isnan(value) else str(value) for value in values]
+    return [str(value) for value in values.tolist()]
+
+
+def write_csv(table: Table, path: str):
+    """Write a table as DataFrame.to_csv would, with an unnamed index."""
+    cells = [format_column(table.index)] + [format_column(values) for values in table.columns.values()]
+    with open(path, "w", newline="") as fout:
+        # Quotes cells holding commas or quotes, such as facility names
+        writer = csv.writer(fout, lineterminator="\n")
+        writer.writerow(["", *table.columns])
+        writer.writerows(zip(*cells))
+
+
+def write_ndjson(table: Table, path: str):
+    """Write a table as one JSON object per row, without the index; missing values are null."""
+    cells = []
+    for values in table.columns.values():
+        column = format_column(values)
+        if values.dtype.kind == "M":
+            column = ['"' + cell + '"' for cell in column]
+        elif values.dtype.kind == "f":
+            column = [cell or "null" for cell in column]
+        elif values.dtype.kind in "OSU":
+            column = [json.dumps(value) for value in values.tolist()]
+        cells.append(column)
+    keys = [json.dumps(column) + ": " for column in table.columns]
+    with open(path, "w") as fout:
+        for row in zip(*cells):
+            fout.write("{" + ", ".join(key + cell for key, cell in zip(keys, row)) + "}\n")
+
+
+def to_arrow(table: Table):
+    """Arrow table of the columns, without the index; dates are date32 and missing values null."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Parquet and Arrow output require pyarrow: pip install penn_chime[columnar]")
+
+    arrays = []
+    for values in table.columns.values():
+        if values.dtype.kind == "M":
+            # current_date may be a datetime, which makes the dates timestamps
+            values = values.astype("datetime64[D]")
+        arrays.append(pa.array(values, from_pandas=True))
+    return pa.Table.from_arrays(arrays, names=list(table.columns))
+
+
+def write_parquet(table: Table, path: str):
+    arrow_table = to_arrow(table)
+    import pyarrow.parquet as pq
+
+    pq.write_table(arrow_table, path)
+
+
+def write_arrow(table: Table, path: str):
+    """Write an Arrow IPC file, which is also Feather version 2."""
+    arrow_table = to_arrow(table)
+    import pyarrow as pa
+
+    with pa.ipc.new_file(path, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+
+
+WRITERS = {
+    "csv": write_csv,
+    "ndjson": write_ndjson,
+    "parquet": write_parquet,
+    "arrow": write_arrow,
+    "feather": write_arrow,
+}
+
+
+def write_table(table: Table, path: str, file_format: str = "csv"):
+    if file_format not in WRITERS:
+        raise ValueError(f"file_format must be one of {sorted(WRITERS)}.")
+    WRITERS[file_format](table, path)
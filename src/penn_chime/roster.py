@@ -0,0 +1,196 @@
+"""Multi-facility runs from a roster.
+
+A roster gives the parameters of each facility, either as a CSV file with
+a facility column and one parameter per column, or as a text file of
+config blocks:
+
+    [Pennsylvania Hospital]
+    --population 1000000
+    --market-share 0.1
+
+Facility values override the shared parameters from the command line and
+the PARAMETERS file. Every facility is fit and projected on a shared
+process pool, and the system tables sum the census and admits of every
+facility by date.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from argparse import ArgumentParser
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .model.parameters import Parameters, to_cli
+from .sweep import map_processes, project
+
+
+logger = getLogger(__name__)
+
+
+def read_roster(path: str) -> Dict[str, List[str]]:
+    """Command line arguments of each facility in a roster file."""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        return read_roster_csv(path)
+    return read_roster_blocks(path)
+
+
+def read_roster_csv(path: str) -> Dict[str, List[str]]:
+    roster = {}
+    with open(path, newline="") as fin:
+        reader = csv.DictReader(fin)
+        if "facility" not in (reader.fieldnames or []):
+            raise ValueError(f"{path}: a roster needs a facility column.")
+        for row in reader:
+            facility = row.pop("facility")
+            if facility in roster:
+                raise ValueError(f"{path}: facility {facility} is repeated.")
+            roster[facility] = [
+                token
+                for name, value in row.items()
+                if value != ""
+                for token in (to_cli(name.replace("-", "_")), value)
+            ]
+    return roster
+
+
+def read_roster_blocks(path: str) -> Dict[str, List[str]]:
+    roster = {}
+    tokens = None
+    with open(path) as fin:
+        for line in fin:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                facility = line[1:-1].strip()
+                if facility in roster:
+                    raise ValueError(f"{path}: facility {facility} is repeated.")
+                tokens = roster[facility] = []
+            elif tokens is None:
+                raise ValueError(f"{path}: parameters before the first [facility] block.")
+            else:
+                tokens.extend(line.split())
+    return roster
+
+
+def get_shared_args(env: Dict[str, str], argv: List[str]) -> List[str]:
+    """Arguments shared by every facility, with the parameters file read inline.
+
+    As in Parameters.create, the file overrides the command line.
+    """
+    parser = ArgumentParser(add_help=False)
+    parser.add_argument("--parameters", default=None)
+    a, argv = parser.parse_known_args(argv)
+    path = a.parameters if a.parameters is not None else env.get("PARAMETERS")
+    if path is None:
+        return argv
+    with open(path) as fin:
+        return argv + fin.read().split()
+
+
+def create_parameters(
+    shared: List[str], roster: Dict[str, List[str]],
+) -> Tuple[Dict[str, Parameters], Dict[str, str]]:
+    """Parameters of every facility, parsed in this process, and the errors by facility."""
+    parameters = {}
+    errors = {}
+    for facility, tokens in roster.items():
+        try:
+            parameters[facility] = Parameters.create({}, shared + tokens)
+        except SystemExit:
+            # argparse has already printed the usage error
+            errors[facility] = "Invalid arguments."
+        except Exception as e:
+            errors[facility] = f"{type(e).__name__}: {e}"
+    return parameters, errors
+
+
+def run_facility(
+    args: Tuple[str, Parameters],
+) -> Tuple[str, Optional[Dict[str, np.ndarray]], Optional[str]]:
+    """Project one facility: (facility, daily arrays, error)."""
+    facility, p = args
+    try:
+        return facility, project(p), None
+    except Exception as e:
+        return facility, None, f"{type(e).__name__}: {e}"
+
+
+class Roster:
+    """Per-facility and system census and admits of every facility in a roster."""
+
+    def __init__(
+        self,
+        parameters: Dict[str, Parameters],
+        max_workers: Optional[int] = None,
+        errors: Optional[Dict[str, str]] = None,
+    ):
+        self.facilities = {}
+        self.errors = dict(errors or {})
+        for facility, columns, error in map_processes(run_facility, list(parameters.items()), max_workers):
+            if error is not None:
+                logger.error('Facility %s failed: %s', facility, error)
+                self.errors[facility] = error
+            else:
+                self.facilities[facility] = columns
+
+    def get_facility_df(self, prefix: str) -> pd.DataFrame:
+        """Daily columns of every facility, one row per facility and day."""
+        return pd.concat(
+            [
+                pd.DataFrame({
+                    "facility": facility,
+                    "day": columns["day"],
+                    "date": columns["date"],
+                    **{
+                        key: columns[key]
+                        for key in columns
+                        if key.startswith(prefix)
+                    },
+                })
+                for facility, columns in self.facilities.items()
+            ],
+            ignore_index=True,
+        )
+
+    def get_system_df(self, prefix: str) -> pd.DataFrame:
+        """Daily columns summed over facilities by date.
+
+        Dates run from the earliest first day of any facility to the
+        earliest last day, so every facility is projected on every date;
+        before its first day a facility has no patients.
+        """
+        facilities = list(self.facilities.values())
+        start = min(columns["date"][0] for columns in facilities)
+        end = min(columns["date"][-1] for columns in facilities)
+        dates = np.arange(start, end + 1)
+        keys = [key for key in facilities[0] if key.startswith(prefix)]
+
+        totals = {key: np.zeros(len(dates)) for key in keys}
+        for columns in facilities:
+            first = int((columns["date"][0] - start).astype("int"))
+            n_days = len(dates) - first
+            for key in keys:
+                totals[key][first:] += np.nan_to_num(columns[key][:n_days])
+        return pd.DataFrame({"date": dates, **totals})
+
+    @property
+    def admits_df(self) -> pd.DataFrame:
+        return self.get_facility_df("admits_")
+
+    @property
+    def census_df(self) -> pd.DataFrame:
+        return self.get_facility_df("census_")
+
+    @property
+    def system_admits_df(self) -> pd.DataFrame:
+        return self.get_system_df("admits_")
+
+    @property
+    def system_census_df(self) -> pd.DataFrame:
+        return self.get_system_df("census_")
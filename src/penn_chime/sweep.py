@@ -0,0 +1,258 @@
+"""Parameter sweeps.
+
+Projects one Sir model per scenario over a process pool and streams every
+projection into a single Parquet or Arrow IPC file, one row per scenario
+and day. Scenarios that fail are reported and left out of the file; those
+with invalid parameters are found in one pass over every scenario, before
+any model runs.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .model.parameters import Parameters, cast_arg, get_field
+from .model.records import ParameterRecord
+from .model.sir import Sir
+from .output import COLUMNAR_FORMATS
+
+
+logger = getLogger(__name__)
+
+
+FORMATS = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "feather",
+    ".ipc": "arrow",
+}
+
+# Rows buffered before each write, so Parquet row groups span many scenarios
+BATCH_ROWS = 64 * 1024
+
+# Daily arrays of each scenario, after its scenario, day and date columns
+COLUMNS = (
+    "susceptible",
+    "infected",
+    "recovered",
+    "admits_hospitalized",
+    "admits_icu",
+    "admits_ventilated",
+    "census_hospitalized",
+    "census_icu",
+    "census_ventilated",
+)
+
+
+def parse_grid(strings: Sequence[str]) -> Dict[str, List[Any]]:
+    """Parse name=value,... strings into the values of each parameter."""
+    grid = {}
+    for string in strings:
+        name, _, values = string.partition("=")
+        name = name.replace("-", "_")
+        grid[name] = [cast_arg(name, value) for value in values.split(",")]
+    return grid
+
+
+def read_scenarios(path: str) -> List[Dict[str, Any]]:
+    """Scenarios from a csv file with one parameter per column."""
+    with open(path, newline="") as fin:
+        return [
+            {
+                name.replace("-", "_"): cast_arg(name.replace("-", "_"), value)
+                for name, value in row.items()
+                if value != ""
+            }
+            for row in csv.DictReader(fin)
+        ]
+
+
+def get_scenarios(
+    grid: Dict[str, Sequence[Any]],
+    rows: Optional[Sequence[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Every row crossed with every combination of the grid."""
+    names = list(grid)
+    return [
+        {**row, **dict(zip(names, values))}
+        for row in (rows or [{}])
+        for values in product(*(grid[name] for name in names))
+    ]
+
+
+def get_columns(base: Parameters, scenarios: Sequence[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Changes of the scenarios as columns; a scenario that keeps a field has the value of base."""
+    keys = list(dict.fromkeys(key for changes in scenarios for key in changes))
+    columns = {}
+    for key in keys:
+        try:
+            default = get_field(base, key)
+        except AttributeError:
+            raise ValueError(f"Unexpected parameter {key}")
+        columns[key] = [changes.get(key, default) for changes in scenarios]
+    return columns
+
+
+def project(p: Parameters, dtype: str = "float64") -> Dict[str, np.ndarray]:
+    """Day, date and the daily COLUMNS of the model for p, in dtype."""
+    m = Sir(p, dtype=dtype)
+    if not m.reasonable_model_parameters:
+        raise ValueError("The model parameters are not reasonable.")
+    columns = {
+        "day": m.raw["day"].astype("int64"),
+        "date": m.raw["date"].astype("datetime64[D]"),
+    }
+    for column in COLUMNS:
+        columns[column] = m.raw[column]
+    return columns
+
+
+def run_scenario(
+    args: Tuple[int, ParameterRecord, str],
+) -> Tuple[int, Optional[Dict[str, np.ndarray]], Optional[str]]:
+    """Project one scenario: (scenario, daily arrays, error)."""
+    scenario, p, dtype = args
+    try:
+        columns = project(p, dtype)
+    except Exception as e:
+        return scenario, None, f"{type(e).__name__}: {e}"
+    columns["scenario"] = np.full(columns["day"].shape, scenario, "int64")
+    return scenario, columns, None
+
+
+def map_processes(fn: Callable, tasks: Sequence, max_workers: Optional[int] = None) -> Iterable:
+    """fn of each task, in order, over a process pool unless one worker suffices."""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(tasks)) or 1
+    logger.info('Running %s tasks on %s workers', len(tasks), max_workers)
+    if max_workers == 1:
+        yield from map(fn, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        yield from executor.map(fn, tasks, chunksize=chunksize)
+
+
+def run_sweep(
+    base: Parameters,
+    scenarios: Sequence[Dict[str, Any]],
+    path: str,
+    file_format: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    dtype: str = "float64",
+) -> Dict[int, str]:
+    """Write every scenario's projection to path in dtype; returns the errors by scenario."""
+    if file_format is None:
+        file_format = FORMATS.get(os.path.splitext(path)[1], "parquet")
+
+    metadata = {
+        "scenarios": json.dumps({
+            scenario: {name: str(value) for name, value in changes.items()}
+            for scenario, changes in enumerate(scenarios)
+        }),
+    }
+    records, invalid = ParameterRecord.create_valid(base, get_columns(base, scenarios))
+    tasks = [(scenario, p, dtype) for scenario, p in records.items()]
+
+    errors = {}
+    for scenario, error in invalid.items():
+        logger.error('Scenario %s is invalid: %s', scenario, error)
+        errors[scenario] = f"ValueError: {error}"
+    with ColumnarWriter(path, file_format, metadata, dtype) as writer:
+        write_results(writer, map_processes(run_scenario, tasks, max_workers), errors)
+    return errors
+
+
+def write_results(writer: ColumnarWriter, results: Iterable, errors: Dict[int, str]):
+    for scenario, columns, error in results:
+        if error is not None:
+            logger.error('Scenario %s failed: %s', scenario, error)
+            errors[scenario] = error
+        else:
+            writer.write(columns)
+
+
+class ColumnarWriter:
+    """Stream record batches with one schema into a Parquet or Arrow IPC file.
+
+    Batches are buffered and written together once they reach batch_rows
+    rows, and on close, so each Parquet row group holds many scenarios.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        file_format: str,
+        metadata: Dict[str, str],
+        dtype: str = "float64",
+        batch_rows: int = BATCH_ROWS,
+    ):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Sweeps require pyarrow: pip install penn_chime[columnar]")
+
+        self.pa = pa
+        self.schema = pa.schema(
+            [
+                ("scenario", pa.int64()),
+                ("day", pa.int64()),
+                ("date", pa.date32()),
+                *((column, pa.from_numpy_dtype(np.dtype(dtype))) for column in COLUMNS),
+            ],
+            metadata=metadata,
+        )
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema)
+        elif file_format in ("arrow", "feather"):
+            # Feather version 2 is the Arrow IPC file format
+            file_format = "arrow"
+            self.writer = pa.ipc.new_file(path, self.schema)
+        else:
+            raise ValueError(f"file_format must be one of {list(COLUMNAR_FORMATS)}.")
+        self.file_format = file_format
+        self.batch_rows = batch_rows
+        self.batches = []
+        self.rows = 0
+
+    def write(self, columns: Dict[str, np.ndarray]):
+        batch = self.pa.RecordBatch.from_arrays(
+            [self.pa.array(columns[field.name], type=field.type) for field in self.schema],
+            schema=self.schema,
+        )
+        self.batches.append(batch)
+        self.rows += batch.num_rows
+        if self.rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered batches as one table."""
+        if not self.batches:
+            return
+        table = self.pa.Table.from_batches(self.batches, schema=self.schema)
+        if self.file_format == "parquet":
+            self.writer.write_table(table, row_group_size=table.num_rows)
+        else:
+            self.writer.write_table(table, max_chunksize=table.num_rows)
+        self.batches = []
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+    def __enter__(self) -> ColumnarWriter:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
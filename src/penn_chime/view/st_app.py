@@ -1,6 +1,8 @@
 """App."""
 
 import os
+import sys
+from logging import INFO, basicConfig
 
 import altair as alt
 import streamlit as st
@@ -12,8 +14,8 @@ i18n.set('locale', lang)
 i18n.set('fallback', 'en')
 i18n.load_path.append(os.path.dirname(__file__) + '/../locales')
 
+from ..model.cache import ModelCache
 from ..model.parameters import Parameters
-from ..model.sir import Sir
 from ..model.ppe import PPE
 from .charts import (
     build_admits_chart,
@@ -32,7 +34,17 @@ from ..constants import (
     DOCS_URL,
 )
 
+model_cache = ModelCache.from_env(os.environ)
+
+
 def main():
+    # Streamlit reruns main on every interaction; basicConfig only configures once
+    basicConfig(
+        level=INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+
     # This is somewhat dangerous:
     # Hide the main menu with "Rerun", "run on Save", "clear cache", and "record a screencast"
     # This should not be hidden in prod, but removed
@@ -43,7 +55,7 @@ def main():
     ppe = PPE(os.environ)
 
     p = display_sidebar(st, d)
-    m = Sir(p)
+    m = model_cache.get_or_create(p)
     
     if not m.reasonable_model_parameters:
         st.subheader("Based on the current parameters, estimated pre-mitigation doubling time is greater than 15 days. Try different parameters.")
@@ -69,7 +69,7 @@ def display_header(st, m, p):
             market_share=p.market_share,
             recovery_days=p.infectious_days,
             r_naught=m.r_naught,
-            doubling_time=p.doubling_time,
+            doubling_time=m.doubling_time,
             daily_growth=m.daily_growth_rate * 100.0,
             infected_population_warning_str=infected_population_warning_str,
             mitigation_str=(
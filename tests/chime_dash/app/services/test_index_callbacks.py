@@ -0,0 +1,51 @@
+"""Test the model change callback."""
+
+import pytest
+
+from chime_dash.app.pages.index import Index
+from chime_dash.app.services import callbacks
+from chime_dash.app.services.callbacks import FIGURES, IndexCallbacks
+from chime_dash.app.utils import parameters_serializer
+from penn_chime.model.cache import ModelCache, ResultCache
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    model_cache = ModelCache()
+    render_cache = ResultCache()
+    monkeypatch.setattr(callbacks, "model_cache", model_cache)
+    monkeypatch.setattr(callbacks, "render_cache", render_cache)
+    return model_cache, render_cache
+
+
+def test_handle_model_change_cached(param, caches):
+    model_cache, render_cache = caches
+    index = Index("en", param)
+    sidebar_data = {"parameters": parameters_serializer(param)}
+
+    result = IndexCallbacks.handle_model_change(index, sidebar_data, [None] * 3, [None] * 3)
+    assert len(result) == 10
+    assert model_cache.misses == 1
+
+    # A timestamp change renders nothing
+    assert IndexCallbacks.handle_model_change(index, sidebar_data, [None] * 3, [None] * 3) == result
+    assert render_cache.hits == 1
+    assert model_cache.stats()["hits"] == 0
+
+    param.relative_contact_rate = 0.5
+    changed = {"parameters": parameters_serializer(param)}
+    assert IndexCallbacks.handle_model_change(index, changed, [None] * 3, [None] * 3) != result
+    assert render_cache.misses == 2
+
+
+def test_handle_model_change_zoom(param, caches):
+    index = Index("en", param)
+    sidebar_data = {"parameters": parameters_serializer(param)}
+    relayout_data = {"xaxis.range[0]": "2020-04-01", "xaxis.range[1]": "2020-05-01"}
+
+    result = IndexCallbacks.handle_model_change(index, sidebar_data, [None] * 3, [None, relayout_data, None])
+    assert result[FIGURES[1]]["layout"]["xaxis"]["range"] == ["2020-04-01", "2020-05-01"]
+
+    # The zoom is not kept in the cached figure
+    result = IndexCallbacks.handle_model_change(index, sidebar_data, [None] * 3, [None] * 3)
+    assert result[FIGURES[1]]["layout"]["xaxis"].get("range") != ["2020-04-01", "2020-05-01"]
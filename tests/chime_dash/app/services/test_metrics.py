@@ -0,0 +1,84 @@
+import json
+
+import dash_core_components as dcc
+import dash_html_components as html
+import pytest
+
+from chime_dash.app.services import metrics
+from chime_dash.app.services.metrics import Histogram, Metrics
+from chime_dash.app.utils.callbacks import ChimeCallback
+from penn_chime.model.cache import ModelCache, ResultCache
+from penn_chime.model.sir import NULL_STATS, Sir, set_stats_sink
+
+
+@pytest.fixture
+def server_metrics(dash_app, monkeypatch):
+    """A dash app with one callback, serving fresh metrics."""
+    m = Metrics()
+    monkeypatch.setattr("chime_dash.app.utils.callbacks.METRICS", m)
+    dash_app.layout = html.Div(
+        id="root",
+        children=[
+            dcc.Input(id="input-id", value="initial value", type="text"),
+            html.Div(id="output-id"),
+        ],
+    )
+    ChimeCallback(
+        changed_elements={"input-id": "value"},
+        callback_fn=lambda value: ["x" * 4096],
+        dom_updates={"output-id": "children"},
+        memoize=False,
+        name="fill",
+    ).wrap(dash_app)
+    cache = ModelCache()
+    m.register(dash_app.server, cache, ResultCache())
+    yield dash_app.server.test_client(), m, cache
+    set_stats_sink(None)
+
+
+def test_histogram():
+    h = Histogram("latency_seconds", "Latency.", "callback", (0.1, 1.0))
+    h.observe('a"b', 0.5)
+    h.observe('a"b', 2.0)
+    assert h.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{callback="a\\"b",le="0.1"} 0',
+        'latency_seconds_bucket{callback="a\\"b",le="1.0"} 1',
+        'latency_seconds_bucket{callback="a\\"b",le="+Inf"} 2',
+        'latency_seconds_sum{callback="a\\"b"} 2.5',
+        'latency_seconds_count{callback="a\\"b"} 2',
+    ]
+
+
+def test_metrics_route(server_metrics, param):
+    client, m, cache = server_metrics
+    response = client.post(
+        "/_dash-update-component",
+        data=json.dumps({
+            "output": "..output-id.children..",
+            "outputs": [{"id": "output-id", "property": "children"}],
+            "inputs": [{"id": "input-id", "property": "value", "value": "new"}],
+            "changedPropIds": ["input-id.value"],
+            "state": [],
+        }),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    cache.get_or_create(param)
+
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert 'chime_callback_seconds_count{callback="fill"} 1' in text
+    assert 'chime_callback_payload_bytes_bucket{callback="fill",le="1024.0"} 0' in text
+    assert 'chime_callback_payload_bytes_count{callback="fill"} 1' in text
+    assert 'chime_model_seconds_count{phase="sir"} 1' in text
+    assert "chime_requests_in_flight 0.0" in text
+    assert "chime_model_cache_misses_total 1" in text
+    assert "chime_render_cache_entries 0" in text
+    assert m.in_flight.value == 0
+
+
+def test_register_sets_stats_sink(server_metrics, param):
+    assert Sir(param).stats is not NULL_STATS
@@ -0,0 +1,60 @@
+import json
+
+import dash_html_components as html
+import pytest
+from dash.exceptions import PreventUpdate
+
+from chime_dash.app.services.tracing import Tracer
+from chime_dash.app.utils.callbacks import ChimeCallback
+
+
+def test_tracer_span():
+    tracer = Tracer(sample_rate=1.0, buffer_size=2)
+    with tracer.span("a", ["x.value"]) as span:
+        span.set_output([{"data": [1, 2]}])
+    with pytest.raises(PreventUpdate):
+        with tracer.span("b", ["y.value"]):
+            raise PreventUpdate
+    with pytest.raises(KeyError):
+        with tracer.span("c", []):
+            raise KeyError("z")
+
+    # The ring buffer keeps the latest spans
+    b, c = tracer.spans()
+    assert (b.callback, b.inputs, b.prevented, b.output_bytes, b.error) == ("b", ["y.value"], True, None, None)
+    assert c.error == "KeyError"
+    assert c.duration >= 0.0
+    assert tracer.spans("b") == [b]
+
+
+def test_tracer_sampling():
+    tracer = Tracer(sample_rate=0.0)
+    with tracer.span("a", []) as span:
+        span.set_output({})
+    assert tracer.spans() == []
+
+    with pytest.raises(ValueError):
+        Tracer(sample_rate=2.0)
+    tracer = Tracer.from_env({"CHIME_TRACE_SAMPLE_RATE": "0.5", "CHIME_TRACE_BUFFER": "8"})
+    assert (tracer.sample_rate, tracer.buffer.maxlen) == (0.5, 8)
+
+
+def test_callback_span(dash_app, monkeypatch):
+    tracer = Tracer(sample_rate=1.0)
+    monkeypatch.setattr("chime_dash.app.utils.callbacks.TRACER", tracer)
+    callback = ChimeCallback(
+        changed_elements={"input-id": "value"},
+        callback_fn=lambda value: [value * 2],
+        dom_updates={"output-id": "children"},
+    )
+    assert callback.invoke("ab") == ["abab"]
+
+    span, = tracer.spans()
+    assert span.callback == "<lambda>.output-id"
+    assert span.inputs == ["input-id.value"]
+    assert span.output_bytes == len(json.dumps(["abab"]))
+
+    dash_app.layout = html.Div(id="root")
+    tracer.register(dash_app.server)
+    traces = dash_app.server.test_client().get("/traces?callback=<lambda>.output-id").get_json()
+    assert traces[0]["output_bytes"] == span.output_bytes
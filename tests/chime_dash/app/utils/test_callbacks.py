@@ -1,11 +1,12 @@
-from unittest.mock import patch, MagicMock
+from datetime import date, timedelta
+from unittest.mock import MagicMock
 
 import dash_core_components as dcc
 import dash_html_components as html
 import pytest
-from dash import Dash
-from dash.dependencies import Input, Output
+from dash.exceptions import PreventUpdate
 
+from penn_chime.model.cache import ResultCache
 from src.chime_dash.app.utils.callbacks import (
     ChimeCallback,
     register_callbacks,
@@ -68,3 +69,97 @@ def test_ChimeCallback_wrap(dash_app):
         {"id": "input-id", "property": "value"}
     ]
     assert dash_app.callback_map["..output-id.children.."]["callback"]
+
+
+@pytest.fixture
+def callback_cache(monkeypatch):
+    cache = ResultCache(max_entries=2)
+    monkeypatch.setattr("src.chime_dash.app.utils.callbacks.CALLBACK_CACHE", cache)
+    return cache
+
+
+def counting_callback(calls, **kwargs):
+    def callback_fn(*args):
+        calls.append(args)
+        return [len(calls)]
+    return ChimeCallback(
+        changed_elements={"input-id": "value"},
+        callback_fn=callback_fn,
+        dom_updates={"output-id": "children"},
+        **kwargs,
+    )
+
+
+def test_ChimeCallback_memoize(callback_cache):
+    calls = []
+    callback = counting_callback(calls)
+    store = {"parameters": "{}", "inputs_dict": {"a": 1, "b": date(2020, 4, 1)}}
+    reordered = {"inputs_dict": {"b": date(2020, 4, 1), "a": 1}, "parameters": "{}"}
+
+    assert callback.invoke(1, store) == [1]
+    assert callback.invoke(1, reordered) == [1]
+    assert callback.invoke(2, store) == [2]
+    assert len(calls) == 2
+    assert callback_cache.hits == 1
+    assert callback_cache.misses == 2
+
+    # Bounded
+    callback.invoke(3, store)
+    assert callback_cache.stats()["entries"] == 2
+    assert callback_cache.evictions == 1
+
+
+def test_ChimeCallback_memoize_day(callback_cache, monkeypatch):
+    """Outputs cached on one day are not returned the next, when missing dates resolve differently."""
+    calls = []
+    callback = counting_callback(calls)
+    callback.invoke(1)
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr("src.chime_dash.app.utils.callbacks.date", Tomorrow)
+    callback.invoke(1)
+    assert len(calls) == 2
+
+
+def test_ChimeCallback_memoize_identity(callback_cache):
+    calls = []
+    counting_callback(calls, name="first").invoke(1)
+    counting_callback(calls, name="second").invoke(1)
+    assert len(calls) == 2
+
+
+def test_ChimeCallback_not_memoized(callback_cache):
+    calls = []
+    callback = counting_callback(calls, memoize=False)
+    callback.invoke(1)
+    callback.invoke(1)
+
+    # Arguments json cannot encode are not memoized
+    callback = counting_callback(calls)
+    argument = object()
+    callback.invoke(argument)
+    callback.invoke(argument)
+    assert len(calls) == 4
+    assert callback_cache.stats()["entries"] == 0
+
+
+def test_ChimeCallback_memoize_prevent_update(callback_cache):
+    calls = []
+
+    def callback_fn(value):
+        calls.append(value)
+        raise PreventUpdate
+
+    callback = ChimeCallback(
+        changed_elements={"input-id": "value"},
+        callback_fn=callback_fn,
+        dom_updates={"output-id": "children"},
+    )
+    for _ in range(2):
+        with pytest.raises(PreventUpdate):
+            callback.invoke(1)
+    assert len(calls) == 2
@@ -0,0 +1,69 @@
+from copy import copy
+from datetime import timedelta
+
+import pytest
+
+from penn_chime.model.batch import BatchFit
+from penn_chime.model.parameters import Disposition
+from penn_chime.model.sir import Sir
+
+
+def get_fit(model):
+    return model.i_day, model.doubling_time, model.beta, model.beta_t
+
+
+@pytest.fixture
+def parameter_sets(param):
+    """Parameter sets fit by both branches, with differing horizons and dispositions."""
+    ps = []
+    for mitigation_offset, doubling_time in ((-20, 3.0), (-3, 4.0), (0, 6.0), (12, 6.0)):
+        p = copy(param)
+        p.mitigation_date = param.current_date + timedelta(days=mitigation_offset)
+        p.doubling_time = doubling_time
+        p.n_days = 30 + mitigation_offset % 7
+        ps.append(p)
+    for days_ago, current_hospitalized, days in ((10, 30, 5), (21, 100, 7), (43, 100, 9)):
+        p = copy(param)
+        p.date_first_hospitalized = param.current_date - timedelta(days=days_ago)
+        p.doubling_time = None
+        p.current_hospitalized = current_hospitalized
+        p.hospitalized = Disposition.create(rate=0.05, days=days)
+        p.dispositions = dict(p.dispositions, hospitalized=p.hospitalized)
+        ps.append(p)
+    return ps
+
+
+def test_batch_fit(parameter_sets):
+    """Each parameter set should be fit exactly as Sir fits it alone."""
+    fit = BatchFit([copy(p) for p in parameter_sets], max_elements=2 ** 19)
+
+    assert len(fit) == len(parameter_sets)
+    assert fit.reasonable_model_parameters.all()
+    for k, p in enumerate(parameter_sets):
+        expected = Sir(copy(p))
+        assert (fit.i_day[k], fit.doubling_time[k], fit.beta[k], fit.beta_t[k]) == get_fit(expected)
+
+
+def test_batch_fit_unreasonable(param):
+    """A doubling time beyond 15 days is flagged instead of ending the fit."""
+    slow = copy(param)
+    slow.date_first_hospitalized = param.current_date - timedelta(days=10)
+    slow.doubling_time = None
+    slow.current_hospitalized = 1
+    assert not Sir(copy(slow)).reasonable_model_parameters
+
+    # Refining this fit runs off the top of the grid
+    edge = copy(slow)
+    edge.date_first_hospitalized = param.current_date - timedelta(days=43)
+    with pytest.raises(IndexError):
+        Sir(copy(edge))
+
+    fit = BatchFit([slow, param, edge])
+    assert fit.reasonable_model_parameters.tolist() == [False, True, False]
+    assert fit.i_day[1] == Sir(copy(param)).i_day
+
+
+def test_batch_fit_requires_a_fit_input(param):
+    param.doubling_time = None
+    with pytest.raises(AssertionError):
+        BatchFit([param])
@@ -0,0 +1,132 @@
+"""Test model cache."""
+
+from datetime import timedelta
+
+from penn_chime.model import cache as cache_module
+from penn_chime.model.cache import DiskStore, ModelCache, ResultCache, fingerprint
+from penn_chime.model.parameters import Disposition
+
+
+def test_fingerprint(param):
+    key = fingerprint(param)
+    assert key == fingerprint(param)
+
+    param.max_y_axis = 1000
+    param.use_log_scale = True
+    assert key == fingerprint(param)
+
+    param.icu = Disposition.create(rate=0.03, days=9)
+    assert key != fingerprint(param)
+
+
+def test_fingerprint_numbers(param):
+    key = fingerprint(param)
+    param.n_days = 60.0
+    assert key == fingerprint(param)
+
+
+def test_model_cache_lru(param):
+    cache = ModelCache(max_entries=1)
+    model = cache.get_or_create(param)
+    assert cache.get_or_create(param) is model
+
+    param.relative_contact_rate = 0.5
+    cache.get_or_create(param)
+    assert cache.stats() == {
+        "entries": 1,
+        "hits": 1,
+        "disk_hits": 0,
+        "misses": 2,
+        "evictions": 1,
+        "disk_evictions": 0,
+        "expirations": 0,
+    }
+
+
+def test_model_cache_fitted_doubling_time(param):
+    param.date_first_hospitalized = param.current_date - timedelta(days=43)
+    param.doubling_time = None
+    cache = ModelCache()
+    doubling_time = cache.get_or_create(param).doubling_time
+
+    assert cache.get_or_create(param).doubling_time == doubling_time
+    assert cache.get_or_create(param.freeze()).doubling_time == doubling_time
+    assert param.doubling_time is None
+    assert cache.hits == 2
+
+
+def test_model_cache_disk_store(param, tmp_path):
+    model = ModelCache(store=DiskStore(str(tmp_path))).get_or_create(param)
+
+    # Another worker shares the directory
+    cache = ModelCache(store=DiskStore(str(tmp_path)))
+    shared = cache.get_or_create(param)
+    assert shared.i_day == model.i_day
+    assert shared.census_df.equals(model.census_df)
+    assert cache.disk_hits == 1
+    assert cache.misses == 0
+
+
+def test_disk_store_eviction(tmp_path):
+    store = DiskStore(str(tmp_path), max_entries=2)
+    for key in "abc":
+        store.set(key, key)
+    assert store.evictions == 1
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_result_cache_max_age(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", lambda: now[0])
+    cache = ResultCache(store=DiskStore(str(tmp_path), max_age=60), max_age=60)
+    cache.put("key", [1, 2])
+
+    now[0] += 30
+    assert cache.get("key") == [1, 2]
+
+    # Expired both in memory and on disk
+    now[0] += 31
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 2
+    assert not list(tmp_path.iterdir())
+
+
+def test_result_cache_from_env(tmp_path):
+    cache = ResultCache.from_env({
+        "CHIME_CACHE_DIR": str(tmp_path),
+        "CHIME_CACHE_SIZE": "4",
+        "CHIME_CACHE_BYTES": "1024",
+        "CHIME_CACHE_TTL": "30",
+    }, "render")
+    assert (cache.max_entries, cache.max_age) == (4, 30.0)
+    assert cache.store.directory == str(tmp_path / "render")
+    assert (cache.store.max_bytes, cache.store.max_age) == (1024, 30.0)
+
+    cache = ResultCache.from_env({})
+    assert cache.store is None and cache.max_age is None
+
+
+def test_disk_store_unreadable_entry(tmp_path):
+    store = DiskStore(str(tmp_path))
+    with open(store.path("key"), "wb") as fout:
+        fout.write(b"not a pickle")
+    assert store.get("key") is None
+
+
+def test_result_cache_max_bytes():
+    cache = ResultCache(max_entries=8, max_bytes=2500)
+    for key in "abc":
+        cache.put(key, b"x" * 1000)
+    assert list(cache.entries) == ["b", "c"]
+    assert cache.evictions == 1
+    assert cache.bytes <= 2500
+
+    # Larger than the whole cache
+    cache.put("d", b"x" * 3000)
+    assert cache.get("d") is None
+    assert list(cache.entries) == ["b", "c"]
+
+    # Values that cannot be pickled are not cached
+    cache.put("e", lambda: None)
+    assert cache.get("e") is None
+    assert list(cache.entries) == ["b", "c"]
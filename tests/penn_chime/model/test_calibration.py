@@ -0,0 +1,62 @@
+from copy import copy
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from penn_chime.model.calibration import Calibration, read_census
+from penn_chime.model.sir import Sir
+
+
+@pytest.fixture
+def calibration_param(param):
+    p = copy(param)
+    p.mitigation_date = param.current_date - timedelta(days=10)
+    return p
+
+
+@pytest.fixture
+def observed(calibration_param):
+    """Three weeks of census up to current_date, projected by Sir."""
+    census_df = Sir(calibration_param).census_df
+    census_df = census_df[(census_df.day > -21) & (census_df.day <= 0)]
+    return census_df[["date", "census_hospitalized"]].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("fit_relative_contact_rate", [False, True])
+def test_calibration(calibration_param, observed, fit_relative_contact_rate):
+    """Calibration should recover the parameters that projected the series."""
+    model = Sir(calibration_param)
+    p = copy(calibration_param)
+    p.doubling_time = 3.0
+    if fit_relative_contact_rate:
+        p.relative_contact_rate = 0.5
+
+    cal = Calibration(p, observed, fit_relative_contact_rate=fit_relative_contact_rate)
+    assert cal.doubling_time == pytest.approx(calibration_param.doubling_time)
+    assert cal.relative_contact_rate == pytest.approx(calibration_param.relative_contact_rate)
+    assert cal.i_day == model.i_day
+    assert cal.rmse == pytest.approx(0.0, abs=1e-6)
+    assert cal.fit_evaluations > 0
+
+    assert cal.parameters.doubling_time == cal.doubling_time
+    assert p.doubling_time == 3.0
+    assert np.allclose(
+        cal.model.census_df.census_hospitalized.values,
+        model.census_df.census_hospitalized.values,
+        equal_nan=True,
+    )
+
+
+def test_read_census(tmp_path, observed):
+    path = tmp_path / "census.csv"
+    observed.rename(columns={"census_hospitalized": "census"}).to_csv(path, index=False)
+    df = read_census(str(path))
+    assert list(df.columns) == ["date", "census"]
+    assert np.allclose(df.census.values, observed.census_hospitalized.values)
+
+    with pytest.raises(ValueError):
+        read_census(pd.DataFrame({"date": observed.date, "admits": 1}))
+    with pytest.raises(ValueError):
+        read_census(pd.DataFrame({"date": observed.date, "census": np.nan}))
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from penn_chime.model.monte_carlo import (
+    Distribution,
+    MonteCarlo,
+    parse_samples,
+)
+from penn_chime.model.sir import calculate_census, sim_sir
+
+
+def test_distribution_parse():
+    assert Distribution.parse("normal:4,0.5") == Distribution("normal", (4.0, 0.5))
+    assert Distribution.parse("fixed:7") == Distribution("fixed", (7.0,))
+
+    with pytest.raises(ValueError):
+        Distribution.parse("cauchy:0,1")
+    with pytest.raises(ValueError):
+        Distribution.parse("triangular:1,2")
+
+
+def test_parse_samples():
+    distributions = parse_samples(["relative-contact-rate=uniform:0.1,0.3", "icu_days=fixed:8"])
+    assert distributions == {
+        "relative_contact_rate": Distribution("uniform", (0.1, 0.3)),
+        "icu_days": Distribution("fixed", (8.0,)),
+    }
+
+    with pytest.raises(ValueError):
+        parse_samples(["population=normal:1,1"])
+
+
+def test_calculate_census_per_scenario_days():
+    raw = sim_sir(5, 6, 7, 0.1, 0, [(0.1, 40)])
+    admits = np.diff(raw["ever_infected"], prepend=np.nan)
+    batch = {"day": np.tile(raw["day"], (3, 1)), "admits_x": np.tile(admits, (3, 1))}
+    calculate_census(batch, {"x": np.array([1, 7, 60])})
+
+    for n, days in enumerate((1, 7, 60)):
+        expected = {"day": raw["day"], "admits_x": admits}
+        calculate_census(expected, {"x": days})
+        assert np.array_equal(batch["census_x"][n], expected["census_x"])
+
+
+def test_monte_carlo_fixed(param, model):
+    """Without any sampled parameters, every band is the deterministic projection."""
+    mc = MonteCarlo(param, {}, n_draws=20, model=model)
+
+    for key in model.rates:
+        for percentile in mc.percentiles:
+            band = f"census_{key}_p{percentile:g}"
+            assert np.array_equal(mc.census_df[band], model.census_df["census_" + key])
+            band = f"admits_{key}_p{percentile:g}"
+            assert np.array_equal(mc.admits_df[band], model.admits_df["admits_" + key], equal_nan=True)
+
+
+def test_monte_carlo_no_draws(param, model):
+    with pytest.raises(ValueError, match="n_draws must be at least 1"):
+        MonteCarlo(param, {}, n_draws=0, model=model)
+
+
+def test_monte_carlo_bands(param, model):
+    distributions = parse_samples([
+        "doubling_time=normal:6,0.5",
+        "relative_contact_rate=uniform:0.1,0.3",
+        "hospitalized_days=triangular:5,7,10",
+    ])
+    mc = MonteCarlo(param, distributions, n_draws=500, seed=1, model=model)
+
+    assert mc.draws["hospitalized_days"].dtype.kind == "i"
+    assert len(mc.census_df) == len(model.census_df)
+    bands = mc.census_df[[f"census_hospitalized_p{q}" for q in (5, 25, 50, 75, 95)]].values
+    assert (np.diff(bands, axis=1) >= 0.0).all()
+    assert (bands[-1, 4] > bands[-1, 0])
+
+    # Chunked runs draw the same samples
+    chunked = MonteCarlo(param, distributions, n_draws=500, seed=1, model=model, max_workers=1, chunk_size=128)
+    assert chunked.census_df.equals(mc.census_df)
+
+
+def test_monte_carlo_float32(param, model):
+    """float32 draws give the float64 bands to float32 precision."""
+    distributions = parse_samples(["doubling_time=normal:6,0.5", "icu_days=uniform:7,11"])
+    mc = MonteCarlo(param, distributions, n_draws=200, seed=1, model=model)
+    mc32 = MonteCarlo(param, distributions, n_draws=200, seed=1, model=model, dtype="float32")
+
+    for column in mc.census_df.columns[2:]:
+        expected = mc.census_df[column].values
+        assert np.allclose(mc32.census_df[column].values, expected, rtol=0.0, atol=1e-5 * expected.max())
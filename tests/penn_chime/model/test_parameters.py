@@ -1,6 +1,11 @@
 """Test Parameters."""
 
-from penn_chime.model.parameters import Parameters
+import pickle
+
+import numpy as np
+import pytest
+
+from penn_chime.model.parameters import FrozenParameters, Parameters, cast_arg
 
 
 def test_cypress_defaults():
@@ -19,3 +24,70 @@ def test_webapp_defaults():
     """Ensure the webapp defaults have been updated."""
     # TODO how to make this work when the module is installed?
     _ = Parameters.create({"PARAMETERS": "./defaults/webapp.cfg"}, [])
+
+
+def test_replace(param):
+    """Replace returns a validated copy."""
+    replaced = param.replace(doubling_time=3.0, icu_days=12)
+    assert replaced.doubling_time == 3.0
+    assert replaced.icu.days == 12
+    assert replaced.icu.rate == param.icu.rate
+    assert replaced.dispositions["icu"] == replaced.icu
+    assert param.doubling_time == 6.0
+
+    with pytest.raises(ValueError):
+        param.replace(market_share=2.0)
+    with pytest.raises(ValueError):
+        param.replace(unknown=1)
+
+
+def test_cast_arg():
+    assert cast_arg("n_days", "20") == 20
+    assert cast_arg("relative_contact_rate", "0.25") == 0.25
+    with pytest.raises(ValueError):
+        cast_arg("n_days", "45")
+
+
+def test_fingerprint(param):
+    """The fingerprint covers the model fields only, and not how numbers are typed."""
+    key = param.fingerprint()
+    assert len(key) == 64
+    assert param.replace(max_y_axis=1000, use_log_scale=True).fingerprint() == key
+    assert param.replace(n_days=60.0, population=np.int64(500000)).fingerprint() == key
+    assert param.replace(icu_days=10).fingerprint() != key
+
+
+def test_freeze(param):
+    frozen = param.freeze()
+    assert isinstance(frozen, FrozenParameters)
+    assert frozen.fingerprint() == param.fingerprint()
+    assert frozen.freeze() is frozen
+
+    with pytest.raises(AttributeError):
+        frozen.doubling_time = 3.0
+    with pytest.raises(AttributeError):
+        del frozen.n_days
+    assert frozen.doubling_time == 6.0
+
+    replaced = frozen.replace(doubling_time=3.0)
+    assert isinstance(replaced, FrozenParameters)
+    assert replaced.doubling_time == 3.0
+
+
+def test_frozen_hash(param):
+    frozen = param.freeze()
+    assert frozen == param.freeze()
+    assert hash(frozen) == hash(param.freeze())
+    assert frozen != frozen.replace(doubling_time=3.0)
+    # Equal models, but not equal parameters
+    assert frozen != frozen.replace(max_y_axis=1000)
+    assert len({frozen, param.freeze(), frozen.replace(icu_days=10)}) == 2
+
+
+def test_frozen_pickle(param):
+    frozen = param.freeze()
+    restored = pickle.loads(pickle.dumps(frozen))
+    assert restored == frozen
+    assert hash(restored) == hash(frozen)
+    with pytest.raises(AttributeError):
+        restored.n_days = 10
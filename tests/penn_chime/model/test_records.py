@@ -0,0 +1,115 @@
+"""Test parameter records."""
+
+import pickle
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from penn_chime.model.batch import BatchFit
+from penn_chime.model.parameters import Disposition
+from penn_chime.model.records import ParameterRecord
+from penn_chime.model.sir import Sir
+
+
+def test_create_batch(param):
+    """Each record has the fields replace would give, and fits the same model."""
+    doubling_times = np.array([3.0, 4.5, 6.0])
+    icu_days = [5, 9, 12]
+    records = ParameterRecord.create_batch(param, {"doubling_time": doubling_times, "icu_days": icu_days})
+
+    assert len(records) == 3
+    for record, doubling_time, days in zip(records, doubling_times, icu_days):
+        p = param.replace(doubling_time=doubling_time, icu_days=days)
+        assert record.fingerprint() == p.fingerprint()
+        assert record.icu == Disposition(days, param.icu.rate)
+        assert record.dispositions["icu"] == record.icu
+        assert record.max_y_axis == param.max_y_axis
+        assert np.array_equal(Sir(record).raw.block, Sir(p).raw.block, equal_nan=True)
+
+
+def test_create_batch_dispositions(param):
+    icu = [Disposition.create(days=4, rate=0.01), Disposition.create(days=8, rate=0.03)]
+    records = ParameterRecord.create_batch(param, {"icu": icu, "ventilated_rate": [0.02, 0.04]})
+    assert [record.icu for record in records] == icu
+    assert [record.ventilated for record in records] == [
+        Disposition(param.ventilated.days, 0.02),
+        Disposition(param.ventilated.days, 0.04),
+    ]
+
+
+def test_create_batch_validation(param):
+    with pytest.raises(ValueError, match=r"2 rows\. Row 1: market_share: 2\.0 needs .* Row 2: market_share: -1 needs"):
+        ParameterRecord.create_batch(param, {"market_share": [0.1, 2.0, -1]})
+    with pytest.raises(ValueError, match="Row 0: n_days is required"):
+        ParameterRecord.create_batch(param, {"n_days": [None, 30]})
+    with pytest.raises(ValueError, match="Row 1: icu_days: 0 needs"):
+        ParameterRecord.create_batch(param, {"icu_days": [3, 0]})
+    with pytest.raises(ValueError, match="date_first_hospitalized: 2020-03-01 must be a date"):
+        ParameterRecord.create_batch(param, {"date_first_hospitalized": [None, "2020-03-01"]})
+    with pytest.raises(ValueError, match="must be a number"):
+        ParameterRecord.create_batch(param, {"doubling_time": ["fast"]})
+    with pytest.raises(ValueError, match="Row 1: n_days: '30' must be a number"):
+        ParameterRecord.create_batch(param, {"n_days": [30, "30"]})
+    with pytest.raises(ValueError, match="different lengths"):
+        ParameterRecord.create_batch(param, {"doubling_time": [3.0], "n_days": [30, 40]})
+    with pytest.raises(ValueError, match="Unexpected parameter"):
+        ParameterRecord.create_batch(param, {"unknown": [1]})
+
+    # Optional fields may be missing
+    records = ParameterRecord.create_batch(param, {"doubling_time": [None, 4.0]})
+    assert records[0].doubling_time is None
+
+
+def test_create_batch_many_invalid_rows(param):
+    with pytest.raises(ValueError, match="10 rows.*And 5 more rows"):
+        ParameterRecord.create_batch(param, {"relative_contact_rate": np.full(10, 1.5)})
+
+
+def test_create_valid(param):
+    """Invalid rows are left out, with every error of each."""
+    records, errors = ParameterRecord.create_valid(param, {
+        "doubling_time": np.array([3.0, -1.0, 4.0, 5.0]),
+        "icu_rate": [0.1, 0.2, 1.5, 0.3],
+    })
+    assert list(records) == [0, 3]
+    assert records[3].doubling_time == 5.0
+    assert records[3].icu == Disposition(param.icu.days, 0.3)
+    assert list(errors) == [1, 2]
+    assert errors[1].startswith("doubling_time: -1.0 needs")
+    assert errors[2] == "icu_rate: 1.5 needs to be a rate (i.e. in [0,1])."
+
+
+def test_record(param):
+    record = ParameterRecord.from_parameters(param)
+    assert not hasattr(record, "__dict__")
+    assert record.fingerprint() == param.fingerprint()
+    assert record.to_parameters().fingerprint() == param.fingerprint()
+    assert set(record.labels) == set(param.labels)
+
+    restored = pickle.loads(pickle.dumps(record))
+    assert restored.fingerprint() == record.fingerprint()
+    assert restored.dispositions == param.dispositions
+
+
+def test_record_to_parameters_validates(param):
+    record = ParameterRecord.from_parameters(param)
+    record.market_share = 2.0
+    with pytest.raises(ValueError):
+        record.to_parameters()
+
+
+def test_batch_fit_records(param):
+    param.date_first_hospitalized = param.current_date - timedelta(days=21)
+    param.doubling_time = None
+    records = ParameterRecord.create_batch(param, {"current_hospitalized": [30, 100]})
+    fit = BatchFit(records)
+    for k, record in enumerate(records):
+        model = Sir(record)
+        assert (fit.i_day[k], fit.doubling_time[k]) == (model.i_day, model.doubling_time)
+
+
+def test_create_batch_dates(param):
+    records = ParameterRecord.create_batch(param, {"mitigation_date": [None, date(2020, 3, 20)]})
+    assert records[0].mitigation_date == date.today()
+    assert records[1].mitigation_date == date(2020, 3, 20)
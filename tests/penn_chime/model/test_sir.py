@@ -1,15 +1,29 @@
+import pickle
+from copy import copy
 from datetime import date
+from pathlib import Path
 
 import pytest
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 
-from penn_chime.constants import EPSILON
+from penn_chime.constants import EPSILON, PREFIT_ADDITIONAL_DAYS
+from penn_chime.model.parameters import Disposition, Parameters
 from penn_chime.model.sir import (
     sir,
     sim_sir,
+    sim_sir_batch,
+    calculate_admits,
+    calculate_census,
+    calculate_dispositions,
+    get_beta,
     get_growth_rate,
+    skip_policies,
+    log_stats,
+    set_stats_sink,
+    FLOAT32_RTOL,
+    NULL_STATS,
     Sir,
 )
 
@@ -76,6 +90,44 @@ def test_sim_sir():
     assert round(raw["recovered"][-1], 2) == 17.82
 
 
+def test_sim_sir_batch():
+    """Each batched scenario should match its scalar simulation exactly."""
+    s = np.array([5.0, 499600.0, 1000.0])
+    i = np.array([6.0, 400.0, 10.0])
+    r = np.array([7.0, 0.0, 3.0])
+    gamma = np.array([0.1, 1.0 / 14.0, 0.2])
+    betas = np.array([0.1, 4.2e-07, 0.0004])
+    betas_t = betas * 0.7
+    pre_days = np.array([10, 25, 40])
+    post_days = 40 - pre_days
+
+    raw = sim_sir_batch(s, i, r, gamma, -5, [(betas, pre_days), (betas_t, post_days)])
+    rates = {"hospitalized": 0.05, "icu": np.array([0.02, 0.01, 0.03])}
+    calculate_dispositions(raw, rates, 0.15)
+    calculate_admits(raw, rates)
+    calculate_census(raw, {"hospitalized": 7, "icu": 9})
+
+    for key in ("day", "susceptible", "infected", "recovered", "ever_infected"):
+        assert raw[key].shape == (3, 41)
+
+    for n in range(3):
+        expected = sim_sir(
+            s[n], i[n], r[n], gamma[n], -5,
+            [(betas[n], pre_days[n]), (betas_t[n], post_days[n])],
+        )
+        scenario_rates = {key: np.asarray(rate).take(n) if np.ndim(rate) else rate for key, rate in rates.items()}
+        calculate_dispositions(expected, scenario_rates, 0.15)
+        calculate_admits(expected, scenario_rates)
+        calculate_census(expected, {"hospitalized": 7, "icu": 9})
+        for key, values in expected.items():
+            assert np.array_equal(raw[key][n], values, equal_nan=True), key
+
+
+def test_sim_sir_batch_requires_equal_lengths():
+    with pytest.raises(ValueError):
+        sim_sir_batch(5, 6, 7, 0.1, 0, [(0.1, np.array([10, 20]))])
+
+
 def test_growth_rate():
     assert np.round(get_growth_rate(5) * 100.0, decimals=4) == 14.8698
     assert np.round(get_growth_rate(0) * 100.0, decimals=4) == 0.0
@@ -99,6 +151,30 @@ def test_model(model, param):
     assert model.i_day == 43
 
 
+@pytest.mark.parametrize("mitigation_offset", [-20, -3, 0, 12])
+def test_model_argmin_i_day(param, mitigation_offset):
+    """The shared-prefix i_day fit should select the same day as a full scan."""
+    param.mitigation_date = param.current_date + timedelta(days=mitigation_offset)
+    model = Sir(param)
+
+    best_i_day, best_loss = -1, float("inf")
+    for i_day in range(param.n_days + PREFIT_ADDITIONAL_DAYS):
+        model.i_day = i_day
+        mitigation_day = max(mitigation_offset, -i_day)
+        total_days = i_day + param.n_days + PREFIT_ADDITIONAL_DAYS
+        raw = model.run_projection(param, [
+            (model.beta, i_day + mitigation_day),
+            (model.beta_t, total_days - i_day - mitigation_day),
+        ])
+        if raw["census_hospitalized"].argmax() < i_day:
+            continue
+        loss = (raw["census_hospitalized"][i_day] - param.current_hospitalized) ** 2.0
+        if loss < best_loss:
+            best_i_day, best_loss = i_day, loss
+
+    assert model.get_argmin_i_day(param) == best_i_day
+
+
 def test_model_first_hosp_fit(param):
     param.date_first_hospitalized = param.current_date - timedelta(days=43)
     param.doubling_time = None
@@ -112,6 +188,52 @@ def test_model_first_hosp_fit(param):
     assert abs(my_model.doubling_time_t - 7.71)/7.71 < 0.01
 
 
+def test_model_does_not_change_parameters(param):
+    """Fitted values are on the model, and frozen parameters fit as the others."""
+    param.date_first_hospitalized = param.current_date - timedelta(days=43)
+    param.doubling_time = None
+    frozen = param.freeze()
+
+    model = Sir(param)
+    frozen_model = Sir(frozen)
+
+    assert param.doubling_time is None
+    assert frozen.doubling_time is None
+    assert model.doubling_time == frozen_model.doubling_time
+    assert abs(model.doubling_time - 6.0) < 1.0
+    assert model.date_first_hospitalized == param.date_first_hospitalized
+    assert np.array_equal(model.raw.block, frozen_model.raw.block, equal_nan=True)
+
+
+def test_model_first_hosp_fit_batched_losses(param):
+    """Batched doubling time losses should match serial projections."""
+    param.date_first_hospitalized = param.current_date - timedelta(days=43)
+    param.doubling_time = None
+    model = Sir(param)
+
+    dts = np.linspace(1, 15, 15)
+    losses = model.get_doubling_time_losses(param, dts)
+    for dt, loss in zip(dts, losses):
+        intrinsic_growth_rate = get_growth_rate(dt)
+        model.beta = get_beta(intrinsic_growth_rate, model.gamma, model.susceptible, 0.0)
+        model.beta_t = get_beta(intrinsic_growth_rate, model.gamma, model.susceptible, param.relative_contact_rate)
+        raw = model.run_projection(param, model.get_policies(param))
+        assert loss == (param.current_hospitalized - raw["census_hospitalized"][model.i_day]) ** 2.0
+
+
+def test_model_first_hosp_fit_golden(param):
+    param.date_first_hospitalized = param.current_date - timedelta(days=43)
+    param.doubling_time = None
+    grid_model = Sir(param)
+    golden_model = Sir(param, fit_strategy="golden")
+
+    assert abs(golden_model.doubling_time - grid_model.doubling_time) < 1.0e-3
+    assert golden_model.fit_evaluations < grid_model.fit_evaluations == 75
+
+    with pytest.raises(ValueError):
+        Sir(param, fit_strategy="simplex")
+
+
 def test_model_raw_start(model, param):
     raw_df = model.raw_df
 
@@ -151,6 +273,100 @@ def test_model_raw_start(model, param):
     assert [round(v, 0) for v in (d, hosp, icu, vent)] == [17, 549.0, 220.0, 110.0]
 
 
+def test_model_lazy_frames(param):
+    model = Sir(param)
+    assert "census_df" not in vars(model)
+    assert "raw_df" not in vars(model)
+
+    census_df = model.census_df
+    assert model.census_df is census_df
+    assert "raw_df" not in vars(model)
+    assert list(model.census_floor_df.columns) == [
+        "day", "date", "census_hospitalized", "census_icu", "census_ventilated",
+    ]
+
+
+def test_model_raw_columns(model):
+    block = model.raw.block
+    assert block.dtype == np.float64
+    for key in ("susceptible", "ever_icu", "admits_hospitalized", "census_ventilated"):
+        assert np.shares_memory(model.raw[key], block)
+    assert np.shares_memory(model.raw["hospitalized"], model.raw["admits_hospitalized"])
+
+    for df in (model.admits_df, model.census_df, model.sim_sir_w_date_df):
+        assert np.shares_memory(df.iloc[:, 2].values, block)
+
+    restored = pickle.loads(pickle.dumps(model.raw))
+    assert np.array_equal(restored.block, block, equal_nan=True)
+    assert np.shares_memory(restored["census_icu"], restored.block)
+    assert np.array_equal(restored["date"], model.raw["date"])
+
+
+def test_model_rebuild(param, model):
+    census_icu = model.raw["census_icu"].copy()
+
+    param.icu = Disposition.create(rate=0.03, days=12)
+    rebuilt = Sir.rebuild(model, param)
+    expected = Sir(param)
+
+    assert rebuilt.fit_evaluations == 0
+    assert rebuilt.i_day == expected.i_day
+    assert np.array_equal(rebuilt.raw.block, expected.raw.block, equal_nan=True)
+    assert rebuilt.census_df.equals(expected.census_df)
+    assert rebuilt.r_t == expected.r_t
+    assert rebuilt.infected == expected.infected
+
+    # The previous model is unchanged
+    assert np.array_equal(model.raw["census_icu"], census_icu)
+
+
+def test_model_rebuild_refits(param, model):
+    param.relative_contact_rate = 0.5
+    rebuilt = Sir.rebuild(model, param)
+    assert np.array_equal(rebuilt.raw.block, Sir(param).raw.block, equal_nan=True)
+    assert rebuilt.r_t != model.r_t
+
+
+@pytest.mark.parametrize("n_days", [30, 120, 300])
+def test_model_rebuild_n_days(param, model, n_days):
+    param.n_days = n_days
+    rebuilt = Sir.rebuild(model, param)
+    expected = Sir(param)
+
+    assert rebuilt.i_day == expected.i_day
+    assert np.array_equal(rebuilt.raw.block, expected.raw.block, equal_nan=True)
+    assert np.array_equal(rebuilt.raw["day"], expected.raw["day"])
+    assert rebuilt.raw_df.equals(expected.raw_df)
+
+
+def test_model_extend_projection(param):
+    param.date_first_hospitalized = param.current_date - timedelta(days=15)
+    param.doubling_time = None
+    model = Sir(param)
+    n_days = len(model.raw["day"])
+
+    param.n_days += 200
+    param.doubling_time = None
+    extended = Sir.rebuild(model, param)
+    param.doubling_time = None
+    expected = Sir(param)
+
+    assert extended.fit_evaluations == 0
+    assert len(extended.raw["day"]) == n_days + 200
+    assert np.array_equal(extended.raw.block, expected.raw.block, equal_nan=True)
+    assert extended.census_df.equals(expected.census_df)
+    assert len(model.raw["day"]) == n_days
+
+
+def test_skip_policies():
+    policies = [(0.5, 10), (0.25, 20)]
+    assert skip_policies(policies, 0) == policies
+    assert skip_policies(policies, 4) == [(0.5, 6), (0.25, 20)]
+    assert skip_policies(policies, 10) == [(0.25, 20)]
+    assert skip_policies(policies, 25) == [(0.25, 5)]
+    assert skip_policies(policies, 30) == []
+
+
 def test_model_conservation(param, model):
     raw_df = model.raw_df
 
@@ -198,3 +414,123 @@ def test_model_cumulative_census(param, model):
         param.market_share * param.hospitalized.rate * (raw_df.infected[1:-1] + raw_df.recovered[1:-1]) - 1.0
     )
     assert (diff.abs() < 0.1).all()
+
+
+def golden_parameters(case):
+    """Parameters of a tests/by_* case, read from its settings.cfg.
+
+    The case's CSVs were written on 2020-03-28 with the mitigation date
+    defaulting to that day.
+    """
+    path = Path(__file__).parents[2] / case / "settings.cfg"
+    settings = dict(line.split() for line in path.read_text().splitlines() if line.strip())
+    value = {key.lstrip("-").replace("-", "_"): value for key, value in settings.items()}
+    first = value.get("date_first_hospitalized")
+    return Parameters(
+        current_date=date(2020, 3, 28),
+        current_hospitalized=int(value["current_hospitalized"]),
+        date_first_hospitalized=date.fromisoformat(first) if first else None,
+        doubling_time=float(value["doubling_time"]) if "doubling_time" in value else None,
+        hospitalized=Disposition.create(
+            days=int(value["hospitalized_days"]), rate=float(value["hospitalized_rate"])),
+        icu=Disposition.create(days=int(value["icu_days"]), rate=float(value["icu_rate"])),
+        infectious_days=int(value["infectious_days"]),
+        market_share=float(value["market_share"]),
+        mitigation_date=date(2020, 3, 28),
+        n_days=int(value["n_days"]),
+        population=int(value["population"]),
+        recovered=0,
+        relative_contact_rate=float(value["relative_contact_rate"]),
+        ventilated=Disposition.create(
+            days=int(value["ventilated_days"]), rate=float(value["ventilated_rate"])),
+    )
+
+
+@pytest.mark.parametrize("case", ["by_doubling_time", "by_date_first_hospitalized"])
+def test_model_float32(case):
+    """float32 projections of the tests/by_* cases stay within FLOAT32_RTOL of float64.
+
+    The reference is the float64 model on the case's settings: the case's
+    CSVs predate the current seeding of the model and no longer match float64.
+    """
+    p = golden_parameters(case)
+    expected = Sir(copy(p))
+    model = Sir(copy(p), dtype="float32")
+
+    assert model.raw.block.dtype == np.float32
+    assert (model.i_day, model.doubling_time) == (expected.i_day, expected.doubling_time)
+    for df in ("sim_sir_w_date_df", "admits_df", "census_df"):
+        actual, desired = getattr(model, df), getattr(expected, df)
+        for column in desired.columns[2:]:
+            peak = np.nanmax(desired[column].values)
+            assert np.allclose(
+                actual[column].values, desired[column].values,
+                rtol=0.0, atol=FLOAT32_RTOL * peak, equal_nan=True,
+            ), column
+
+
+def test_sim_sir_float32():
+    """sim_sir steps in float32 when asked, as sim_sir_batch does."""
+    policies = [(3e-4, 10), (2e-4, 20)]
+    raw = sim_sir(1000.0, 10.0, 0.0, 0.1, 0, policies, dtype="float32")
+    batch = sim_sir_batch(
+        1000.0, 10.0, 0.0, 0.1, 0, [(np.array([beta]), n_days) for beta, n_days in policies],
+        dtype="float32")
+    for key in ("susceptible", "infected", "recovered"):
+        assert raw[key].dtype == np.float32, key
+        assert np.array_equal(raw[key], batch[key][0]), key
+
+
+def test_sim_sir_batch_float32():
+    """A float32 batch stays float32 through the census."""
+    raw = sim_sir_batch(
+        1000.0, 10.0, 0.0, 0.1, 0, [(np.array([3e-4, 2e-4]), 30)], dtype="float32")
+    rates = {"hospitalized": np.array([0.05, 0.1])}
+    calculate_dispositions(raw, rates, 0.5)
+    calculate_admits(raw, rates)
+    calculate_census(raw, {"hospitalized": np.array([5, 7])})
+    for key in ("susceptible", "ever_hospitalized", "admits_hospitalized", "census_hospitalized"):
+        assert raw[key].dtype == np.float32, key
+
+
+def test_model_stats(param):
+    """With a sink set, each phase records its duration, calls and array sizes."""
+    assert Sir(copy(param)).stats is NULL_STATS
+
+    finished = []
+    set_stats_sink(lambda stats, phase: finished.append(phase))
+    try:
+        model = Sir(copy(param))
+        model.census_floor_df
+    finally:
+        set_stats_sink(None)
+
+    phases = model.stats.phases
+    assert model.stats is not NULL_STATS
+    assert finished[-1] == "frame_census_floor_df"
+    assert "sir" in finished
+    assert phases["fit_i_day"]["calls"] == 1
+    assert phases["fit_i_day"]["elements"] > 0
+    assert phases["projection"]["calls"] == 1
+    assert phases["projection"]["elements"] == model.raw.block.size
+    assert phases["build_floor_df"]["calls"] == 1
+    assert phases["frame_census_df"]["calls"] == 1
+    assert phases["sir"]["seconds"] >= phases["fit_i_day"]["seconds"]
+
+    # Memoized frames are recorded once
+    model.census_floor_df
+    assert model.stats.phases["frame_census_floor_df"]["calls"] == 1
+    assert model.stats.to_dict() == phases
+
+
+def test_model_stats_doubling_time(param):
+    p = copy(param)
+    p.date_first_hospitalized = p.current_date - timedelta(days=20)
+    p.doubling_time = None
+    set_stats_sink(log_stats)
+    try:
+        model = Sir(p)
+    finally:
+        set_stats_sink(None)
+    assert model.stats.phases["fit_doubling_time"]["calls"] == model.fit_evaluations // 15
+    assert "fit_i_day" not in model.stats.phases
@@ -0,0 +1,101 @@
+"""Test array validation."""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from penn_chime.model.parameters import Disposition
+from penn_chime.model.validators import (
+    Date,
+    GteOne,
+    OptionalDate,
+    OptionalStrictlyPositive,
+    OptionalValue,
+    Rate,
+    StrictlyPositive,
+    ValDisposition,
+    validate_columns,
+)
+
+
+def scalar_errors(validator, key, values):
+    """Errors of validate on each value, by row."""
+    errors = {}
+    for row, value in enumerate(values):
+        try:
+            validator.validate(key, value)
+        except ValueError as e:
+            errors[row] = str(e)
+    return errors
+
+
+@pytest.mark.parametrize("validator, values", [
+    (StrictlyPositive, [1.0, 0.0, None, 3, -2]),
+    (StrictlyPositive, [1.0, np.float32(2.0), np.int64(0), True]),
+    (OptionalStrictlyPositive, [1.0, 0.0, None, 3, -2]),
+    (GteOne, np.array([1, 0, 2, 5])),
+    (Rate, [0.0, 1.0, 1.5, -0.1, None]),
+    (Date, [date(2020, 3, 1), None, "2020-03-01"]),
+    (OptionalDate, [date(2020, 3, 1), None, "2020-03-01"]),
+    (ValDisposition, [
+        Disposition(3, 0.1),
+        Disposition(0, 0.1),
+        Disposition(3, 2.0),
+        Disposition(-1, -1.0),
+        None,
+    ]),
+])
+def test_validate_array(validator, values):
+    """Each row has the error validate raises for its value, and any further ones."""
+    validation = validator.validate_array("key", values)
+    errors = scalar_errors(validator, "key", values)
+    assert list(validation.errors) == list(errors)
+    for row, error in errors.items():
+        assert validation.errors[row].startswith(error)
+    assert validation.valid.tolist() == [row not in errors for row in range(len(values))]
+
+
+def test_validate_array_types():
+    validation = StrictlyPositive.validate_array("key", ["fast", 2.0])
+    assert validation.valid.tolist() == [False, True]
+    assert validation.errors == {0: "key: 'fast' must be a number."}
+
+    validation = StrictlyPositive.validate_array("key", np.array(["5", "2.0"]))
+    assert validation.valid.tolist() == [False, False]
+    assert validation.errors[0] == "key: '5' must be a number."
+
+    validation = Date.validate_array("key", np.array(["2020-03-01", "NaT"], dtype="datetime64[D]"))
+    assert validation.valid.tolist() == [True, False]
+    assert validation.errors == {1: "key is required."}
+
+    validation = OptionalValue.validate_array("key", [None, "anything"])
+    assert validation.valid.all() and not validation.errors
+
+
+@pytest.mark.parametrize("validator", [StrictlyPositive, OptionalStrictlyPositive, GteOne, Rate])
+@pytest.mark.parametrize("value", ["5", "0.5", b"1"])
+def test_validate_array_strings(validator, value):
+    """Numeric strings are rejected by the array validators, as by validate."""
+    with pytest.raises((TypeError, ValueError)):
+        validator.validate("key", value)
+    for values in ([value], np.array([value])):
+        validation = validator.validate_array("key", values)
+        assert validation.valid.tolist() == [False]
+        assert validation.errors[0].endswith("must be a number.")
+
+
+def test_validate_columns():
+    validation = validate_columns(
+        {"doubling_time": OptionalStrictlyPositive, "market_share": Rate},
+        {"doubling_time": np.array([4.0, -1.0, np.nan]), "market_share": [0.1, 2.0, 0.5]},
+    )
+    assert validation.valid.tolist() == [True, False, True]
+    assert list(validation.errors) == [1]
+    assert validation.errors[1] == (
+        "doubling_time: -1.0 needs to be greater than 1e-07."
+        " market_share: 2.0 needs to be a rate (i.e. in [0,1])."
+    )
+
+    with pytest.raises(ValueError, match="different lengths"):
+        validate_columns({"market_share": Rate, "n_days": GteOne}, {"market_share": [0.1], "n_days": [1, 2]})
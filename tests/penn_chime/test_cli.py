@@ -1,5 +1,11 @@
+import json
+import os
+import subprocess
+import sys
+
 import pytest
 
+import penn_chime
 import penn_chime.cli
 
 from datetime import date, timedelta
@@ -170,4 +176,180 @@ def __validate_file(reference_file_content, reference_file_header, reference_fil
             assert not tokens[5].strip() or float(tokens[5]) == pytest.approx(reference_row[2], 1e-10, 1e-3), f"Failed for file {reference_file_name} row {i+1}."
             
             
-            
\ No newline at end of file
+            
+def test_main_monte_carlo(tmp_path, monkeypatch, capsys):
+    """Monte Carlo mode writes admits and census bands."""
+    monkeypatch.chdir(tmp_path)
+    arguments = [
+        "pytest",
+        "monte-carlo",
+        "--draws", "200",
+        "--seed", "1",
+        "--sample", "doubling-time=normal:4,0.5",
+        "--sample", "icu-days=uniform:7,11",
+        "--current-hospitalized", "69",
+        "--current-date", "2020-04-14",
+        "--mitigation-date", "2020-04-01",
+        "--doubling-time", "4",
+        "--hospitalized-days", "5",
+        "--hospitalized-rate",  "0.025",
+        "--icu-days", "9",
+        "--icu-rate", "0.075",
+        "--market-share", "0.1",
+        "--infectious-days", "14",
+        "--max-y-axis", "1000",
+        "--n-days", "30",
+        "--recovered", "0",
+        "--relative-contact-rate", "0.1",
+        "--population", "1000000",
+        "--ventilated-days",  "10",
+        "--ventilated-rate", "0.005"
+        ]
+
+    penn_chime.cli.run(arguments)
+
+    with open(tmp_path / "2020-04-14_projected_census_bands.csv") as f:
+        header = f.readline()
+    assert header.startswith(",day,date,census_hospitalized_p5,census_hospitalized_p25,")
+    assert (tmp_path / "2020-04-14_projected_admits_bands.csv").exists()
+
+    penn_chime.cli.run(arguments + ["--single-file", "--format", "ndjson", "--output-dir", "out"])
+    with open(tmp_path / "out" / "2020-04-14_projections.ndjson") as f:
+        row = json.loads(f.readline())
+    assert {"admits_icu_p50", "census_icu_p50"} <= set(row)
+
+    with pytest.raises(SystemExit):
+        penn_chime.cli.run(["pytest", "monte-carlo", "--draws", "0"])
+    assert "--draws: must be at least 1, not 0" in capsys.readouterr().err
+
+
+def test_main_calibrate(tmp_path, monkeypatch, capsys):
+    """Calibrate mode prints the fit and writes the calibrated projections."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "census.csv").write_text(
+        "date,census\n"
+        "2020-04-10,40\n"
+        "2020-04-11,46\n"
+        "2020-04-12,53\n"
+        "2020-04-13,60\n"
+        "2020-04-14,69\n"
+    )
+    arguments = [
+        "pytest",
+        "calibrate",
+        "census.csv",
+        "--current-hospitalized", "69",
+        "--current-date", "2020-04-14",
+        "--mitigation-date", "2020-04-01",
+        "--doubling-time", "4",
+        "--hospitalized-days", "5",
+        "--hospitalized-rate",  "0.025",
+        "--icu-days", "9",
+        "--icu-rate", "0.075",
+        "--market-share", "0.1",
+        "--infectious-days", "14",
+        "--max-y-axis", "1000",
+        "--n-days", "30",
+        "--recovered", "0",
+        "--relative-contact-rate", "0.1",
+        "--population", "1000000",
+        "--ventilated-days",  "10",
+        "--ventilated-rate", "0.005"
+        ]
+
+    penn_chime.cli.run(arguments)
+
+    out = capsys.readouterr().out
+    assert "doubling_time: " in out
+    assert "date_first_hospitalized: " in out
+    assert (tmp_path / "2020-04-14_projected_census.csv").exists()
+
+
+# Modules the default run must not import
+HEAVY_MODULES = ("pandas", "i18n", "altair", "penn_chime.view")
+
+
+def test_main_imports(tmp_path):
+    """The default run imports neither pandas, i18n nor the view layer."""
+    arguments = [
+        "penn_chime",
+        "--current-hospitalized", "69",
+        "--current-date", "2020-04-14",
+        "--mitigation-date", "2020-04-01",
+        "--doubling-time", "4",
+        "--hospitalized-days", "5",
+        "--hospitalized-rate",  "0.025",
+        "--icu-days", "9",
+        "--icu-rate", "0.075",
+        "--market-share", "0.1",
+        "--infectious-days", "14",
+        "--max-y-axis", "1000",
+        "--n-days", "30",
+        "--recovered", "0",
+        "--relative-contact-rate", "0.1",
+        "--population", "1000000",
+        "--ventilated-days",  "10",
+        "--ventilated-rate", "0.005"
+        ]
+    script = f"""
+import sys
+
+import penn_chime.cli
+
+penn_chime.cli.run({arguments!r})
+print(",".join(sorted(name for name in sys.modules if name.startswith({HEAVY_MODULES!r}))))
+"""
+    src = os.path.dirname(os.path.dirname(penn_chime.__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": src},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == ""
+    assert (tmp_path / "2020-04-14_projected_census.csv").exists()
+
+
+def test_main_help(capsys):
+    """The help lists the output options with the parameters."""
+    penn_chime.cli.run(["penn_chime", "--help"])
+    out = capsys.readouterr().out
+    for option in ("--population", "--format", "--output-dir", "--single-file"):
+        assert option in out
+
+
+def test_main_single_file(tmp_path, monkeypatch):
+    """--single-file writes every column to one file in --output-dir."""
+    monkeypatch.chdir(tmp_path)
+    arguments = [
+        "pytest",
+        "--format", "ndjson",
+        "--output-dir", "out",
+        "--single-file",
+        "--current-hospitalized", "69",
+        "--current-date", "2020-04-14",
+        "--mitigation-date", "2020-04-01",
+        "--doubling-time", "4",
+        "--hospitalized-days", "5",
+        "--hospitalized-rate",  "0.025",
+        "--icu-days", "9",
+        "--icu-rate", "0.075",
+        "--market-share", "0.1",
+        "--infectious-days", "14",
+        "--max-y-axis", "1000",
+        "--n-days", "30",
+        "--recovered", "0",
+        "--relative-contact-rate", "0.1",
+        "--population", "1000000",
+        "--ventilated-days",  "10",
+        "--ventilated-rate", "0.005"
+        ]
+
+    penn_chime.cli.run(arguments)
+
+    assert os.listdir(tmp_path / "out") == ["2020-04-14_projections.ndjson"]
+    with open(tmp_path / "out" / "2020-04-14_projections.ndjson") as f:
+        row = json.loads(f.readline())
+    assert set(row) >= {"day", "date", "susceptible", "admits_icu", "census_ventilated"}
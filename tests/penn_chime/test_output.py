@@ -0,0 +1,108 @@
+from datetime import datetime
+import json
+
+import numpy as np
+import pytest
+
+from penn_chime.model.sir import Sir
+from penn_chime.output import (
+    EXTENSIONS,
+    from_frame,
+    get_projections,
+    get_tables,
+    join_tables,
+    write_csv,
+    write_ndjson,
+    write_table,
+)
+
+
+FRAMES = {
+    "sim_sir_w_date": "sim_sir_w_date_df",
+    "projected_admits": "admits_df",
+    "projected_census": "census_df",
+    "ppe_data": "ppe_df",
+}
+
+
+@pytest.mark.parametrize("fit", ("doubling_time", "date_first_hospitalized"))
+def test_write_csv_matches_to_csv(param, tmp_path, fit):
+    """Each table is written byte for byte as its data frame."""
+    if fit == "date_first_hospitalized":
+        param = param.replace(doubling_time=None, date_first_hospitalized=datetime(2020, 3, 7))
+    m = Sir(param)
+    tables = get_tables(m)
+    assert set(tables) == set(FRAMES)
+    for name, table in tables.items():
+        write_csv(table, tmp_path / f"{name}.csv")
+        getattr(m, FRAMES[name]).to_csv(tmp_path / f"{name}_df.csv")
+        assert (tmp_path / f"{name}.csv").read_text() == (tmp_path / f"{name}_df.csv").read_text()
+
+
+def test_write_csv_float32(param, tmp_path):
+    m = Sir(param, dtype="float32")
+    table = get_tables(m)["projected_census"]
+    write_csv(table, tmp_path / "census.csv")
+    m.census_df.to_csv(tmp_path / "census_df.csv")
+    assert (tmp_path / "census.csv").read_text() == (tmp_path / "census_df.csv").read_text()
+    assert table.columns["census_hospitalized"].dtype == np.float32
+
+
+def test_write_ndjson(model, tmp_path):
+    table = get_projections(model)
+    write_table(table, tmp_path / "projections.ndjson", "ndjson")
+    rows = [json.loads(line) for line in (tmp_path / "projections.ndjson").read_text().splitlines()]
+    assert len(rows) == len(model.raw["day"])
+    assert list(rows[0]) == list(table.columns)
+    assert rows[0]["date"] == np.datetime_as_string(model.raw["date"][0], unit="D")
+    # The first day has no admits
+    assert rows[0]["admits_hospitalized"] is None
+    assert rows[-1]["census_icu"] == model.raw["census_icu"][-1]
+
+
+@pytest.mark.parametrize("file_format", ("parquet", "arrow", "feather"))
+def test_write_columnar(model, tmp_path, file_format):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    table = get_tables(model)["ppe_data"]
+    path = tmp_path / f"ppe_data{EXTENSIONS[file_format]}"
+    write_table(table, path, file_format)
+    read = pq.read_table(path) if file_format == "parquet" else feather.read_table(path)
+    assert read.column_names == list(table.columns)
+    assert str(read.schema.field("date").type) == "date32[day]"
+    assert read.column("day").to_pylist() == table.columns["day"].tolist()
+    assert np.array_equal(read.column("census_hospitalized").to_numpy(), table.columns["census_hospitalized"])
+
+
+def test_write_table_unknown_format(model, tmp_path):
+    with pytest.raises(ValueError):
+        write_table(get_projections(model), tmp_path / "projections.xml", "xml")
+
+
+def test_from_frame(model, tmp_path):
+    """Data frames with text columns are written as to_csv and as JSON strings."""
+    df = model.census_df.copy()
+    df.insert(0, "facility", "North")
+    table = from_frame(df)
+    write_csv(table, tmp_path / "table.csv")
+    df.to_csv(tmp_path / "df.csv")
+    assert (tmp_path / "table.csv").read_text() == (tmp_path / "df.csv").read_text()
+
+    write_ndjson(table, tmp_path / "table.ndjson")
+    with open(tmp_path / "table.ndjson") as fin:
+        row = json.loads(fin.readline())
+    assert row["facility"] == "North"
+
+
+def test_join_tables(model):
+    admits, census = from_frame(model.admits_df), from_frame(model.census_df)
+    table = join_tables([admits, census], ("day", "date"))
+    assert list(table.columns) == list(admits.columns) + [
+        column for column in census.columns if column not in ("day", "date")
+    ]
+
+    shifted = from_frame(model.census_df.assign(day=model.census_df.day + 1))
+    with pytest.raises(ValueError, match="differ in day"):
+        join_tables([admits, shifted], ("day", "date"))
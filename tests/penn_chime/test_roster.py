@@ -0,0 +1,162 @@
+import json
+
+import numpy as np
+import pytest
+
+import penn_chime.cli
+from penn_chime.model.sir import Sir
+from penn_chime.roster import Roster, create_parameters, get_shared_args, read_roster
+
+
+SHARED = [
+    "--current-date", "2020-04-14",
+    "--mitigation-date", "2020-04-01",
+    "--doubling-time", "4",
+    "--hospitalized-days", "5",
+    "--hospitalized-rate",  "0.025",
+    "--icu-days", "9",
+    "--icu-rate", "0.075",
+    "--infectious-days", "14",
+    "--n-days", "30",
+    "--recovered", "0",
+    "--relative-contact-rate", "0.1",
+    "--ventilated-days",  "10",
+    "--ventilated-rate", "0.005",
+]
+
+
+@pytest.fixture
+def roster_csv(tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_text(
+        "facility,population,market-share,current_hospitalized,icu_days\n"
+        "North,1000000,0.1,69,\n"
+        "South,500000,0.2,30,12\n"
+    )
+    return str(path)
+
+
+def test_read_roster(roster_csv, tmp_path):
+    roster = read_roster(roster_csv)
+    assert roster["South"] == [
+        "--population", "500000",
+        "--market-share", "0.2",
+        "--current-hospitalized", "30",
+        "--icu-days", "12",
+    ]
+
+    path = tmp_path / "roster.cfg"
+    path.write_text(
+        "# Facilities\n"
+        "[North]\n"
+        "--population 1000000\n"
+        "--market-share 0.1\n"
+        "--current-hospitalized 69\n"
+        "\n"
+        "[South]\n"
+        "--population 500000\n"
+        "--market-share 0.2 --current-hospitalized 30\n"
+        "--icu-days 12\n"
+    )
+    assert read_roster(str(path)) == roster
+
+
+def test_read_roster_errors(tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_text("name,population\nNorth,1000000\n")
+    with pytest.raises(ValueError, match="roster.csv: a roster needs a facility column"):
+        read_roster(str(path))
+
+    path.write_text("facility,population\nNorth,1000000\nNorth,500000\n")
+    with pytest.raises(ValueError, match="roster.csv: facility North is repeated"):
+        read_roster(str(path))
+
+    path = tmp_path / "roster.cfg"
+    path.write_text("[North]\n--population 1000000\n[North]\n--population 500000\n")
+    with pytest.raises(ValueError, match="roster.cfg: facility North is repeated"):
+        read_roster(str(path))
+
+
+def test_get_shared_args(tmp_path):
+    path = tmp_path / "shared.cfg"
+    path.write_text("--n-days 20\n--recovered 0\n")
+    assert get_shared_args({"PARAMETERS": str(path)}, ["--n-days", "10"]) == [
+        "--n-days", "10", "--n-days", "20", "--recovered", "0",
+    ]
+    assert get_shared_args({}, ["--parameters", str(path)]) == ["--n-days", "20", "--recovered", "0"]
+
+
+def test_roster(roster_csv):
+    parameters, errors = create_parameters(SHARED, read_roster(roster_csv))
+    assert not errors
+    assert parameters["South"].icu.days == 12
+    assert parameters["North"].icu.days == 9
+
+    roster = Roster(parameters, max_workers=1)
+    north = Sir(parameters["North"])
+    south = Sir(parameters["South"])
+
+    census_df = roster.census_df
+    assert np.array_equal(
+        census_df[census_df.facility == "North"].census_icu.values,
+        north.census_df.census_icu.values,
+    )
+
+    system = roster.system_census_df.set_index("date")
+    for day in ("2020-04-14", "2020-05-01"):
+        expected = (
+            north.census_df.set_index("date").census_hospitalized[day]
+            + south.census_df.set_index("date").census_hospitalized[day]
+        )
+        assert system.census_hospitalized[day] == pytest.approx(expected)
+
+
+def test_roster_errors(roster_csv):
+    roster = read_roster(roster_csv)
+    roster["Broken"] = ["--population", "1000", "--market-share", "2.0", "--current-hospitalized", "1"]
+    parameters, errors = create_parameters(SHARED, roster)
+    assert list(errors) == ["Broken"]
+    assert len(Roster(parameters, max_workers=1, errors=errors).facilities) == 2
+
+
+def test_main_roster(roster_csv, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    penn_chime.cli.run(["pytest", "roster", roster_csv, "--workers", "2", *SHARED])
+
+    for name in ("projected_admits", "projected_census", "system_projected_admits", "system_projected_census"):
+        assert (tmp_path / f"roster_{name}.csv").exists()
+
+
+def test_main_roster_output_options(roster_csv, tmp_path):
+    output_dir = tmp_path / "out"
+    penn_chime.cli.run([
+        "pytest", "roster", roster_csv, "--workers", "1", *SHARED,
+        "--format", "ndjson", "--output-dir", str(output_dir), "--single-file",
+    ])
+    assert sorted(path.name for path in output_dir.iterdir()) == [
+        "roster_projections.ndjson",
+        "roster_system_projections.ndjson",
+    ]
+    with open(output_dir / "roster_projections.ndjson") as fin:
+        row = json.loads(fin.readline())
+    assert row["facility"] == "North"
+    assert {"admits_icu", "census_icu"} <= set(row)
+
+
+def test_main_roster_quoted_facility(tmp_path, monkeypatch):
+    """Facility names with commas are quoted in the output, as in the roster."""
+    import pandas as pd
+
+    path = tmp_path / "roster.csv"
+    path.write_text(
+        "facility,population,market-share,current_hospitalized\n"
+        '"Mercy, North",1000000,0.1,69\n'
+        "South,500000,0.2,30\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    penn_chime.cli.run(["pytest", "roster", str(path), "--workers", "1", *SHARED])
+
+    df = pd.read_csv(tmp_path / "roster_projected_census.csv", index_col=0)
+    assert df.facility.unique().tolist() == ["Mercy, North", "South"]
+    assert df.day.dtype.kind == "i"
+    assert {"census_hospitalized", "census_icu"} <= set(df.columns)
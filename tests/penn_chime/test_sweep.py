@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+import penn_chime.cli
+from penn_chime.model.sir import Sir
+from penn_chime.sweep import (
+    COLUMNS,
+    ColumnarWriter,
+    get_scenarios,
+    parse_grid,
+    read_scenarios,
+    run_sweep,
+)
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_parse_grid():
+    grid = parse_grid(["doubling-time=3,4.5", "icu_days=8,10", "mitigation-date=2020-03-01"])
+    assert grid["doubling_time"] == [3.0, 4.5]
+    assert grid["icu_days"] == [8, 10]
+    assert str(grid["mitigation_date"][0]) == "2020-03-01"
+
+    with pytest.raises(ValueError):
+        parse_grid(["relative-contact-rate=1.5"])
+
+
+def test_get_scenarios(tmp_path):
+    path = tmp_path / "scenarios.csv"
+    path.write_text("market-share,population\n0.1,100000\n0.2,\n")
+    rows = read_scenarios(str(path))
+    assert rows == [{"market_share": 0.1, "population": 100000}, {"market_share": 0.2}]
+
+    scenarios = get_scenarios({"doubling_time": [3.0, 4.0]}, rows)
+    assert scenarios == [
+        {"market_share": 0.1, "population": 100000, "doubling_time": 3.0},
+        {"market_share": 0.1, "population": 100000, "doubling_time": 4.0},
+        {"market_share": 0.2, "doubling_time": 3.0},
+        {"market_share": 0.2, "doubling_time": 4.0},
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_run_sweep(param, tmp_path, suffix):
+    path = str(tmp_path / ("sweep" + suffix))
+    scenarios = [
+        {"doubling_time": 5.0},
+        {"doubling_time": 5.0, "hospitalized_rate": 2.0},
+        {"relative_contact_rate": 0.4, "icu_days": 12},
+    ]
+    errors = run_sweep(param, scenarios, path, max_workers=1)
+    assert list(errors) == [1]
+    assert errors[1] == "ValueError: hospitalized_rate: 2.0 needs to be a rate (i.e. in [0,1])."
+
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        assert pq.ParquetFile(path).num_row_groups == 1
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    assert set(table.column("scenario").to_pylist()) == {0, 2}
+    assert b"scenarios" in table.schema.metadata
+
+    df = table.to_pandas()
+    expected = Sir(param.replace(relative_contact_rate=0.4, icu_days=12))
+    census_icu = df[df.scenario == 2].census_icu.values
+    assert np.array_equal(census_icu, expected.raw["census_icu"])
+
+
+def test_run_sweep_float32(param, tmp_path):
+    path = str(tmp_path / "sweep.arrow")
+    errors = run_sweep(param, [{"doubling_time": 5.0}], path, max_workers=1, dtype="float32")
+    assert not errors
+
+    table = pa.ipc.open_file(path).read_all()
+    assert table.schema.field("census_icu").type == pa.float32()
+
+
+@pytest.mark.parametrize("path, file_format", [("sweep.feather", None), ("sweep.bin", "feather")])
+def test_run_sweep_feather(param, tmp_path, path, file_format):
+    """Feather is the Arrow IPC file format, as for the main command."""
+    path = str(tmp_path / path)
+    assert not run_sweep(param, [{"doubling_time": 5.0}], path, file_format, max_workers=1)
+    assert pa.ipc.open_file(path).read_all().num_rows > 0
+
+
+def test_columnar_writer_batch_rows(tmp_path):
+    """Scenarios are written in row groups of at least batch_rows rows, and the rest on close."""
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / "sweep.parquet")
+    with ColumnarWriter(path, "parquet", {}, batch_rows=20) as writer:
+        for scenario in range(5):
+            columns = {column: np.zeros(10) for column in COLUMNS}
+            columns["scenario"] = np.full(10, scenario)
+            columns["day"] = np.arange(10)
+            columns["date"] = np.arange("2020-04-01", "2020-04-11", dtype="datetime64[D]")
+            writer.write(columns)
+    parquet = pq.ParquetFile(path)
+    assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [20, 20, 10]
+
+
+def test_main_sweep(tmp_path):
+    path = tmp_path / "sweep.parquet"
+    arguments = [
+        "pytest",
+        "sweep",
+        "--output", str(path),
+        "--workers", "2",
+        "--grid", "doubling-time=3,4",
+        "--grid", "relative-contact-rate=0.1,0.2,0.3",
+        "--current-hospitalized", "69",
+        "--current-date", "2020-04-14",
+        "--mitigation-date", "2020-04-01",
+        "--doubling-time", "4",
+        "--hospitalized-days", "5",
+        "--hospitalized-rate",  "0.025",
+        "--icu-days", "9",
+        "--icu-rate", "0.075",
+        "--market-share", "0.1",
+        "--infectious-days", "14",
+        "--max-y-axis", "1000",
+        "--n-days", "30",
+        "--recovered", "0",
+        "--relative-contact-rate", "0.1",
+        "--population", "1000000",
+        "--ventilated-days",  "10",
+        "--ventilated-rate", "0.005"
+        ]
+
+    penn_chime.cli.run(arguments)
+
+    import pyarrow.parquet as pq
+    table = pq.read_table(str(path))
+    assert sorted(set(table.column("scenario").to_pylist())) == list(range(6))
@@ -0,0 +1,28 @@
+import json
+
+from benchmarks.run import BENCHMARKS, compare, main, run_benchmarks
+
+
+def test_run_benchmarks():
+    """Every model benchmark runs and records wall time and peak memory."""
+    names = [name for name in BENCHMARKS if name.startswith("sir_")] + ["sim_sir", "calculate_census"]
+    results = run_benchmarks(names, repeat=1)
+
+    assert list(results["results"]) == names
+    for result in results["results"].values():
+        assert result["repeat"] == 1
+        assert 0.0 < result["min_s"] <= result["median_s"]
+        assert result["peak_bytes"] > 0
+    assert "python" in results["environment"]
+
+
+def test_compare(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    main(["sim_sir", "--repeat", "2", "--output", str(path)])
+    baseline = json.loads(path.read_text())
+
+    slower = json.loads(path.read_text())
+    slower["results"]["sim_sir"]["median_s"] *= 2.0
+    assert compare(slower, baseline) == ["sim_sir"]
+    assert compare(baseline, baseline) == []
+    assert "sim_sir" in capsys.readouterr().out